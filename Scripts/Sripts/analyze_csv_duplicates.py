@@ -1,29 +1,25 @@
 import pandas as pd
 import os
+import sys
 from pathlib import Path
 
+# Table readers from Tarea3 (they use the Parquet copy of each CSV when it is up to date)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Tarea3'))
+from tablas import leer_tabla
+
 def analyze_csv_duplicates(csv_path):
     """Analyze duplicate values in a CSV file and return statistics."""
     print(f"\nAnalyzing file: {csv_path}")
     
-    # Try different encodings
-    encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-    df = None
-    
-    for encoding in encodings:
-        try:
-            # Use low_memory=False to avoid DtypeWarning
-            df = pd.read_csv(csv_path, encoding=encoding, low_memory=False)
-            print(f"Successfully read file with {encoding} encoding")
-            break
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            print(f"Error reading file with {encoding} encoding: {str(e)}")
-            continue
+    try:
+        # Parquet copy when it is up to date, CSV otherwise
+        df = leer_tabla(str(csv_path))
+    except Exception as e:
+        print(f"Error reading file: {str(e)}")
+        df = None
     
     if df is None:
-        print(f"Could not read file {csv_path} with any of the attempted encodings")
+        print(f"Could not read file {csv_path}")
         return
     
     # Get total number of rows
@@ -1,19 +1,17 @@
 import pandas as pd
 from datetime import datetime
 import os
+import sys
+
+# Table readers from Tarea3 (they use the Parquet copy of each CSV when it is up to date)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Tarea3'))
+from tablas import leer_tabla
 
 def verify_book_ratings():
     try:
-        # Read the CSV files with different encodings
-        try:
-            books_df = pd.read_csv('../../integratedCSVs/books.csv', encoding='utf-8')
-        except UnicodeDecodeError:
-            books_df = pd.read_csv('../../integratedCSVs/books.csv', encoding='latin1')
-            
-        try:
-            ratings_df = pd.read_csv('../../integratedCSVs/ratings.csv', encoding='utf-8')
-        except UnicodeDecodeError:
-            ratings_df = pd.read_csv('../../integratedCSVs/ratings.csv', encoding='latin1')
+        # Read only the columns used here (from the Parquet copy if it is up to date)
+        books_df = leer_tabla('../../integratedCSVs/books.csv', ['Id', 'ratingsCount'])
+        ratings_df = leer_tabla('../../integratedCSVs/ratings.csv', ['Id', 'review/score'])
         
         # Calculate average ratings from ratings.csv
         calculated_ratings = ratings_df.groupby('Id').agg({
@@ -1,30 +1,28 @@
 import pandas as pd
+import os
+import sys
 from pathlib import Path
 
-def load_csv_with_encoding(file_path):
-    """Try to load a CSV file with different encodings"""
-    encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-    
-    for encoding in encodings:
-        try:
-            df = pd.read_csv(file_path, encoding=encoding, low_memory=False)
-            print(f"Successfully loaded {file_path} with {encoding} encoding")
-            return df
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            print(f"Error loading {file_path} with {encoding} encoding: {str(e)}")
-            continue
-    
-    raise Exception(f"Could not load {file_path} with any of the attempted encodings")
+# Table readers from Tarea3 (they use the Parquet copy of each CSV when it is up to date)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Tarea3'))
+from tablas import leer_tabla
+
+def load_csv_with_encoding(file_path, columns=None):
+    """Load a CSV file (or only some of its columns), from its Parquet copy if it is up to date"""
+    try:
+        df = leer_tabla(file_path, columns)
+        print(f"Successfully loaded {file_path}")
+        return df
+    except Exception as e:
+        raise Exception(f"Could not load {file_path}: {str(e)}")
 
 def verify_users():
     """Verify that all users in ratings.csv exist in users.csv"""
     print("Loading files...")
     
     try:
-        users_df = load_csv_with_encoding("../../integratedCSVs/users.csv")
-        ratings_df = load_csv_with_encoding("../../integratedCSVs/ratings.csv")
+        users_df = load_csv_with_encoding("../../integratedCSVs/users.csv", ['User_id'])
+        ratings_df = load_csv_with_encoding("../../integratedCSVs/ratings.csv", ['User_id'])
     except Exception as e:
         print(f"Error loading files: {str(e)}")
         return
@@ -55,7 +53,8 @@ def verify_users():
         if len(missing_users) > 10:
             print(f"\n... and {len(missing_users) - 10} more missing users")
         
-        # Save missing users to a CSV file
+        # Save missing users to a CSV file (all rating columns are needed here)
+        ratings_df = load_csv_with_encoding("../../integratedCSVs/ratings.csv")
         missing_users_df = ratings_df[ratings_df['User_id'].isin(missing_users)]
         missing_users_df.to_csv('missing_users_in_ratings.csv', index=False)
         print("\nDetails of missing users have been saved to 'missing_users_in_ratings.csv'")
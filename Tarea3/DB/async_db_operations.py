@@ -0,0 +1,325 @@
+import psycopg
+from psycopg.types.json import Jsonb, JsonbBinaryDumper
+import asyncio
+import uuid
+import os
+from DB.db_operations import (
+    Ejecucion, parametros_conexion, valor_numerico, sentencia_resultado, VARIABLE_REFRESCO_DIFERIDO
+)
+from DB.init_db import CONSULTA_MODO_PARTICION, ESTRATEGIAS_PARTICION, sentencias_particiones
+
+class AsyncDBOperations:
+    """
+    Variante asíncrona de DBOperations sobre psycopg.AsyncConnection.
+    Los resultados se encolan y una tarea de fondo los inserta en lotes, de modo
+    que el cálculo de las métricas no queda bloqueado esperando cada INSERT. La tarea
+    de fondo escribe por su propia conexión, para que sus transacciones no se mezclen
+    con las consultas de la conexión principal.
+
+    Uso:
+        db = await AsyncDBOperations.crear()
+        ...
+        await db.close()
+    """
+    def __init__(self, batch_size=1000, flush_interval=1.0):
+        """
+        Args:
+            batch_size (int): Cantidad máxima de resultados por lote
+            flush_interval (float): Segundos máximos que la tarea de fondo espera
+                para completar un lote antes de insertarlo
+        """
+        self.conn = None
+        self._conn_escritura = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._ejecuciones = {}
+        self._resumen_desactualizado = False
+        self._modo_particion = None
+        self._modo_particion_consultado = False
+        self._cola = None
+        self._tarea_flush = None
+        self._error = None
+        # Lotes que no se pudieron insertar ({sql: filas}); ver reintentar_fallidos
+        self.lotes_fallidos = []
+
+    @classmethod
+    async def crear(cls, **kwargs):
+        """Crea la instancia y abre la conexión"""
+        db = cls(**kwargs)
+        await db.connect()
+        return db
+
+    async def connect(self):
+        """Establece conexión con la base de datos y arranca la tarea de fondo"""
+        try:
+            self.conn = await psycopg.AsyncConnection.connect(**parametros_conexion(), autocommit=True)
+            self._conn_escritura = await psycopg.AsyncConnection.connect(**parametros_conexion(), autocommit=True)
+            # JSONB en formato binario para valorCD
+            self._conn_escritura.adapters.register_dumper(Jsonb, JsonbBinaryDumper)
+            # Cola acotada: si la base de datos no da abasto, los productores esperan
+            self._cola = asyncio.Queue(maxsize=self.batch_size * 4)
+            self._tarea_flush = asyncio.create_task(self._volcar_en_segundo_plano())
+        except Exception as e:
+            print(f"Error al conectar con la base de datos: {e}")
+            raise
+
+    async def close(self):
+        """
+        Vuelca los resultados pendientes, detiene la tarea de fondo y cierra las conexiones.
+        Si algún lote falló, el error se propaga y sus filas quedan en lotes_fallidos.
+        """
+        if self.conn:
+            try:
+                await self.flush()
+                if self._resumen_desactualizado and not os.getenv(VARIABLE_REFRESCO_DIFERIDO):
+                    try:
+                        async with self.conn.cursor() as cursor:
+                            await cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY resumenCalidad")
+                    except Exception as e:
+                        print(f"Error al refrescar el resumen de calidad: {e}")
+            finally:
+                self._tarea_flush.cancel()
+                try:
+                    await self._tarea_flush
+                except asyncio.CancelledError:
+                    pass
+                await self._conn_escritura.close()
+                await self.conn.close()
+                self._conn_escritura = None
+                self.conn = None
+
+    async def __aenter__(self):
+        if self.conn is None:
+            await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def flush(self):
+        """Espera a que la tarea de fondo inserte todo lo encolado"""
+        await self._cola.join()
+        self._verificar_error()
+
+    def _verificar_error(self):
+        """Propaga un error ocurrido en la tarea de fondo"""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def reintentar_fallidos(self):
+        """
+        Vuelve a encolar los resultados de los lotes que fallaron (por ejemplo tras
+        un corte de la conexión) y espera a que se inserten.
+
+        Returns:
+            int: Cantidad de resultados reencolados
+        """
+        # El error de estos lotes ya no aplica: si vuelven a fallar se registra uno nuevo
+        lotes, self.lotes_fallidos, self._error = self.lotes_fallidos, [], None
+        cantidad = 0
+        for lote in lotes:
+            for sql, filas in lote.items():
+                for params in filas:
+                    await self._cola.put((sql, params))
+                    cantidad += 1
+        await self.flush()
+        return cantidad
+
+    async def _volcar_en_segundo_plano(self):
+        """Toma resultados de la cola y los inserta en lotes de hasta batch_size"""
+        loop = asyncio.get_running_loop()
+        while True:
+            sql, params = await self._cola.get()
+            lote = {sql: [params]}
+            cantidad = 1
+
+            # Completar el lote mientras lleguen resultados dentro del intervalo
+            limite = loop.time() + self.flush_interval
+            while cantidad < self.batch_size:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    sql, params = await asyncio.wait_for(self._cola.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                lote.setdefault(sql, []).append(params)
+                cantidad += 1
+
+            try:
+                async with self._conn_escritura.transaction():
+                    async with self._conn_escritura.cursor() as cursor:
+                        for sql, filas in lote.items():
+                            await cursor.executemany(sql, filas)
+            except Exception as e:
+                # El lote no se descarta: queda para reintentar_fallidos
+                print(f"Error al volcar resultados pendientes ({cantidad} resultados en lotes_fallidos): {e}")
+                self.lotes_fallidos.append(lote)
+                self._error = e
+            finally:
+                for _ in range(cantidad):
+                    self._cola.task_done()
+
+    async def _encolar(self, sql, params):
+        """Encola un INSERT de resultado para la tarea de fondo"""
+        self._verificar_error()
+        await self._cola.put((sql, params))
+
+    async def _particion_por_fecha(self):
+        """True si las tablas de resultados están particionadas por mes (consulta una sola vez)"""
+        if not self._modo_particion_consultado:
+            async with self.conn.cursor() as cursor:
+                await cursor.execute(CONSULTA_MODO_PARTICION)
+                fila = await cursor.fetchone()
+            self._modo_particion = ESTRATEGIAS_PARTICION[fila[0]] if fila else None
+            self._modo_particion_consultado = True
+        return self._modo_particion == 'fecha'
+
+    async def _encolar_resultado(self, tabla, columnas, params, ejecucion):
+        """Encola un resultado agregando la fecha de la ejecución si es clave de partición"""
+        con_fecha = await self._particion_por_fecha()
+        if con_fecha:
+            params = params + (ejecucion.fecha,)
+        await self._encolar(sentencia_resultado(tabla, columnas, con_fecha), params)
+
+    async def crear_ejecucion(self, metodo):
+        """
+        Crea una nueva ejecución en la base de datos
+
+        Args:
+            metodo (str): ID del método aplicado
+
+        Returns:
+            Ejecucion: Contexto de la ejecución creada (str() devuelve su ID)
+        """
+        try:
+            execution_id = str(uuid.uuid4())
+            # Se inserta de inmediato: los resultados encolados la referencian. Una transacción:
+            # el advisory lock de las particiones se libera al terminarla
+            async with self.conn.transaction(), self.conn.cursor() as cursor:
+                await cursor.execute(
+                    "INSERT INTO ResultadoEjecucion (executionId, metodo_aplicado_id) VALUES (%s, %s) "
+                    "RETURNING fecha",
+                    (execution_id, metodo)
+                )
+                fecha = (await cursor.fetchone())[0]
+
+                # Si las tablas de resultados están particionadas, crear las particiones
+                await self._particion_por_fecha()
+                for sentencia in sentencias_particiones(self._modo_particion, execution_id, fecha):
+                    await cursor.execute(sentencia)
+
+            ejecucion = Ejecucion(execution_id, metodo, fecha)
+            self._ejecuciones[execution_id] = ejecucion
+            # El resumen de calidad se refresca al cerrar, cuando la ejecución está completa
+            self._resumen_desactualizado = True
+            return ejecucion
+        except Exception as e:
+            print(f"Error al crear ejecución: {e}")
+            raise
+
+    async def _obtener_ejecucion(self, execution_id):
+        """Devuelve el contexto de una ejecución, consultándolo una sola vez si se recibe un ID"""
+        if isinstance(execution_id, Ejecucion):
+            return execution_id
+        if execution_id not in self._ejecuciones:
+            async with self.conn.cursor() as cursor:
+                await cursor.execute(
+                    "SELECT metodo_aplicado_id, fecha FROM ResultadoEjecucion WHERE executionId = %s",
+                    (execution_id,)
+                )
+                self._ejecuciones[execution_id] = Ejecucion(execution_id, *(await cursor.fetchone()))
+        return self._ejecuciones[execution_id]
+
+    async def guardar_resultado_columna(self, execution_id, nombre_tabla, nombre_atributo, valor):
+        """
+        Encola el resultado de una columna.
+        """
+        try:
+            ejecucion = await self._obtener_ejecucion(execution_id)
+            calidad = ejecucion.calidad(valor['valor'])
+            await self._encolar_resultado(
+                'resultadoColumna',
+                ['executionId', 'nombreTabla', 'nombreAtributo', 'valorCD', 'valor_num', 'calidad'],
+                (ejecucion.execution_id, nombre_tabla, nombre_atributo, Jsonb(valor), valor_numerico(valor), calidad),
+                ejecucion
+            )
+        except Exception as e:
+            print(f"Error al guardar resultado de columna: {e}")
+            raise
+
+    async def guardar_resultado_celda_fila(self, execution_id, nombre_tabla, nombre_atributo, id_tupla, valor):
+        """
+        Encola el resultado de una celda de fila.
+        """
+        try:
+            ejecucion = await self._obtener_ejecucion(execution_id)
+            calidad = ejecucion.calidad(valor['valor'])
+            await self._encolar_resultado(
+                'resultadoCeldaFila',
+                ['executionId', 'nombreTabla', 'nombreAtributo', 'idTupla', 'valorCD', 'valor_num', 'calidad'],
+                (ejecucion.execution_id, nombre_tabla, nombre_atributo, id_tupla, Jsonb(valor),
+                 valor_numerico(valor), calidad),
+                ejecucion
+            )
+        except Exception as e:
+            print(f"Error al guardar resultado de celda de fila: {e}")
+            raise
+
+    async def obtener_resultados_ejecucion(self, execution_id):
+        """
+        Obtiene todos los resultados de una ejecución específica, luego de volcar
+        los que siguen encolados
+
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+
+        Returns:
+            dict: Diccionario con los resultados de la ejecución
+        """
+        try:
+            await self.flush()
+            execution_id = str(execution_id)
+            resultados = {
+                'celdas': [],
+                'columnas': []
+            }
+
+            async with self.conn.cursor() as cursor:
+                await cursor.execute(
+                    """
+                    SELECT nombreTabla, nombreAtributo, idTupla, valorCD
+                    FROM resultadoCeldaFila
+                    WHERE executionId = %s
+                    """,
+                    (execution_id,)
+                )
+                async for row in cursor:
+                    resultados['celdas'].append({
+                        'tabla': row[0],
+                        'atributo': row[1],
+                        'tupla': row[2],
+                        'valor': row[3]
+                    })
+
+                await cursor.execute(
+                    """
+                    SELECT nombreTabla, nombreAtributo, valorCD
+                    FROM resultadoColumna
+                    WHERE executionId = %s
+                    """,
+                    (execution_id,)
+                )
+                async for row in cursor:
+                    resultados['columnas'].append({
+                        'tabla': row[0],
+                        'atributo': row[1],
+                        'valor': row[2]
+                    })
+
+                return resultados
+
+        except Exception as e:
+            print(f"Error al obtener resultados: {e}")
+            raise
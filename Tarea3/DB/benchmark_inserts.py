@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import argparse
+
+# Permite ejecutar este archivo como script (python DB/benchmark_inserts.py) e importar el paquete DB
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from DB.db_operations import DBOperations
+
+# Método aplicado usado para las ejecuciones de prueba (se borran al terminar)
+METODO_BENCHMARK = 'Densidad-Grado-Contar_ap'
+
+def medir(preparado, filas):
+    """
+    Inserta `filas` resultados de celda uno por uno y mide el tiempo total y el
+    tiempo de CPU del cliente.
+
+    Args:
+        preparado (bool): True para sentencias preparadas y JSONB binario, False para el camino
+            anterior (sin preparar nunca y JSONB como texto)
+        filas (int): Cantidad de resultados a insertar
+
+    Returns:
+        dict: Tiempos medidos
+    """
+    db = DBOperations(preparado=preparado)
+    try:
+        ejecucion = db.crear_ejecucion(metodo=METODO_BENCHMARK)
+        inicio_total = time.perf_counter()
+        inicio_cpu = time.process_time()
+        for i in range(filas):
+            db.guardar_resultado_celda_fila(
+                execution_id=ejecucion,
+                nombre_tabla='benchmark',
+                nombre_atributo='valor',
+                id_tupla=str(i),
+                valor={'id': 'float', 'valor': i % 100}
+            )
+        db.flush()
+        total = time.perf_counter() - inicio_total
+        cpu = time.process_time() - inicio_cpu
+
+        with db.conn.cursor() as cursor:
+            cursor.execute("DELETE FROM ResultadoEjecucion WHERE executionId = %s", (str(ejecucion),))
+
+        return {'total': total, 'cpu_cliente': cpu}
+    finally:
+        db.close()
+
+def comparar(variantes, filas, repeticiones):
+    """
+    Mide cada variante `repeticiones` veces tras una ronda de calentamiento descartada
+    (caché del servidor, conexiones y planes en frío), alternando el orden entre
+    rondas para que ninguna variante corra siempre primero.
+
+    Args:
+        variantes (dict): Nombre de la variante -> valor de `preparado`
+        filas (int): Cantidad de resultados a insertar por medición
+        repeticiones (int): Mediciones por variante
+
+    Returns:
+        dict: Nombre de la variante -> tiempos de su mejor repetición (menor total)
+    """
+    for preparado in variantes.values():
+        medir(preparado, filas)
+
+    mejores = {}
+    orden = list(variantes.items())
+    for ronda in range(repeticiones):
+        for nombre, preparado in (orden if ronda % 2 == 0 else reversed(orden)):
+            tiempos = medir(preparado, filas)
+            if nombre not in mejores or tiempos['total'] < mejores[nombre]['total']:
+                mejores[nombre] = tiempos
+    return {nombre: mejores[nombre] for nombre in variantes}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara las escrituras de resultados con y sin sentencias preparadas y JSONB binario"
+    )
+    parser.add_argument('--filas', type=int, default=10000, help="Resultados a insertar por variante")
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help="Mediciones por variante (se informa la mejor), tras una ronda de calentamiento")
+    args = parser.parse_args()
+    if args.filas < 1:
+        parser.error("--filas debe ser al menos 1")
+    if args.repeticiones < 1:
+        parser.error("--repeticiones debe ser al menos 1")
+
+    resultados = comparar({
+        'Sin preparar (texto, json.dumps)': False,
+        'Preparado + JSONB binario': True,
+    }, args.filas, args.repeticiones)
+
+    print(f"\n{'='*20} Escritura de {args.filas} resultados de celda "
+          f"(mejor de {args.repeticiones}) {'='*20}")
+    print(f"{'Variante':<40} {'Total (s)':>10} {'µs/fila':>10} {'CPU cliente µs/fila':>20} {'Resto µs/fila':>15}")
+    for nombre, tiempos in resultados.items():
+        por_fila = tiempos['total'] / args.filas * 1e6
+        cpu_por_fila = tiempos['cpu_cliente'] / args.filas * 1e6
+        # El resto es red + servidor (parseo, planificación y ejecución)
+        print(f"{nombre:<40} {tiempos['total']:>10.2f} {por_fila:>10.1f} {cpu_por_fila:>20.1f} {por_fila - cpu_por_fila:>15.1f}")
@@ -0,0 +1,31 @@
+import zlib
+import numpy as np
+
+def comprimir_bitmap(validos):
+    """
+    Empaqueta un resultado válido/inválido por tupla en un bit por tupla y lo
+    comprime con zlib. Las tuplas se identifican por su posición (0, 1, 2, ...)
+    en el orden del archivo.
+
+    Args:
+        validos: Secuencia de booleanos (lista, array de numpy o Series de pandas)
+
+    Returns:
+        tuple: (bitmap comprimido en bytes, total de tuplas, cantidad de fallos)
+    """
+    bits = np.asarray(validos, dtype=bool)
+    total = len(bits)
+    fallos = total - int(np.count_nonzero(bits))
+    return zlib.compress(np.packbits(bits).tobytes(), 9), total, fallos
+
+def descomprimir_bitmap(bitmap, total):
+    """
+    Args:
+        bitmap (bytes): Bitmap generado por comprimir_bitmap
+        total (int): Total de tuplas
+
+    Returns:
+        numpy.ndarray: Array booleano con True en las tuplas válidas
+    """
+    bits = np.frombuffer(zlib.decompress(bitmap), dtype=np.uint8)
+    return np.unpackbits(bits, count=total).astype(bool)
@@ -1,38 +1,269 @@
 import psycopg
+from psycopg.types.json import Jsonb, JsonbBinaryDumper
 import json
-from datetime import datetime
 import uuid
+import time
 from dotenv import load_dotenv
 import os
-from DB.quality_utils import get_quality_rating, METRIC_TYPES
+import numbers
+import numpy as np
+import pandas as pd
+from DB.quality_utils import get_quality_rating, METRIC_TYPES, UMBRALES_CALIDAD
+from DB.init_db import obtener_modo_particion, sentencias_particiones, parametros_conexion
+from DB.sqlite_backend import conectar_sqlite
+from DB.bitmap import comprimir_bitmap, descomprimir_bitmap
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
+# Variable de entorno con la que un lanzador de varias métricas evita que cada conexión
+# refresque el resumen de calidad al cerrarse; el lanzador lo refresca una vez al final
+VARIABLE_REFRESCO_DIFERIDO = 'DB_REFRESCO_DIFERIDO'
+
+def valor_numerico(valor):
+    """
+    Valor numérico de un resultado para la columna valor_num
+    
+    Args:
+        valor (dict): Valor del resultado en formato JSON ({'id': ..., 'valor': ...})
+    
+    Returns:
+        float: valor['valor'] como float, o None si no es un número
+    """
+    numero = valor.get('valor') if isinstance(valor, dict) else None
+    if isinstance(numero, numbers.Real) and not isinstance(numero, bool):
+        return float(numero)
+    return None
+
+def escalar_python(valor):
+    """Convierte un escalar de numpy (np.int64, np.float64, ...) al tipo de Python, que JSON sí serializa"""
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+def sentencia_resultado(tabla, columnas, con_fecha):
+    """
+    INSERT de un resultado. Con las tablas de resultados particionadas por mes se
+    escribe también la clave de partición 'fecha', con la fecha de la ejecución: así
+    todos sus resultados caen en la misma partición aunque se inserten más tarde.
+    
+    Args:
+        tabla (str): Tabla de resultados
+        columnas (list): Columnas a insertar, sin 'fecha'
+        con_fecha (bool): True si la tabla está particionada por fecha
+    
+    Returns:
+        str: Sentencia con un %s por columna ('fecha' al final)
+    """
+    if con_fecha:
+        columnas = columnas + ['fecha']
+    return f"""
+    INSERT INTO {tabla} 
+    ({', '.join(columnas)})
+    VALUES ({', '.join(['%s'] * len(columnas))})
+    """
+
+def crear_pool(min_size=1, max_size=4):
+    """
+    Crea un pool de conexiones para compartir entre varias instancias de DBOperations
+    (por ejemplo una por hilo) sin repetir el handshake de conexión.
+    
+    Args:
+        min_size (int): Conexiones que el pool mantiene abiertas
+        max_size (int): Máximo de conexiones prestadas a la vez
+    
+    Returns:
+        ConnectionPool: Pool abierto; cerrarlo con pool.close() al terminar
+    """
+    if ConnectionPool is None:
+        raise ImportError("El modo pool requiere el paquete psycopg_pool (pip install psycopg-pool)")
+    return ConnectionPool(
+        kwargs={**parametros_conexion(), 'autocommit': True},
+        min_size=min_size,
+        max_size=max_size,
+        open=True
+    )
+
+def crear_db_operations(**kwargs):
+    """
+    Crea el destino de resultados de las métricas: DBOperations, o un SpoolDBOperations
+    que escribe en archivos locales si la variable DB_SPOOL_DIR está definida.
+    """
+    if os.getenv('DB_SPOOL_DIR'):
+        from DB.spool import SpoolDBOperations
+        return SpoolDBOperations()
+    return DBOperations(**kwargs)
+
+class Ejecucion:
+    """
+    Contexto de una ejecución: guarda el método aplicado, si su métrica es inversa y
+    sus umbrales de calidad, para que las escrituras no necesiten consultarlos.
+    La fecha es la registrada en ResultadoEjecucion (clave de partición por mes).
+    """
+    def __init__(self, execution_id, metodo_aplicado, fecha=None):
+        self.execution_id = execution_id
+        self.metodo_aplicado = metodo_aplicado
+        self.fecha = fecha
+        self.is_inverse = METRIC_TYPES.get(metodo_aplicado, False)
+        self.umbrales = UMBRALES_CALIDAD[self.is_inverse]
+
+    def calidad(self, porcentaje):
+        """Calificación de calidad de un porcentaje según el tipo de métrica"""
+        return get_quality_rating(porcentaje, self.is_inverse, self.umbrales)
+
+    def __str__(self):
+        return self.execution_id
+
+    def __repr__(self):
+        return f"Ejecucion({self.execution_id!r}, {self.metodo_aplicado!r})"
+
 class DBOperations:
-    def __init__(self):
+    def __init__(self, batch_size=None, flush_interval=None, pool=None, backend=None, preparado=True):
+        """
+        Args:
+            batch_size (int): Si se indica, activa el modo buffer: los resultados se encolan
+                y se insertan en lote al alcanzar esta cantidad
+            flush_interval (float): Segundos máximos que un resultado puede esperar en el
+                buffer antes de insertarse (también activa el modo buffer)
+            pool (ConnectionPool): Si se indica, la conexión se toma prestada del pool
+                (ver crear_pool) y se devuelve en close() en lugar de cerrarse
+            backend (str): 'postgres' o 'sqlite' (archivo local DB_SQLITE_PATH);
+                por defecto DB_BACKEND o 'postgres'
+            preparado (bool): Escrituras con sentencias preparadas en el servidor y JSONB
+                en formato binario; False usa el camino anterior (texto con json.dumps, sin preparar)
+        """
+        self.backend = backend or os.getenv('DB_BACKEND', 'postgres')
+        if self.backend == 'sqlite':
+            if pool is not None:
+                raise ValueError("El backend SQLite no usa pool de conexiones")
+            # En SQLite cada commit es un fsync: agrupar las escrituras en transacciones
+            if batch_size is None and flush_interval is None:
+                batch_size = 1000
         self.conn = None
+        self.pool = pool
+        self.preparado = preparado
+        self._ejecuciones = {}
+        self._bitmaps = {}
+        self._resumen_desactualizado = False
+        self._modo_particion = None
+        self._modo_particion_consultado = False
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pendientes = {}
+        self._cantidad_pendiente = 0
+        self._ultimo_flush = time.monotonic()
         self.connect()
 
     def connect(self):
         """Establece conexión con la base de datos"""
         try:
-            self.conn = psycopg.connect(
-                user=os.getenv('DB_USER'),
-                password=os.getenv('DB_PASSWORD'),
-                host=os.getenv('DB_HOST'),
-                port=os.getenv('DB_PORT'),
-                dbname=os.getenv('DB_NAME')
-            )
+            if self.backend == 'sqlite':
+                self.conn = conectar_sqlite()
+            elif self.pool is not None:
+                self.conn = self.pool.getconn()
+            else:
+                self.conn = psycopg.connect(**parametros_conexion())
             self.conn.autocommit = True
+            if self.preparado and self.backend != 'sqlite':
+                # Con %s, psycopg usa el último dumper registrado: JSONB binario en lugar de texto
+                self.conn.adapters.register_dumper(Jsonb, JsonbBinaryDumper)
         except Exception as e:
             print(f"Error al conectar con la base de datos: {e}")
             raise
 
     def close(self):
-        """Cierra la conexión con la base de datos"""
+        """
+        Vuelca los resultados pendientes y cierra la conexión con la base de datos,
+        o la devuelve al pool si fue prestada
+        """
         if self.conn:
-            self.conn.close()
+            try:
+                self.flush()
+                if self._resumen_desactualizado and not os.getenv(VARIABLE_REFRESCO_DIFERIDO):
+                    self._refrescar_resumen_al_cerrar()
+            finally:
+                if self.pool is not None:
+                    self.pool.putconn(self.conn)
+                else:
+                    self.conn.close()
+                self.conn = None
+
+    def _refrescar_resumen_al_cerrar(self):
+        """Refresca el resumen de calidad sin impedir el cierre si falla (es un dato derivado)"""
+        try:
+            self.refrescar_resumen_calidad()
+        except Exception as e:
+            print(f"Error al refrescar el resumen de calidad: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def buffered(self):
+        """True si los resultados se encolan en lugar de insertarse de inmediato"""
+        return self.batch_size is not None or self.flush_interval is not None
+
+    def _insertar(self, sql, params):
+        """
+        Ejecuta un INSERT de resultado, o lo encola si el modo buffer está activo.
+        El límite de tiempo se evalúa al encolar, no hay un hilo de fondo.
+        """
+        if not self.buffered:
+            with self.conn.cursor() as cursor:
+                # prepare=False en el camino anterior: con None psycopg prepararía la sentencia
+                # tras cinco ejecuciones y no serviría de línea base
+                cursor.execute(sql, params, prepare=self.preparado)
+            return
+
+        self._pendientes.setdefault(sql, []).append(params)
+        self._cantidad_pendiente += 1
+
+        lleno = self.batch_size is not None and self._cantidad_pendiente >= self.batch_size
+        vencido = (self.flush_interval is not None and
+                   time.monotonic() - self._ultimo_flush >= self.flush_interval)
+        if lleno or vencido:
+            self.flush()
+
+    def _particion_por_fecha(self):
+        """True si las tablas de resultados están particionadas por mes (consulta una sola vez)"""
+        if not self._modo_particion_consultado:
+            if self.backend != 'sqlite':
+                with self.conn.cursor() as cursor:
+                    self._modo_particion = obtener_modo_particion(cursor)
+            self._modo_particion_consultado = True
+        return self._modo_particion == 'fecha'
+
+    def _insertar_resultado(self, tabla, columnas, params, ejecucion):
+        """Inserta (o encola) un resultado agregando la fecha de la ejecución si es clave de partición"""
+        con_fecha = self._particion_por_fecha()
+        if con_fecha:
+            params = params + (ejecucion.fecha,)
+        self._insertar(sentencia_resultado(tabla, columnas, con_fecha), params)
+
+    def _valor_json(self, valor):
+        """Adapta valorCD: Jsonb (binario) con sentencias preparadas, texto JSON en el camino anterior"""
+        return Jsonb(valor) if self.preparado else json.dumps(valor)
+
+    def flush(self):
+        """Inserta con executemany, en una sola transacción, todos los resultados encolados"""
+        if self._pendientes:
+            try:
+                with self.conn.transaction():
+                    with self.conn.cursor() as cursor:
+                        for sql, filas in self._pendientes.items():
+                            cursor.executemany(sql, filas)
+            except Exception as e:
+                print(f"Error al volcar resultados pendientes: {e}")
+                raise
+            self._pendientes = {}
+            self._cantidad_pendiente = 0
+        self._ultimo_flush = time.monotonic()
 
     def crear_ejecucion(self, metodo):
         """
@@ -42,44 +273,71 @@ class DBOperations:
             metodo (str): ID del método aplicado
         
         Returns:
-            str: ID de la ejecución creada
+            Ejecucion: Contexto de la ejecución creada (str() devuelve su ID)
         """
         try:
             execution_id = str(uuid.uuid4())
-            with self.conn.cursor() as cursor:
-                # Crear ejecución
+            # Una transacción: el advisory lock de las particiones se libera al terminarla
+            with self.conn.transaction(), self.conn.cursor() as cursor:
+                # Crear ejecución; su fecha es la clave de partición de sus resultados
                 cursor.execute(
-                    "INSERT INTO ResultadoEjecucion (executionId, metodo_aplicado_id) VALUES (%s, %s)",
+                    "INSERT INTO ResultadoEjecucion (executionId, metodo_aplicado_id) VALUES (%s, %s) "
+                    "RETURNING fecha",
                     (execution_id, metodo)
                 )
+                fecha = cursor.fetchone()[0]
+                
+                # Si las tablas de resultados están particionadas, crear las particiones
+                self._particion_por_fecha()
+                for sentencia in sentencias_particiones(self._modo_particion, execution_id, fecha):
+                    cursor.execute(sentencia)
                 
-                return execution_id
+            ejecucion = Ejecucion(execution_id, metodo, fecha)
+            self._ejecuciones[execution_id] = ejecucion
+            # El resumen de calidad se refresca al cerrar, cuando la ejecución está completa
+            self._resumen_desactualizado = True
+            return ejecucion
                 
         except Exception as e:
             print(f"Error al crear ejecución: {e}")
             raise
 
+    def _obtener_ejecucion(self, execution_id):
+        """
+        Devuelve el contexto de una ejecución. Si se recibe un ID en lugar de un
+        Ejecucion, consulta su método aplicado una sola vez y lo guarda en caché.
+        """
+        if isinstance(execution_id, Ejecucion):
+            return execution_id
+        if execution_id not in self._ejecuciones:
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT metodo_aplicado_id, fecha FROM ResultadoEjecucion WHERE executionId = %s",
+                    (execution_id,)
+                )
+                self._ejecuciones[execution_id] = Ejecucion(execution_id, *cursor.fetchone())
+        return self._ejecuciones[execution_id]
+
     def guardar_resultado_celda(self, execution_id, nombre_tabla, nombre_atributo, id_tupla, valor):
         """
         Guarda el resultado de una celda específica
         
         Args:
-            execution_id (str): ID de la ejecución
+            execution_id (Ejecucion | str): Ejecución o su ID
             nombre_tabla (str): Nombre de la tabla
             nombre_atributo (str): Nombre del atributo
             id_tupla (str): ID de la tupla
             valor (dict): Valor a guardar en formato JSON
         """
         try:
-            with self.conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    INSERT INTO resultadoCeldaFila 
-                    (executionId, nombreTabla, nombreAtributo, idTupla, valorCD)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (execution_id, nombre_tabla, nombre_atributo, id_tupla, json.dumps(valor))
-                )
+            ejecucion = self._obtener_ejecucion(execution_id)
+            self._insertar_resultado(
+                'resultadoCeldaFila',
+                ['executionId', 'nombreTabla', 'nombreAtributo', 'idTupla', 'valorCD', 'valor_num'],
+                (ejecucion.execution_id, nombre_tabla, nombre_atributo, id_tupla, self._valor_json(valor),
+                 valor_numerico(valor)),
+                ejecucion
+            )
         except Exception as e:
             print(f"Error al guardar resultado de celda: {e}")
             raise
@@ -89,33 +347,23 @@ class DBOperations:
         Guarda el resultado de una columna en la base de datos.
         """
         try:
-            with self.conn.cursor() as cursor:
-                # Obtener el método aplicado para esta ejecución
-                cursor.execute(
-                    "SELECT metodo_aplicado_id FROM ResultadoEjecucion WHERE executionId = %s",
-                    (execution_id,)
-                )
-                metodo_aplicado = cursor.fetchone()[0]
-                
-                # Determinar si la métrica es inversa
-                is_inverse = METRIC_TYPES.get(metodo_aplicado, False)
-                
-                # Obtener el porcentaje del valor
-                porcentaje = valor['valor']
-                
-                # Determinar la calidad
-                calidad = get_quality_rating(porcentaje, is_inverse)
-                
-                # Insertar el resultado con la calidad
-                cursor.execute(
-                    """
-                    INSERT INTO resultadoColumna 
-                    (executionId, nombreTabla, nombreAtributo, valorCD, calidad)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (execution_id, nombre_tabla, nombre_atributo, json.dumps(valor), calidad)
-                )
-                self.conn.commit()
+            # Contexto de la ejecución (método aplicado y umbrales, sin consultas)
+            ejecucion = self._obtener_ejecucion(execution_id)
+            
+            # Obtener el porcentaje del valor
+            porcentaje = valor['valor']
+            
+            # Determinar la calidad
+            calidad = ejecucion.calidad(porcentaje)
+            
+            # Insertar el resultado con la calidad
+            self._insertar_resultado(
+                'resultadoColumna',
+                ['executionId', 'nombreTabla', 'nombreAtributo', 'valorCD', 'valor_num', 'calidad'],
+                (ejecucion.execution_id, nombre_tabla, nombre_atributo, self._valor_json(valor),
+                 valor_numerico(valor), calidad),
+                ejecucion
+            )
         except Exception as e:
             print(f"Error al guardar resultado de columna: {e}")
             raise
@@ -125,72 +373,226 @@ class DBOperations:
         Guarda el resultado de una celda de fila en la base de datos.
         """
         try:
+            # Contexto de la ejecución (método aplicado y umbrales, sin consultas)
+            ejecucion = self._obtener_ejecucion(execution_id)
+            
+            # Obtener el porcentaje del valor
+            porcentaje = valor['valor']
+            
+            # Determinar la calidad
+            calidad = ejecucion.calidad(porcentaje)
+            
+            # Insertar el resultado con la calidad
+            self._insertar_resultado(
+                'resultadoCeldaFila',
+                ['executionId', 'nombreTabla', 'nombreAtributo', 'idTupla', 'valorCD', 'valor_num', 'calidad'],
+                (ejecucion.execution_id, nombre_tabla, nombre_atributo, id_tupla, self._valor_json(valor),
+                 valor_numerico(valor), calidad),
+                ejecucion
+            )
+        except Exception as e:
+            print(f"Error al guardar resultado de celda de fila: {e}")
+            raise
+
+    def copiar_resultados_celda_fila(self, execution_id, nombre_tabla, nombre_atributo, filas):
+        """
+        Carga masiva de resultados de celda con COPY ... FROM STDIN (en SQLite, con
+        executemany en una transacción).
+        
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+            nombre_tabla (str): Nombre de la tabla
+            nombre_atributo (str): Nombre del atributo
+            filas: Iterable de tuplas (idTupla, valor, calidad) o DataFrame con esas
+                columnas. Si valor es un número se guarda como {'id': 'float', 'valor': valor};
+                si calidad es None o NaN se calcula a partir del método aplicado
+        
+        Returns:
+            int: Cantidad de filas cargadas
+        """
+        try:
+            if hasattr(filas, 'itertuples'):
+                filas = filas[['idTupla', 'valor', 'calidad']].itertuples(index=False, name=None)
+            
+            # El contexto y el particionado deben resolverse antes de abrir el COPY en la conexión
+            ejecucion = self._obtener_ejecucion(execution_id)
+            con_fecha = self._particion_por_fecha()
+            columnas = ['executionId', 'nombreTabla', 'nombreAtributo', 'idTupla', 'valorCD', 'valor_num', 'calidad']
+            
+            def completar(filas):
+                for id_tupla, valor, calidad in filas:
+                    if isinstance(valor, dict):
+                        valor = {clave: escalar_python(v) for clave, v in valor.items()}
+                    else:
+                        valor = {'id': 'float', 'valor': escalar_python(valor)}
+                    # En un DataFrame la calidad faltante llega como NaN, no como None
+                    if pd.isna(calidad):
+                        calidad = ejecucion.calidad(valor['valor'])
+                    fila = (ejecucion.execution_id, nombre_tabla, nombre_atributo,
+                            str(id_tupla), Jsonb(valor), valor_numerico(valor), calidad)
+                    yield (fila + (ejecucion.fecha,)) if con_fecha else fila
+            
+            if self.backend == 'sqlite':
+                # SQLite no tiene COPY: una sola transacción con executemany
+                filas = list(completar(filas))
+                with self.conn.transaction():
+                    with self.conn.cursor() as cursor:
+                        cursor.executemany(sentencia_resultado('resultadoCeldaFila', columnas, con_fecha), filas)
+                return len(filas)
+            
+            if con_fecha:
+                columnas = columnas + ['fecha']
+            cantidad = 0
+            with self.conn.cursor() as cursor:
+                with cursor.copy(
+                    f"""
+                    COPY resultadoCeldaFila 
+                    ({', '.join(columnas)})
+                    FROM STDIN
+                    """
+                ) as copy:
+                    for fila in completar(filas):
+                        copy.write_row(fila)
+                        cantidad += 1
+            return cantidad
+        except Exception as e:
+            print(f"Error al copiar resultados de celda de fila: {e}")
+            raise
+
+    def guardar_resultado_bitmap(self, execution_id, nombre_tabla, nombre_atributo, validos):
+        """
+        Guarda el resultado válido/inválido de cada tupla de una columna como un bitmap
+        comprimido (un bit por tupla), en lugar de una fila de resultadoCeldaFila por tupla.
+        
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+            nombre_tabla (str): Nombre de la tabla
+            nombre_atributo (str): Nombre del atributo
+            validos: Secuencia de booleanos, uno por tupla en el orden del archivo
+        
+        Returns:
+            int: Cantidad de tuplas inválidas
+        """
+        try:
+            bitmap, total, fallos = comprimir_bitmap(validos)
+            self._insertar(
+                """
+                INSERT INTO resultadoBitmap 
+                (executionId, nombreTabla, nombreAtributo, total, fallos, bitmap)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                (str(execution_id), nombre_tabla, nombre_atributo, total, fallos, bitmap)
+            )
+            return fallos
+        except Exception as e:
+            print(f"Error al guardar resultado de bitmap: {e}")
+            raise
+
+    def guardar_estadisticas_ejecucion(self, execution_id, estadisticas):
+        """
+        Guarda las estadísticas de rendimiento de una ejecución
+        
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+            estadisticas (dict): Claves tiempo_lectura, tiempo_calculo y tiempo_escritura
+                (segundos), filas, bytes, pico_rss_kb y pico_tracemalloc_kb (estas dos pueden
+                ser None) y cacheado (True si los resultados se tomaron de la caché de
+                métricas; opcional)
+        """
+        try:
+            self._insertar(
+                """
+                INSERT INTO EstadisticasEjecucion 
+                (executionId, tiempo_lectura, tiempo_calculo, tiempo_escritura, filas, bytes,
+                 pico_rss_kb, pico_tracemalloc_kb, cacheado)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                (str(execution_id), estadisticas['tiempo_lectura'], estadisticas['tiempo_calculo'],
+                 estadisticas['tiempo_escritura'], estadisticas['filas'], estadisticas['bytes'],
+                 estadisticas['pico_rss_kb'], estadisticas['pico_tracemalloc_kb'],
+                 estadisticas.get('cacheado', False))
+            )
+        except Exception as e:
+            print(f"Error al guardar estadísticas de la ejecución: {e}")
+            raise
+
+    def _obtener_bitmap(self, execution_id, nombre_tabla, nombre_atributo):
+        """Bitmap descomprimido de una columna; los resultados no cambian, se cachea"""
+        clave = (str(execution_id), nombre_tabla, nombre_atributo)
+        if clave not in self._bitmaps:
+            self.flush()
             with self.conn.cursor() as cursor:
-                # Obtener el método aplicado para esta ejecución
-                cursor.execute(
-                    "SELECT metodo_aplicado_id FROM ResultadoEjecucion WHERE executionId = %s",
-                    (execution_id,)
-                )
-                metodo_aplicado = cursor.fetchone()[0]
-                
-                # Determinar si la métrica es inversa
-                is_inverse = METRIC_TYPES.get(metodo_aplicado, False)
-                
-                # Obtener el porcentaje del valor
-                porcentaje = valor['valor']
-                
-                # Determinar la calidad
-                calidad = get_quality_rating(porcentaje, is_inverse)
-                
-                # Insertar el resultado con la calidad
                 cursor.execute(
                     """
-                    INSERT INTO resultadoCeldaFila 
-                    (executionId, nombreTabla, nombreAtributo, idTupla, valorCD, calidad)
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    SELECT total, bitmap FROM resultadoBitmap
+                    WHERE executionId = %s AND nombreTabla = %s AND nombreAtributo = %s
                     """,
-                    (execution_id, nombre_tabla, nombre_atributo, id_tupla, json.dumps(valor), calidad)
+                    clave
                 )
-                self.conn.commit()
+                fila = cursor.fetchone()
+            if fila is None:
+                raise KeyError(f"No hay resultado de bitmap para {clave}")
+            self._bitmaps[clave] = descomprimir_bitmap(bytes(fila[1]), fila[0])
+        return self._bitmaps[clave]
+
+    def obtener_posiciones_fallidas(self, execution_id, nombre_tabla, nombre_atributo):
+        """
+        Obtiene las posiciones de las tuplas inválidas de un resultado de bitmap
+        
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+            nombre_tabla (str): Nombre de la tabla
+            nombre_atributo (str): Nombre del atributo
+        
+        Returns:
+            numpy.ndarray: Posiciones (0 = primera fila del archivo), en orden
+        """
+        try:
+            return (~self._obtener_bitmap(execution_id, nombre_tabla, nombre_atributo)).nonzero()[0]
         except Exception as e:
-            print(f"Error al guardar resultado de celda de fila: {e}")
+            print(f"Error al obtener posiciones fallidas: {e}")
+            raise
+
+    def es_valido(self, execution_id, nombre_tabla, nombre_atributo, posicion):
+        """
+        Indica si la tupla en una posición pasó la métrica, según su resultado de bitmap
+        
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+            nombre_tabla (str): Nombre de la tabla
+            nombre_atributo (str): Nombre del atributo
+            posicion (int): Posición de la tupla (0 = primera fila del archivo)
+        
+        Returns:
+            bool: True si la tupla es válida
+        """
+        try:
+            return bool(self._obtener_bitmap(execution_id, nombre_tabla, nombre_atributo)[posicion])
+        except Exception as e:
+            print(f"Error al consultar el bitmap: {e}")
             raise
 
     def obtener_resultados_ejecucion(self, execution_id):
         """
-        Obtiene todos los resultados de una ejecución específica
+        Obtiene todos los resultados de una ejecución específica.
+        Para ejecuciones a nivel de fila conviene iterar_resultados_celdas, que no
+        carga todas las celdas en memoria.
         
         Args:
-            execution_id (str): ID de la ejecución
+            execution_id (Ejecucion | str): Ejecución o su ID
         
         Returns:
             dict: Diccionario con los resultados de la ejecución
         """
         try:
+            execution_id = str(execution_id)
             resultados = {
-                'celdas': [],
+                'celdas': list(self.iterar_resultados_celdas(execution_id)),
                 'columnas': []
             }
             
             with self.conn.cursor() as cursor:
-                # Obtener resultados de celdas
-                cursor.execute(
-                    """
-                    SELECT nombreTabla, nombreAtributo, idTupla, valorCD
-                    FROM resultadoCeldaFila
-                    WHERE executionId = %s
-                    """,
-                    (execution_id,)
-                )
-                for row in cursor.fetchall():
-                    resultados['celdas'].append({
-                        'tabla': row[0],
-                        'atributo': row[1],
-                        'tupla': row[2],
-                        'valor': json.loads(row[3])
-                    })
-                
-                # Obtener resultados de columnas
+                # Obtener resultados de columnas (psycopg ya decodifica el JSONB)
                 cursor.execute(
                     """
                     SELECT nombreTabla, nombreAtributo, valorCD
@@ -199,11 +601,11 @@ class DBOperations:
                     """,
                     (execution_id,)
                 )
-                for row in cursor.fetchall():
+                for row in cursor:
                     resultados['columnas'].append({
                         'tabla': row[0],
                         'atributo': row[1],
-                        'valor': json.loads(row[2])
+                        'valor': row[2]
                     })
                 
                 return resultados
@@ -212,6 +614,243 @@ class DBOperations:
             print(f"Error al obtener resultados: {e}")
             raise
 
+    def _abrir_conexion_lectura(self):
+        """
+        Conexión aparte para lecturas que quedan abiertas entre llamadas (generadores),
+        para que su transacción no envuelva las escrituras hechas por self.conn
+        """
+        if self.backend == 'sqlite':
+            return conectar_sqlite()
+        if self.pool is not None:
+            return self.pool.getconn()
+        return psycopg.connect(**parametros_conexion(), autocommit=True)
+
+    def _cerrar_conexion_lectura(self, conn):
+        """Cierra una conexión de _abrir_conexion_lectura, o la devuelve al pool"""
+        if self.pool is not None:
+            self.pool.putconn(conn)
+        else:
+            conn.close()
+
+    def iterar_resultados_celdas(self, execution_id, fetch_size=10000):
+        """
+        Recorre los resultados de celda de una ejecución con un cursor del lado del
+        servidor, trayendo fetch_size filas por viaje. La lectura usa su propia conexión:
+        se puede seguir escribiendo mientras se recorre, y la conexión se cierra al
+        terminar o al cerrar el generador.
+        
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+            fetch_size (int): Filas traídas del servidor en cada viaje
+        
+        Yields:
+            dict: Resultado de una celda ('tabla', 'atributo', 'tupla', 'valor')
+        """
+        try:
+            self.flush()
+            conn = self._abrir_conexion_lectura()
+            try:
+                # Los cursores con nombre necesitan una transacción abierta
+                with conn.transaction():
+                    with conn.cursor(name=f"celdas_{uuid.uuid4().hex}") as cursor:
+                        cursor.itersize = fetch_size
+                        cursor.execute(
+                            """
+                            SELECT nombreTabla, nombreAtributo, idTupla, valorCD
+                            FROM resultadoCeldaFila
+                            WHERE executionId = %s
+                            """,
+                            (str(execution_id),)
+                        )
+                        for row in cursor:
+                            yield {
+                                'tabla': row[0],
+                                'atributo': row[1],
+                                'tupla': row[2],
+                                'valor': row[3]
+                            }
+            finally:
+                self._cerrar_conexion_lectura(conn)
+        except Exception as e:
+            print(f"Error al recorrer resultados de celdas: {e}")
+            raise
+
+    def obtener_pagina_celdas(self, execution_id, nombre_tabla, nombre_atributo, despues_de=None, limite=1000):
+        """
+        Devuelve una página de resultados de celda de un atributo, ordenada por idTupla
+        (paginación por clave usando la clave primaria, sin OFFSET).
+        
+        Args:
+            execution_id (Ejecucion | str): Ejecución o su ID
+            nombre_tabla (str): Nombre de la tabla
+            nombre_atributo (str): Nombre del atributo
+            despues_de (str): idTupla de la última fila de la página anterior (None = primera página)
+            limite (int): Tamaño de la página
+        
+        Returns:
+            list: Resultados de la página; vacía cuando no hay más filas
+        """
+        try:
+            self.flush()
+            params = [str(execution_id), nombre_tabla, nombre_atributo]
+            # Condición separada para que el planificador recorra el índice de la PK por rango
+            condicion_clave = ""
+            if despues_de is not None:
+                condicion_clave = "AND idTupla > %s"
+                params.append(despues_de)
+            params.append(limite)
+            
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT idTupla, valorCD, calidad
+                    FROM resultadoCeldaFila
+                    WHERE executionId = %s AND nombreTabla = %s AND nombreAtributo = %s
+                    {condicion_clave}
+                    ORDER BY idTupla
+                    LIMIT %s
+                    """,
+                    params
+                )
+                return [
+                    {
+                        'tabla': nombre_tabla,
+                        'atributo': nombre_atributo,
+                        'tupla': row[0],
+                        'valor': row[1],
+                        'calidad': row[2]
+                    }
+                    for row in cursor
+                ]
+        except Exception as e:
+            print(f"Error al obtener página de celdas: {e}")
+            raise
+
+    def refrescar_resumen_calidad(self):
+        """
+        Recalcula el resumen de calidad por dimensión, factor y tabla (vista materializada
+        resumenCalidad). close() lo llama automáticamente si se crearon ejecuciones,
+        salvo que DB_REFRESCO_DIFERIDO esté definida. En SQLite el resumen es una vista común y no necesita refrescarse.
+        """
+        self.flush()
+        if self.backend != 'sqlite':
+            try:
+                with self.conn.cursor() as cursor:
+                    # CONCURRENTLY: los lectores del resumen no se bloquean durante el refresco
+                    cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY resumenCalidad")
+            except Exception as e:
+                print(f"Error al refrescar el resumen de calidad: {e}")
+                raise
+        self._resumen_desactualizado = False
+
+    def obtener_resumen_calidad(self):
+        """
+        Obtiene el resumen de calidad
+        
+        Returns:
+            list: Un diccionario por dimensión, factor y tabla con su puntaje (0-100, alto = bueno)
+        """
+        try:
+            # En SQLite el resumen es una vista: debe incluir los resultados aún en el buffer
+            self.flush()
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT dimension, factor, nombreTabla, puntaje, cantidad_resultados
+                    FROM resumenCalidad
+                    ORDER BY dimension, factor, nombreTabla
+                    """
+                )
+                return [
+                    {
+                        'dimension': row[0],
+                        'factor': row[1],
+                        'tabla': row[2],
+                        'puntaje': row[3],
+                        'cantidad_resultados': row[4]
+                    }
+                    for row in cursor
+                ]
+        except Exception as e:
+            print(f"Error al obtener el resumen de calidad: {e}")
+            raise
+
+    def obtener_historial_metrica(self, metodo, nombre_tabla, nombre_atributo, limite=None):
+        """
+        Obtiene la serie temporal del resultado de una métrica para una tabla y atributo
+        a lo largo de las ejecuciones (índices por método y fecha, y por tabla y atributo)
+        
+        Args:
+            metodo (str): ID del método aplicado
+            nombre_tabla (str): Nombre de la tabla
+            nombre_atributo (str): Nombre del atributo
+            limite (int): Si se indica, solo las últimas `limite` ejecuciones
+        
+        Returns:
+            list: Resultados ordenados de la ejecución más antigua a la más reciente; 'valor'
+                es valor_num (None si el resultado no es numérico)
+        """
+        try:
+            self.flush()
+            params = [metodo, nombre_tabla, nombre_atributo]
+            clausula_limite = ""
+            if limite is not None:
+                clausula_limite = "LIMIT %s"
+                params.append(limite)
+            
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT e.executionId, e.fecha, rc.valor_num, rc.calidad
+                    FROM ResultadoEjecucion e
+                    JOIN resultadoColumna rc ON rc.executionId = e.executionId
+                    WHERE e.metodo_aplicado_id = %s AND rc.nombreTabla = %s AND rc.nombreAtributo = %s
+                    ORDER BY e.fecha DESC
+                    {clausula_limite}
+                    """,
+                    params
+                )
+                historial = [
+                    {
+                        'ejecucion': row[0],
+                        'fecha': row[1],
+                        'valor': row[2],
+                        'calidad': row[3]
+                    }
+                    for row in cursor
+                ]
+                historial.reverse()
+                return historial
+        except Exception as e:
+            print(f"Error al obtener el historial de la métrica: {e}")
+            raise
+
+    def obtener_delta_metrica(self, metodo, nombre_tabla, nombre_atributo):
+        """
+        Compara el resultado de las dos últimas ejecuciones de una métrica
+        
+        Args:
+            metodo (str): ID del método aplicado
+            nombre_tabla (str): Nombre de la tabla
+            nombre_atributo (str): Nombre del atributo
+        
+        Returns:
+            dict: Resultados 'anterior' y 'ultimo' y su diferencia 'delta' (None si alguno
+                de los dos valores no es numérico), o None si hay menos de dos ejecuciones
+        """
+        historial = self.obtener_historial_metrica(metodo, nombre_tabla, nombre_atributo, limite=2)
+        if len(historial) < 2:
+            return None
+        anterior, ultimo = historial
+        delta = None
+        if ultimo['valor'] is not None and anterior['valor'] is not None:
+            delta = ultimo['valor'] - anterior['valor']
+        return {
+            'anterior': anterior,
+            'ultimo': ultimo,
+            'delta': delta
+        }
+
 # Ejemplo de uso
 if __name__ == "__main__":
     try:
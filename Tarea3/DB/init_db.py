@@ -1,327 +1,840 @@
 import psycopg
+from psycopg import sql
 import os
+import re
+import sys
+import argparse
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+# Permite ejecutar este archivo como script (python DB/init_db.py) e importar el paquete DB
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from DB.sqlite_backend import conectar_sqlite
+from DB.quality_utils import METRIC_TYPES
+
 # Cargar variables de entorno
 load_dotenv()
 
-def crear_base_datos():
-    """Crea la base de datos y sus tablas"""
-    try:
-        # Primero conectamos a postgres para crear la base de datos
-        conn = psycopg.connect(
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT'),
-            dbname="postgres"
-        )
-        
-        conn.autocommit = True
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT 1 FROM pg_database WHERE datname = 'db_cdi'")
-            if not cursor.fetchone():
-                cursor.execute('CREATE DATABASE db_cdi')
-        
-        conn.close()
-
-        # Ahora conectamos a nuestra base de datos para crear las tablas
-        conn = psycopg.connect(
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT'),
-            dbname=os.getenv('DB_NAME')
-        )
-        
-        with conn.cursor() as cursor:
-            # Crear tablas
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Dimension (
-                Nombre VARCHAR(100) PRIMARY KEY
-            )
-            ''')
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Factor (
-                Nombre VARCHAR(100) PRIMARY KEY,
-                dimension_nombre VARCHAR(100) NOT NULL,
-                FOREIGN KEY (dimension_nombre) REFERENCES Dimension(Nombre)
-            )
-            ''')
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Metrica (
-                id_metrica VARCHAR(50) PRIMARY KEY,
-                factor_nombre VARCHAR(100) NOT NULL,
-                FOREIGN KEY (factor_nombre) REFERENCES Factor(Nombre)
-            )
-            ''')
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Metodo (
-                id_metodo VARCHAR(50) PRIMARY KEY,
-                metrica_id VARCHAR(50) NOT NULL,
-                FOREIGN KEY (metrica_id) REFERENCES Metrica(id_metrica)
-            )
-            ''')
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS MetodoAplicado (
-                id_metodo_aplicado VARCHAR(50) PRIMARY KEY,
-                metodo_id VARCHAR(50) NOT NULL,
-                FOREIGN KEY (metodo_id) REFERENCES Metodo(id_metodo)
-            )
-            ''')
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS ResultadoEjecucion (
-                executionId VARCHAR(50) PRIMARY KEY,
-                metodo_aplicado_id VARCHAR(50) NOT NULL,
-                fecha TIMESTAMPTZ DEFAULT NOW(),
-                FOREIGN KEY (metodo_aplicado_id) REFERENCES MetodoAplicado(id_metodo_aplicado)
-            )
-            ''')
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resultadoCeldaFila (
-                executionId VARCHAR(50) NOT NULL,
-                nombreTabla VARCHAR(100) NOT NULL,
-                nombreAtributo VARCHAR(100) NOT NULL,
-                idTupla VARCHAR(50) NOT NULL,
-                valorCD JSONB NOT NULL,
-                calidad VARCHAR(20) NOT NULL,
-                PRIMARY KEY (executionId, nombreTabla, nombreAtributo, idTupla),
-                FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
-            )
-            ''')
-            
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resultadoColumna (
-                executionId VARCHAR(50) NOT NULL,
-                nombreTabla VARCHAR(100) NOT NULL,
-                nombreAtributo VARCHAR(100) NOT NULL,
-                valorCD JSONB NOT NULL,
-                calidad VARCHAR(20) NOT NULL,
-                PRIMARY KEY (executionId, nombreTabla, nombreAtributo),
-                FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
-            )
-            ''')
-            
-            conn.commit()
-            print("✓ Base de datos y tablas creadas correctamente")
+# Versión del esquema; incrementarla con cada cambio de tablas o datos base
+VERSION_ESQUEMA = 7
 
-    except Exception as e:
-        print(f"Error al crear la base de datos: {e}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
+def parametros_conexion(dbname=None):
+    """Parámetros de conexión a la base de datos leídos de las variables de entorno"""
+    return {
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'host': os.getenv('DB_HOST'),
+        'port': os.getenv('DB_PORT'),
+        'dbname': dbname or os.getenv('DB_NAME')
+    }
 
-def insert_dimensions_and_factors():
-    """Inserta las dimensiones y factores en la base de datos"""
-    try:
-        conn = psycopg.connect(
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT'),
-            dbname=os.getenv('DB_NAME')
-        )
-        
-        # Estructura de datos con dimensiones y sus factores
-        dimensions_factors = {
-            "Exactitud": [
-                "Exactitud Sintactica",
-                "Precision"
-            ],
-            "Completitud": [
-                "Densidad"
-            ],
-            "Consistencia": [
-                "Integridad de Dominio",
-                "Integridad Interrelacion"
-            ],
-            "Unicidad": [
-                "No Duplicacion"
-            ]
-        }
+# Tablas de resultados que pueden crearse particionadas
+TABLAS_RESULTADO = ['resultadoceldafila', 'resultadocolumna']
 
-        with conn.cursor() as cursor:
-            # Insertar cada dimensión y sus factores
-            for dimension, factors in dimensions_factors.items():
-                try:
-                    cursor.execute(
-                        "INSERT INTO Dimension (Nombre) VALUES (%s)",
-                        (dimension,)
-                    )
-                    print(f"✓ Dimensión '{dimension}' insertada correctamente")
-                except Exception as e:
-                    print(f"  - La dimensión '{dimension}' ya existe o hubo un error: {e}")
-                
-                # Para cada factor en la dimensión
-                for factor in factors:
-                    try:
-                        cursor.execute(
-                            "INSERT INTO Factor (Nombre, dimension_nombre) VALUES (%s, %s)",
-                            (factor, dimension)
-                        )
-                        print(f"  ✓ Factor '{factor}' insertado correctamente")
-                    except Exception as e:
-                        print(f"  ✗ Error al insertar factor '{factor}': {e}")
+# Modos de particionado: una partición por ejecución o una por mes de la ejecución
+MODOS_PARTICION = ['ejecucion', 'fecha']
 
-        conn.commit()
-        print("\n✓ Dimensiones y factores insertados correctamente")
+# Consulta de la estrategia de particionado (pg_partitioned_table.partstrat) y su modo
+CONSULTA_MODO_PARTICION = "SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass('resultadocolumna')"
+ESTRATEGIAS_PARTICION = {'l': 'ejecucion', 'r': 'fecha'}
 
-    except Exception as e:
-        print(f"Error al insertar dimensiones y factores: {e}")
-        raise
-    finally:
-        if 'conn' in locals():
+# Estructura de datos con dimensiones y sus factores
+DIMENSIONS_FACTORS = {
+    "Exactitud": [
+        "Exactitud Sintactica",
+        "Precision"
+    ],
+    "Completitud": [
+        "Densidad"
+    ],
+    "Consistencia": [
+        "Integridad de Dominio",
+        "Integridad Interrelacion"
+    ],
+    "Unicidad": [
+        "No Duplicacion"
+    ]
+}
+
+# Estructura de datos con métricas y sus factores asociados
+METRICS_FACTORS = {
+    "ExactSint-ReglaCorrecta": "Exactitud Sintactica",
+    "ExactSint-Desviacion": "Exactitud Sintactica",
+    "Densidad-Grado": "Densidad",
+    "NoDuplicacion-CantDups": "No Duplicacion",
+    "IntDominio-OutBounds-Gen": "Integridad de Dominio",
+    "IntDominio-OutBounds-Esp": "Integridad de Dominio",
+    "Precision-Granularidad": "Precision",
+    "IntInterRel-Pertenece": "Integridad Interrelacion"
+}
+
+# Estructura de datos con métodos, sus aplicados y la métrica asociada
+METHODS_DATA = [
+    {
+        "metodo_id": "ExactSint-ReglaCorrecta-ISBN",
+        "metodo_aplicado_id": "ExactSint-ReglaCorrecta-ISBN_ap",
+        "metrica_id": "ExactSint-ReglaCorrecta"
+    },
+    {
+        "metodo_id": "ExactSint-LeveshteinDistanceInterCSV",
+        "metodo_aplicado_id": "ExactSint-LeveshteinDistanceInterCSV_ap",
+        "metrica_id": "ExactSint-Desviacion"
+    },
+    {
+        "metodo_id": "Densidad-Grado-Contar",
+        "metodo_aplicado_id": "Densidad-Grado-Contar_ap",
+        "metrica_id": "Densidad-Grado"
+    },
+    {
+        "metodo_id": "NoDuplicacion-CantDups-Contar",
+        "metodo_aplicado_id": "NoDuplicacion-CantDups-Contar_ap",
+        "metrica_id": "NoDuplicacion-CantDups"
+    },
+    {
+        "metodo_id": "IntDominio-OutBounds-Gen-ContarNum",
+        "metodo_aplicado_id": "IntDominio-OutBounds-Gen-ContarNum_ap",
+        "metrica_id": "IntDominio-OutBounds-Gen"
+    },
+    {
+        "metodo_id": "IntDominio-OutBounds-Esp-ContarNum",
+        "metodo_aplicado_id": "IntDominio-OutBounds-Esp-ContarNum_ap",
+        "metrica_id": "IntDominio-OutBounds-Esp"
+    },
+    {
+        "metodo_id": "IntInterRel-Pertenencia",
+        "metodo_aplicado_id": "IntInterRel-Pertenencia_ap",
+        "metrica_id": "IntInterRel-Pertenece"
+    },
+    {
+        "metodo_id": "Precision-Fechas",
+        "metodo_aplicado_id": "Precision-Fechas_ap",
+        "metrica_id": "Precision-Granularidad"
+    }
+]
+
+# Resumen de calidad por dimensión, factor y tabla: toma el último resultado de cada
+# método aplicado, tabla y atributo, lo lleva a un puntaje 0-100 donde alto = bueno
+# (las métricas inversas se invierten) y lo promedia a lo largo de la jerarquía
+CONSULTA_RESUMEN_CALIDAD = '''
+    WITH ultimos AS (
+        SELECT DISTINCT ON (e.metodo_aplicado_id, rc.nombreTabla, rc.nombreAtributo)
+               e.metodo_aplicado_id, rc.nombreTabla, rc.valor_num AS valor
+        FROM resultadoColumna rc
+        JOIN ResultadoEjecucion e ON e.executionId = rc.executionId
+        WHERE rc.valor_num IS NOT NULL
+        ORDER BY e.metodo_aplicado_id, rc.nombreTabla, rc.nombreAtributo, e.fecha DESC
+    )
+    SELECT d.Nombre AS dimension, f.Nombre AS factor, u.nombreTabla,
+           AVG(CASE WHEN ma.es_inversa THEN 100 - u.valor ELSE u.valor END) AS puntaje,
+           COUNT(*) AS cantidad_resultados
+    FROM ultimos u
+    JOIN MetodoAplicado ma ON ma.id_metodo_aplicado = u.metodo_aplicado_id
+    JOIN Metodo m ON m.id_metodo = ma.metodo_id
+    JOIN Metrica me ON me.id_metrica = m.metrica_id
+    JOIN Factor f ON f.Nombre = me.factor_nombre
+    JOIN Dimension d ON d.Nombre = f.dimension_nombre
+    GROUP BY d.Nombre, f.Nombre, u.nombreTabla
+'''
+
+# Misma consulta para SQLite, sin DISTINCT ON
+CONSULTA_RESUMEN_CALIDAD_SQLITE = '''
+    WITH ultimos AS (
+        SELECT e.metodo_aplicado_id, rc.nombreTabla, rc.valor_num AS valor,
+               ROW_NUMBER() OVER (
+                   PARTITION BY e.metodo_aplicado_id, rc.nombreTabla, rc.nombreAtributo
+                   ORDER BY e.fecha DESC
+               ) AS orden
+        FROM resultadoColumna rc
+        JOIN ResultadoEjecucion e ON e.executionId = rc.executionId
+        WHERE rc.valor_num IS NOT NULL
+    )
+    SELECT d.Nombre AS dimension, f.Nombre AS factor, u.nombreTabla,
+           AVG(CASE WHEN ma.es_inversa THEN 100 - u.valor ELSE u.valor END) AS puntaje,
+           COUNT(*) AS cantidad_resultados
+    FROM ultimos u
+    JOIN MetodoAplicado ma ON ma.id_metodo_aplicado = u.metodo_aplicado_id
+    JOIN Metodo m ON m.id_metodo = ma.metodo_id
+    JOIN Metrica me ON me.id_metrica = m.metrica_id
+    JOIN Factor f ON f.Nombre = me.factor_nombre
+    JOIN Dimension d ON d.Nombre = f.dimension_nombre
+    WHERE u.orden = 1
+    GROUP BY d.Nombre, f.Nombre, u.nombreTabla
+'''
+
+# Esquema equivalente para el backend SQLite (sin particionado)
+ESQUEMA_SQLITE = [
+    '''
+    CREATE TABLE IF NOT EXISTS Dimension (
+        Nombre VARCHAR(100) PRIMARY KEY
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS Factor (
+        Nombre VARCHAR(100) PRIMARY KEY,
+        dimension_nombre VARCHAR(100) NOT NULL,
+        FOREIGN KEY (dimension_nombre) REFERENCES Dimension(Nombre)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS Metrica (
+        id_metrica VARCHAR(50) PRIMARY KEY,
+        factor_nombre VARCHAR(100) NOT NULL,
+        FOREIGN KEY (factor_nombre) REFERENCES Factor(Nombre)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS Metodo (
+        id_metodo VARCHAR(50) PRIMARY KEY,
+        metrica_id VARCHAR(50) NOT NULL,
+        FOREIGN KEY (metrica_id) REFERENCES Metrica(id_metrica)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS MetodoAplicado (
+        id_metodo_aplicado VARCHAR(50) PRIMARY KEY,
+        metodo_id VARCHAR(50) NOT NULL,
+        es_inversa BOOLEAN NOT NULL DEFAULT FALSE,
+        FOREIGN KEY (metodo_id) REFERENCES Metodo(id_metodo)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS ResultadoEjecucion (
+        executionId VARCHAR(50) PRIMARY KEY,
+        metodo_aplicado_id VARCHAR(50) NOT NULL,
+        fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (metodo_aplicado_id) REFERENCES MetodoAplicado(id_metodo_aplicado)
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_resultadoejecucion_fecha
+    ON ResultadoEjecucion (fecha)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_resultadoejecucion_metodo_fecha
+    ON ResultadoEjecucion (metodo_aplicado_id, fecha)
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS resultadoCeldaFila (
+        executionId VARCHAR(50) NOT NULL,
+        nombreTabla VARCHAR(100) NOT NULL,
+        nombreAtributo VARCHAR(100) NOT NULL,
+        idTupla VARCHAR(50) NOT NULL,
+        valorCD JSONB NOT NULL,
+        valor_num DOUBLE PRECISION,
+        calidad VARCHAR(20) NOT NULL,
+        PRIMARY KEY (executionId, nombreTabla, nombreAtributo, idTupla),
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS resultadoColumna (
+        executionId VARCHAR(50) NOT NULL,
+        nombreTabla VARCHAR(100) NOT NULL,
+        nombreAtributo VARCHAR(100) NOT NULL,
+        valorCD JSONB NOT NULL,
+        valor_num DOUBLE PRECISION,
+        calidad VARCHAR(20) NOT NULL,
+        PRIMARY KEY (executionId, nombreTabla, nombreAtributo),
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_resultadocolumna_tabla_atributo
+    ON resultadoColumna (nombreTabla, nombreAtributo, executionId)
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS resultadoBitmap (
+        executionId VARCHAR(50) NOT NULL,
+        nombreTabla VARCHAR(100) NOT NULL,
+        nombreAtributo VARCHAR(100) NOT NULL,
+        total INTEGER NOT NULL,
+        fallos INTEGER NOT NULL,
+        bitmap BLOB NOT NULL,
+        PRIMARY KEY (executionId, nombreTabla, nombreAtributo),
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS EstadisticasEjecucion (
+        executionId VARCHAR(50) PRIMARY KEY,
+        tiempo_lectura DOUBLE PRECISION NOT NULL,
+        tiempo_calculo DOUBLE PRECISION NOT NULL,
+        tiempo_escritura DOUBLE PRECISION NOT NULL,
+        filas INTEGER NOT NULL,
+        bytes INTEGER NOT NULL,
+        pico_rss_kb INTEGER,
+        pico_tracemalloc_kb INTEGER,
+        cacheado BOOLEAN NOT NULL DEFAULT FALSE,
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    )
+    '''
+]
+
+# SQLite no tiene vistas materializadas: vista común, calculada al leerla
+VISTA_RESUMEN_CALIDAD_SQLITE = f'''
+    CREATE VIEW IF NOT EXISTS resumenCalidad AS
+    {CONSULTA_RESUMEN_CALIDAD_SQLITE}
+'''
+
+# Columnas agregadas después de la primera versión del esquema SQLite (tabla, columna, definición)
+COLUMNAS_AGREGADAS_SQLITE = [
+    ('MetodoAplicado', 'es_inversa', 'BOOLEAN NOT NULL DEFAULT FALSE'),
+    ('resultadoCeldaFila', 'valor_num', 'DOUBLE PRECISION'),
+    ('resultadoColumna', 'valor_num', 'DOUBLE PRECISION'),
+    ('EstadisticasEjecucion', 'cacheado', 'BOOLEAN NOT NULL DEFAULT FALSE'),
+]
+
+# Completa valor_num en los resultados guardados antes de que existiera la columna
+MIGRACION_VALOR_NUM = '''
+    UPDATE {tabla} SET valor_num = (valorCD->>'valor')::float
+    WHERE valor_num IS NULL AND jsonb_typeof(valorCD->'valor') = 'number'
+'''
+MIGRACION_VALOR_NUM_SQLITE = '''
+    UPDATE {tabla} SET valor_num = json_extract(valorCD, '$.valor')
+    WHERE valor_num IS NULL AND json_type(valorCD, '$.valor') IN ('integer', 'real')
+'''
+
+# Índices sobre valor_num: umbrales y rangos por tabla y atributo sin leer el JSON
+INDICES_VALOR_NUM = [
+    '''
+    CREATE INDEX IF NOT EXISTS idx_resultadoceldafila_valor_num
+    ON resultadoCeldaFila (nombreTabla, nombreAtributo, valor_num)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_resultadocolumna_valor_num
+    ON resultadoColumna (nombreTabla, nombreAtributo, valor_num)
+    '''
+]
+
+def obtener_modo_particion(cursor):
+    """Devuelve el modo de particionado de las tablas de resultados ('ejecucion', 'fecha' o None)"""
+    cursor.execute(CONSULTA_MODO_PARTICION)
+    fila = cursor.fetchone()
+    return ESTRATEGIAS_PARTICION[fila[0]] if fila else None
+
+def _inicio_mes(fecha, meses=0):
+    """Primer día del mes de `fecha`, desplazado `meses` meses hacia adelante"""
+    indice = fecha.year * 12 + fecha.month - 1 + meses
+    return datetime(indice // 12, indice % 12 + 1, 1).date()
+
+# Crea la partición de un mes moviendo antes las filas de ese mes que hayan caído en
+# DEFAULT: Postgres no permite crearla mientras DEFAULT tenga filas de su rango
+CREAR_PARTICION_MES = """
+DO $$
+BEGIN
+    IF to_regclass(quote_ident({nombre})) IS NULL THEN
+        IF to_regclass(quote_ident({nombre_default})) IS NOT NULL THEN
+            CREATE TEMP TABLE {temporal} ON COMMIT DROP AS
+                SELECT * FROM {particion_default} WHERE fecha >= {inicio} AND fecha < {fin};
+            DELETE FROM {particion_default} WHERE fecha >= {inicio} AND fecha < {fin};
+        END IF;
+        CREATE TABLE IF NOT EXISTS {particion} PARTITION OF {tabla} FOR VALUES FROM ({inicio}) TO ({fin});
+        IF to_regclass({nombre_temporal}) IS NOT NULL THEN
+            INSERT INTO {tabla} SELECT * FROM {temporal};
+            DROP TABLE {temporal};
+        END IF;
+    END IF;
+END
+$$
+"""
+
+def sentencias_particiones(modo, execution_id, fecha):
+    """
+    Sentencias que crean las particiones necesarias para guardar los resultados de
+    una ejecución nueva. Se devuelven sin ejecutar para poder usarlas también desde
+    conexiones asíncronas, y deben ejecutarse dentro de una transacción: la primera
+    toma un advisory lock que serializa la creación de particiones entre procesos
+    (dos ejecuciones simultáneas chocarían en el catálogo aun con IF NOT EXISTS).
+    
+    Args:
+        modo (str): Modo de particionado ('ejecucion', 'fecha' o None)
+        execution_id (str): ID de la ejecución
+        fecha (datetime): Fecha de la ejecución
+    
+    Returns:
+        list: Sentencias SQL a ejecutar
+    """
+    if modo is None:
+        return []
+    sentencias = [sql.SQL("SELECT pg_advisory_xact_lock(hashtext('particiones_resultados'))")]
+    for tabla in TABLAS_RESULTADO:
+        if modo == 'ejecucion':
+            sentencias.append(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES IN ({})").format(
+                sql.Identifier(f"{tabla}_e{execution_id.replace('-', '')}"),
+                sql.Identifier(tabla),
+                sql.Literal(execution_id)
+            ))
+        elif modo == 'fecha':
+            # Mes actual y siguiente, para que una ejecución que cruce de mes no caiga en DEFAULT
+            for meses in (0, 1):
+                inicio = _inicio_mes(fecha, meses)
+                fin = _inicio_mes(fecha, meses + 1)
+                nombre = f"{tabla}_p{inicio:%Y%m}"
+                temporal = f"mover_{nombre}".lower()
+                sentencias.append(sql.SQL(CREAR_PARTICION_MES).format(
+                    nombre=sql.Literal(nombre),
+                    nombre_default=sql.Literal(f"{tabla}_default"),
+                    nombre_temporal=sql.Literal(temporal),
+                    temporal=sql.Identifier(temporal),
+                    particion=sql.Identifier(nombre),
+                    particion_default=sql.Identifier(f"{tabla}_default"),
+                    tabla=sql.Identifier(tabla),
+                    inicio=sql.Literal(inicio.isoformat()),
+                    fin=sql.Literal(fin.isoformat())
+                ))
+    return sentencias
+
+def crear_base_datos(cursor, particionado=None):
+    """
+    Crea las tablas (las existentes no se modifican)
+    
+    Args:
+        cursor: Cursor de la conexión a la base de datos de calidad
+        particionado (str): None para tablas de resultados comunes, 'ejecucion' para
+            particionarlas por executionId o 'fecha' para particionarlas por mes
+    """
+    if particionado not in [None] + MODOS_PARTICION:
+        raise ValueError(f"Modo de particionado no soportado: {particionado}")
+    
+    # Columnas y cláusulas extra de las tablas de resultados según el particionado
+    columna_fecha = ''
+    clave_fecha = ''
+    particion = ''
+    if particionado == 'ejecucion':
+        particion = 'PARTITION BY LIST (executionId)'
+    elif particionado == 'fecha':
+        # La clave de partición debe formar parte de la clave primaria
+        columna_fecha = 'fecha TIMESTAMPTZ NOT NULL DEFAULT NOW(),'
+        clave_fecha = ', fecha'
+        particion = 'PARTITION BY RANGE (fecha)'
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Dimension (
+        Nombre VARCHAR(100) PRIMARY KEY
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Factor (
+        Nombre VARCHAR(100) PRIMARY KEY,
+        dimension_nombre VARCHAR(100) NOT NULL,
+        FOREIGN KEY (dimension_nombre) REFERENCES Dimension(Nombre)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Metrica (
+        id_metrica VARCHAR(50) PRIMARY KEY,
+        factor_nombre VARCHAR(100) NOT NULL,
+        FOREIGN KEY (factor_nombre) REFERENCES Factor(Nombre)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS Metodo (
+        id_metodo VARCHAR(50) PRIMARY KEY,
+        metrica_id VARCHAR(50) NOT NULL,
+        FOREIGN KEY (metrica_id) REFERENCES Metrica(id_metrica)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS MetodoAplicado (
+        id_metodo_aplicado VARCHAR(50) PRIMARY KEY,
+        metodo_id VARCHAR(50) NOT NULL,
+        FOREIGN KEY (metodo_id) REFERENCES Metodo(id_metodo)
+    )
+    ''')
+
+    # Tipo de la métrica (inversa: bajo % = bueno), usado por el resumen de calidad
+    cursor.execute('''
+    ALTER TABLE MetodoAplicado ADD COLUMN IF NOT EXISTS es_inversa BOOLEAN NOT NULL DEFAULT FALSE
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ResultadoEjecucion (
+        executionId VARCHAR(50) PRIMARY KEY,
+        metodo_aplicado_id VARCHAR(50) NOT NULL,
+        fecha TIMESTAMPTZ DEFAULT NOW(),
+        FOREIGN KEY (metodo_aplicado_id) REFERENCES MetodoAplicado(id_metodo_aplicado)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_resultadoejecucion_fecha
+    ON ResultadoEjecucion (fecha)
+    ''')
+
+    # Historial de una métrica: ejecuciones de un método aplicado ordenadas por fecha
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_resultadoejecucion_metodo_fecha
+    ON ResultadoEjecucion (metodo_aplicado_id, fecha)
+    ''')
+
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS resultadoCeldaFila (
+        executionId VARCHAR(50) NOT NULL,
+        nombreTabla VARCHAR(100) NOT NULL,
+        nombreAtributo VARCHAR(100) NOT NULL,
+        idTupla VARCHAR(50) NOT NULL,
+        valorCD JSONB NOT NULL,
+        valor_num DOUBLE PRECISION,
+        calidad VARCHAR(20) NOT NULL,
+        {columna_fecha}
+        PRIMARY KEY (executionId, nombreTabla, nombreAtributo, idTupla{clave_fecha}),
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    ) {particion}
+    ''')
+
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS resultadoColumna (
+        executionId VARCHAR(50) NOT NULL,
+        nombreTabla VARCHAR(100) NOT NULL,
+        nombreAtributo VARCHAR(100) NOT NULL,
+        valorCD JSONB NOT NULL,
+        valor_num DOUBLE PRECISION,
+        calidad VARCHAR(20) NOT NULL,
+        {columna_fecha}
+        PRIMARY KEY (executionId, nombreTabla, nombreAtributo{clave_fecha}),
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    ) {particion}
+    ''')
+
+    # Resultados de una tabla y atributo a lo largo de las ejecuciones
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_resultadocolumna_tabla_atributo
+    ON resultadoColumna (nombreTabla, nombreAtributo, executionId)
+    ''')
+
+    # Resultados válido/inválido por tupla de una columna, un bit por tupla comprimido
+    # (ver DB/bitmap.py); una fila por ejecución y columna, sin particionar
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resultadoBitmap (
+        executionId VARCHAR(50) NOT NULL,
+        nombreTabla VARCHAR(100) NOT NULL,
+        nombreAtributo VARCHAR(100) NOT NULL,
+        total INTEGER NOT NULL,
+        fallos INTEGER NOT NULL,
+        bitmap BYTEA NOT NULL,
+        PRIMARY KEY (executionId, nombreTabla, nombreAtributo),
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    )
+    ''')
+
+    # Tiempos por etapa, volumen procesado y memoria de cada ejecución
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS EstadisticasEjecucion (
+        executionId VARCHAR(50) PRIMARY KEY,
+        tiempo_lectura DOUBLE PRECISION NOT NULL,
+        tiempo_calculo DOUBLE PRECISION NOT NULL,
+        tiempo_escritura DOUBLE PRECISION NOT NULL,
+        filas BIGINT NOT NULL,
+        bytes BIGINT NOT NULL,
+        pico_rss_kb BIGINT,
+        pico_tracemalloc_kb BIGINT,
+        cacheado BOOLEAN NOT NULL DEFAULT FALSE,
+        FOREIGN KEY (executionId) REFERENCES ResultadoEjecucion(executionId) ON DELETE CASCADE
+    )
+    ''')
+
+    # Ejecuciones que reutilizaron resultados de la caché de métricas (tablas anteriores a la versión 7)
+    cursor.execute('''
+    ALTER TABLE EstadisticasEjecucion ADD COLUMN IF NOT EXISTS cacheado BOOLEAN NOT NULL DEFAULT FALSE
+    ''')
+
+    # valor_num: copia numérica de valorCD->'valor' (tablas creadas antes de la versión 4)
+    for tabla in TABLAS_RESULTADO:
+        cursor.execute(sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS valor_num DOUBLE PRECISION").format(
+            sql.Identifier(tabla)
+        ))
+        cursor.execute(sql.SQL(MIGRACION_VALOR_NUM).format(tabla=sql.Identifier(tabla)))
+    for sentencia in INDICES_VALOR_NUM:
+        cursor.execute(sentencia)
+
+    # La vista se recrea para tomar la definición actual de la consulta
+    cursor.execute("DROP MATERIALIZED VIEW IF EXISTS resumenCalidad")
+    cursor.execute(f'''
+    CREATE MATERIALIZED VIEW resumenCalidad AS
+    {CONSULTA_RESUMEN_CALIDAD}
+    ''')
+
+    # Índice único requerido por REFRESH MATERIALIZED VIEW CONCURRENTLY
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_resumencalidad
+    ON resumenCalidad (dimension, factor, nombreTabla)
+    ''')
+
+    modo_actual = obtener_modo_particion(cursor)
+    if modo_actual != particionado:
+        print(f"  - Las tablas de resultados ya existían con particionado '{modo_actual}'; se mantienen")
+
+    if modo_actual == 'fecha':
+        # Partición por defecto para filas fuera de los meses creados
+        for tabla in TABLAS_RESULTADO:
+            cursor.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} DEFAULT").format(
+                sql.Identifier(f"{tabla}_default"), sql.Identifier(tabla)
+            ))
+    print("✓ Tablas creadas correctamente")
+
+def insert_dimensions_and_factors(cursor):
+    """Inserta las dimensiones y factores que falten"""
+    cursor.executemany(
+        "INSERT INTO Dimension (Nombre) VALUES (%s) ON CONFLICT DO NOTHING",
+        [(dimension,) for dimension in DIMENSIONS_FACTORS]
+    )
+    cursor.executemany(
+        "INSERT INTO Factor (Nombre, dimension_nombre) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+        [(factor, dimension) for dimension, factors in DIMENSIONS_FACTORS.items() for factor in factors]
+    )
+    print("✓ Dimensiones y factores insertados correctamente")
+
+def insert_metrics(cursor):
+    """Inserta las métricas que falten"""
+    cursor.executemany(
+        "INSERT INTO Metrica (id_metrica, factor_nombre) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+        list(METRICS_FACTORS.items())
+    )
+    print("✓ Métricas insertadas correctamente")
+
+def insert_methods(cursor):
+    """Inserta los métodos y métodos aplicados que falten"""
+    cursor.executemany(
+        "INSERT INTO Metodo (id_metodo, metrica_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+        [(method['metodo_id'], method['metrica_id']) for method in METHODS_DATA]
+    )
+    cursor.executemany(
+        "INSERT INTO MetodoAplicado (id_metodo_aplicado, metodo_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+        [(method['metodo_aplicado_id'], method['metodo_id']) for method in METHODS_DATA]
+    )
+    cursor.executemany(
+        "UPDATE MetodoAplicado SET es_inversa = %s WHERE id_metodo_aplicado = %s",
+        [(is_inverse, metodo_aplicado) for metodo_aplicado, is_inverse in METRIC_TYPES.items()]
+    )
+    print("✓ Métodos y métodos aplicados insertados correctamente")
+
+def obtener_version_esquema(cursor):
+    """Versión del esquema registrada en la base de datos (0 si nunca se inicializó)"""
+    cursor.execute("SELECT to_regclass('esquemaversion')")
+    if cursor.fetchone()[0] is None:
+        return 0
+    cursor.execute("SELECT MAX(version) FROM EsquemaVersion")
+    return cursor.fetchone()[0] or 0
+
+def registrar_version_esquema(cursor):
+    """Registra VERSION_ESQUEMA como la versión actual del esquema"""
+    cursor.execute("CREATE TABLE IF NOT EXISTS EsquemaVersion (version INTEGER NOT NULL)")
+    cursor.execute("DELETE FROM EsquemaVersion")
+    cursor.execute("INSERT INTO EsquemaVersion (version) VALUES (%s)", (VERSION_ESQUEMA,))
+
+def conectar_creando_base_datos():
+    """
+    Conecta a la base de datos de calidad. Solo si no existe se conecta a 'postgres'
+    para crearla, de modo que en el caso habitual se abre una única conexión.
+    """
+    try:
+        return psycopg.connect(**parametros_conexion())
+    except psycopg.OperationalError:
+        conn = psycopg.connect(**parametros_conexion("postgres"), autocommit=True)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (os.getenv('DB_NAME'),))
+                if cursor.fetchone():
+                    # La base existe: el error de conexión era otro
+                    raise
+                cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(os.getenv('DB_NAME'))))
+                print(f"✓ Base de datos '{os.getenv('DB_NAME')}' creada correctamente")
+        finally:
             conn.close()
+        return psycopg.connect(**parametros_conexion())
 
-def insert_metrics():
-    """Inserta las métricas en la base de datos"""
+def aplicar_retencion(dias):
+    """
+    Elimina las ejecuciones con más de `dias` días de antigüedad. Si las tablas de
+    resultados están particionadas, sus resultados se descartan con DROP TABLE de
+    particiones enteras en lugar de un DELETE en cascada fila por fila; en las
+    particionadas por mes, las filas vencidas de la partición DEFAULT se borran aparte.
+    
+    Args:
+        dias (int): Días de resultados a conservar
+    """
     try:
-        conn = psycopg.connect(
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT'),
-            dbname=os.getenv('DB_NAME')
-        )
+        conn = psycopg.connect(**parametros_conexion())
         
-        # Estructura de datos con métricas y sus factores asociados
-        metrics_factors = {
-            "ExactSint-ReglaCorrecta": "Exactitud Sintactica",
-            "ExactSint-Desviacion": "Exactitud Sintactica",
-            "Densidad-Grado": "Densidad",
-            "NoDuplicacion-CantDups": "No Duplicacion",
-            "IntDominio-OutBounds-Gen": "Integridad de Dominio",
-            "IntDominio-OutBounds-Esp": "Integridad de Dominio",
-            "Precision-Granularidad": "Precision",
-            "IntInterRel-Pertenece": "Integridad Interrelacion"
-        }
-
+        corte = datetime.now() - timedelta(days=dias)
         with conn.cursor() as cursor:
-            # Insertar cada métrica
-            for metric_id, factor_nombre in metrics_factors.items():
-                try:
+            modo = obtener_modo_particion(cursor)
+            cursor.execute("SELECT executionId FROM ResultadoEjecucion WHERE fecha < %s", (corte,))
+            ejecuciones = [fila[0] for fila in cursor.fetchall()]
+            
+            particiones = []
+            for tabla in TABLAS_RESULTADO:
+                if modo == 'ejecucion':
+                    particiones += [f"{tabla}_e{execution_id.replace('-', '')}" for execution_id in ejecuciones]
+                elif modo == 'fecha':
+                    # Solo meses que terminaron antes del corte
                     cursor.execute(
-                        "INSERT INTO Metrica (id_metrica, factor_nombre) VALUES (%s, %s)",
-                        (metric_id, factor_nombre)
+                        """
+                        SELECT c.relname FROM pg_inherits i
+                        JOIN pg_class c ON c.oid = i.inhrelid
+                        WHERE i.inhparent = to_regclass(%s)
+                        """,
+                        (tabla,)
                     )
-                    print(f"✓ Métrica '{metric_id}' insertada correctamente para el factor '{factor_nombre}'")
-                except Exception as e:
-                    print(f"✗ Error al insertar métrica '{metric_id}': {e}")
-
+                    for (nombre,) in cursor.fetchall():
+                        mes = re.search(r'_p(\d{4})(\d{2})$', nombre)
+                        if mes and _inicio_mes(datetime(int(mes.group(1)), int(mes.group(2)), 1), 1) <= corte.date():
+                            particiones.append(nombre)
+                        elif nombre == f"{tabla}_default":
+                            # DEFAULT no tiene un mes propio: sus filas vencidas se borran una por una
+                            cursor.execute(
+                                sql.SQL("DELETE FROM {} WHERE fecha < %s").format(sql.Identifier(nombre)),
+                                (corte,)
+                            )
+            
+            for nombre in particiones:
+                cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(nombre)))
+            
+            # Lo que quede de estas ejecuciones (tablas sin particionar o meses parciales) se borra en cascada
+            cursor.execute("DELETE FROM ResultadoEjecucion WHERE executionId = ANY(%s)", (ejecuciones,))
+        
         conn.commit()
-        print("\n✓ Métricas insertadas correctamente")
-
+        print(f"✓ Retención aplicada: {len(ejecuciones)} ejecuciones y {len(particiones)} particiones eliminadas")
+    
     except Exception as e:
-        print(f"Error al insertar métricas: {e}")
+        print(f"Error al aplicar la retención: {e}")
         raise
     finally:
         if 'conn' in locals():
             conn.close()
 
-def insert_methods():
-    """Inserta los métodos y métodos aplicados en la base de datos"""
+def crear_base_datos_sqlite(ruta=None):
+    """
+    Crea las tablas y los datos base en un archivo SQLite local, en una sola transacción
+    
+    Args:
+        ruta (str): Ruta del archivo; por defecto DB_SQLITE_PATH o db_cdi.sqlite
+    """
     try:
-        conn = psycopg.connect(
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            host=os.getenv('DB_HOST'),
-            port=os.getenv('DB_PORT'),
-            dbname=os.getenv('DB_NAME')
-        )
-        
-        # Estructura de datos con métodos, sus aplicados y la métrica asociada
-        methods_data = [
-            {
-                "metodo_id": "ExactSint-ReglaCorrecta-ISBN",
-                "metodo_aplicado_id": "ExactSint-ReglaCorrecta-ISBN_ap",
-                "metrica_id": "ExactSint-ReglaCorrecta"
-            },
-            {
-                "metodo_id": "ExactSint-LeveshteinDistanceInterCSV",
-                "metodo_aplicado_id": "ExactSint-LeveshteinDistanceInterCSV_ap",
-                "metrica_id": "ExactSint-Desviacion"
-            },
-            {
-                "metodo_id": "Densidad-Grado-Contar",
-                "metodo_aplicado_id": "Densidad-Grado-Contar_ap",
-                "metrica_id": "Densidad-Grado"
-            },
-            {
-                "metodo_id": "NoDuplicacion-CantDups-Contar",
-                "metodo_aplicado_id": "NoDuplicacion-CantDups-Contar_ap",
-                "metrica_id": "NoDuplicacion-CantDups"
-            },
-            {
-                "metodo_id": "IntDominio-OutBounds-Gen-ContarNum",
-                "metodo_aplicado_id": "IntDominio-OutBounds-Gen-ContarNum_ap",
-                "metrica_id": "IntDominio-OutBounds-Gen"
-            },
-            {
-                "metodo_id": "IntDominio-OutBounds-Esp-ContarNum",
-                "metodo_aplicado_id": "IntDominio-OutBounds-Esp-ContarNum_ap",
-                "metrica_id": "IntDominio-OutBounds-Esp"
-            },
-            {
-                "metodo_id": "IntInterRel-Pertenencia",
-                "metodo_aplicado_id": "IntInterRel-Pertenencia_ap",
-                "metrica_id": "IntInterRel-Pertenece"
-            },
-            {
-                "metodo_id": "Precision-Fechas",
-                "metodo_aplicado_id": "Precision-Fechas_ap",
-                "metrica_id": "Precision-Granularidad"
-            }
-        ]
-
-        with conn.cursor() as cursor:
-            # Insertar cada método y su método aplicado
-            for method in methods_data:
-                try:
-                    # Insertar método
-                    cursor.execute(
-                        "INSERT INTO Metodo (id_metodo, metrica_id) VALUES (%s, %s)",
-                        (method['metodo_id'], method['metrica_id'])
-                    )
-                    print(f"✓ Método '{method['metodo_id']}' insertado correctamente")
-                    
-                    # Insertar método aplicado
-                    cursor.execute(
-                        "INSERT INTO MetodoAplicado (id_metodo_aplicado, metodo_id) VALUES (%s, %s)",
-                        (method['metodo_aplicado_id'], method['metodo_id'])
-                    )
-                    print(f"✓ Método aplicado '{method['metodo_aplicado_id']}' insertado correctamente")
-                    
-                except Exception as e:
-                    print(f"✗ Error al insertar método '{method['metodo_id']}': {e}")
-
-        conn.commit()
-        print("\n✓ Métodos y métodos aplicados insertados correctamente")
-
+        conn = conectar_sqlite(ruta)
+        with conn.transaction():
+            with conn.cursor() as cursor:
+                # SQLite guarda la versión del esquema en el encabezado del archivo
+                cursor.execute("PRAGMA user_version")
+                if cursor.fetchone()[0] == VERSION_ESQUEMA:
+                    print(f"✓ El esquema ya está en la versión {VERSION_ESQUEMA}, no hay nada que hacer")
+                    return
+                
+                for sentencia in ESQUEMA_SQLITE:
+                    cursor.execute(sentencia)
+                
+                # SQLite no tiene ADD COLUMN IF NOT EXISTS
+                for tabla, columna, definicion in COLUMNAS_AGREGADAS_SQLITE:
+                    cursor.execute(f"PRAGMA table_info({tabla})")
+                    if columna not in [fila[1] for fila in cursor.fetchall()]:
+                        cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+                
+                for tabla in TABLAS_RESULTADO:
+                    cursor.execute(MIGRACION_VALOR_NUM_SQLITE.format(tabla=tabla))
+                for sentencia in INDICES_VALOR_NUM:
+                    cursor.execute(sentencia)
+                
+                # La vista se recrea para tomar la definición actual de la consulta
+                cursor.execute("DROP VIEW IF EXISTS resumenCalidad")
+                cursor.execute(VISTA_RESUMEN_CALIDAD_SQLITE)
+                
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO Dimension (Nombre) VALUES (%s)",
+                    [(dimension,) for dimension in DIMENSIONS_FACTORS]
+                )
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO Factor (Nombre, dimension_nombre) VALUES (%s, %s)",
+                    [(factor, dimension) for dimension, factors in DIMENSIONS_FACTORS.items() for factor in factors]
+                )
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO Metrica (id_metrica, factor_nombre) VALUES (%s, %s)",
+                    list(METRICS_FACTORS.items())
+                )
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO Metodo (id_metodo, metrica_id) VALUES (%s, %s)",
+                    [(method['metodo_id'], method['metrica_id']) for method in METHODS_DATA]
+                )
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO MetodoAplicado (id_metodo_aplicado, metodo_id) VALUES (%s, %s)",
+                    [(method['metodo_aplicado_id'], method['metodo_id']) for method in METHODS_DATA]
+                )
+                cursor.executemany(
+                    "UPDATE MetodoAplicado SET es_inversa = %s WHERE id_metodo_aplicado = %s",
+                    [(is_inverse, metodo_aplicado) for metodo_aplicado, is_inverse in METRIC_TYPES.items()]
+                )
+                cursor.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        print("✓ Base de datos SQLite y tablas creadas correctamente")
+    
     except Exception as e:
-        print(f"Error al insertar métodos: {e}")
+        print(f"Error al crear la base de datos SQLite: {e}")
         raise
     finally:
         if 'conn' in locals():
             conn.close()
 
-def init_database():
-    """Inicializa la base de datos con todas las tablas y datos necesarios"""
-    try:
-        crear_base_datos()
-        insert_dimensions_and_factors()
-        insert_metrics()
-        insert_methods()
+def init_database(particionado=None, backend=None):
+    """
+    Inicializa la base de datos con todas las tablas y datos necesarios
+    
+    Args:
+        particionado (str): Modo de particionado de las tablas de resultados (solo Postgres)
+        backend (str): 'postgres' o 'sqlite'; por defecto DB_BACKEND o 'postgres'
+    """
+    backend = backend or os.getenv('DB_BACKEND', 'postgres')
+    if backend == 'sqlite':
+        if particionado:
+            raise ValueError("El backend SQLite no soporta tablas particionadas")
+        crear_base_datos_sqlite()
         print("\n✓ Base de datos inicializada correctamente")
+        return
+    
+    try:
+        conn = conectar_creando_base_datos()
+        
+        # Esquema y datos base en una sola transacción sobre una única conexión
+        with conn.transaction():
+            with conn.cursor() as cursor:
+                # Serializa inicializaciones concurrentes
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('init_db'))")
+                
+                version = obtener_version_esquema(cursor)
+                if version == VERSION_ESQUEMA:
+                    print(f"✓ El esquema ya está en la versión {VERSION_ESQUEMA}, no hay nada que hacer")
+                    modo_actual = obtener_modo_particion(cursor)
+                    if particionado and modo_actual != particionado:
+                        print(f"  - No se aplicó el particionado '{particionado}': las tablas de resultados "
+                              f"ya existen con particionado '{modo_actual}'")
+                    return
+                
+                crear_base_datos(cursor, particionado)
+                insert_dimensions_and_factors(cursor)
+                insert_metrics(cursor)
+                insert_methods(cursor)
+                registrar_version_esquema(cursor)
+        
+        print(f"\n✓ Base de datos inicializada correctamente (esquema versión {VERSION_ESQUEMA})")
     except Exception as e:
         print(f"Error al inicializar la base de datos: {e}")
         raise
+    finally:
+        if 'conn' in locals():
+            conn.close()
 
 if __name__ == "__main__":
-    init_database() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Inicializa la base de datos de calidad")
+    parser.add_argument('--particionado', choices=MODOS_PARTICION,
+                        help="Particiona las tablas de resultados por ejecución o por mes")
+    parser.add_argument('--retencion', type=int, metavar='DIAS',
+                        help="En lugar de inicializar, elimina las ejecuciones con más de DIAS días")
+    parser.add_argument('--backend', choices=['postgres', 'sqlite'],
+                        help="Base de datos a inicializar (por defecto DB_BACKEND o postgres)")
+    args = parser.parse_args()
+    
+    if args.retencion is not None:
+        aplicar_retencion(args.retencion)
+    else:
+        init_database(args.particionado, args.backend)
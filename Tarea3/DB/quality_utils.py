@@ -1,31 +1,42 @@
-def get_quality_rating(percentage, is_inverse=False):
+# Umbrales de calificación (límites superiores de los tres primeros tramos) según el tipo de métrica
+UMBRALES_CALIDAD = {
+    True: (9, 40, 70),  # Inversa: Excelente, Muy buena, Buena; por encima Mala
+    False: (30, 60, 90),  # Directa: Mala, Buena, Muy buena; por encima Excelente
+}
+
+def get_quality_rating(percentage, is_inverse=False, umbrales=None):
     """
     Determina la calificación de calidad basada en el porcentaje y el tipo de métrica.
     
     Args:
         percentage (float): El porcentaje a evaluar (0-100)
         is_inverse (bool): True si la métrica es inversa (bajo % = bueno), False si es directa (alto % = bueno)
+        umbrales (tuple): Umbrales a usar en lugar de los de UMBRALES_CALIDAD
     
     Returns:
         str: La calificación de calidad ('Mala', 'Buena', 'Muy buena', 'Excelente')
     """
+    if umbrales is None:
+        umbrales = UMBRALES_CALIDAD[is_inverse]
+    primero, segundo, tercero = umbrales
+    
     if is_inverse:
         # Para métricas inversas (bajo % = bueno)
-        if percentage <= 9:
+        if percentage <= primero:
             return 'Excelente'
-        elif percentage <= 40:
+        elif percentage <= segundo:
             return 'Muy buena'
-        elif percentage <= 70:
+        elif percentage <= tercero:
             return 'Buena'
         else:
             return 'Mala'
     else:
         # Para métricas directas (alto % = bueno)
-        if percentage <= 30:
+        if percentage <= primero:
             return 'Mala'
-        elif percentage <= 60:
+        elif percentage <= segundo:
             return 'Buena'
-        elif percentage <= 90:
+        elif percentage <= tercero:
             return 'Muy buena'
         else:
             return 'Excelente'
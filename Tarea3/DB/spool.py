@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import uuid
+import base64
+import argparse
+from datetime import datetime, timezone
+
+# Permite ejecutar este archivo como script (python DB/spool.py) e importar el paquete DB
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from DB.db_operations import DBOperations, Ejecucion, valor_numerico, sentencia_resultado
+from DB.init_db import obtener_modo_particion, sentencias_particiones
+from DB.bitmap import comprimir_bitmap
+from psycopg.types.json import Jsonb
+
+# Directorio de spool por defecto
+DIRECTORIO_SPOOL_POR_DEFECTO = 'spool'
+
+# Extensión de los spools en escritura; al cerrarse se renombran a .jsonl
+EXTENSION_PARCIAL = '.jsonl.parcial'
+
+def directorio_spool():
+    """Directorio de spool, tomado de DB_SPOOL_DIR"""
+    return os.getenv('DB_SPOOL_DIR') or DIRECTORIO_SPOOL_POR_DEFECTO
+
+class SpoolDBOperations:
+    """
+    Implementa la API de escritura de DBOperations sobre un archivo JSONL de solo
+    agregado por ejecución, sin conectarse a la base de datos. Los spools completos
+    se suben después con `python DB/spool.py subir`.
+    """
+    def __init__(self, directorio=None):
+        """
+        Args:
+            directorio (str): Directorio de los spools; por defecto DB_SPOOL_DIR o 'spool'
+        """
+        self.directorio = directorio or directorio_spool()
+        os.makedirs(self.directorio, exist_ok=True)
+        self._archivos = {}
+        self._ejecuciones = {}
+
+    def _escribir(self, execution_id, registro):
+        self._archivos[str(execution_id)].write(json.dumps(registro) + '\n')
+
+    def crear_ejecucion(self, metodo):
+        """
+        Abre el spool de una nueva ejecución
+
+        Args:
+            metodo (str): ID del método aplicado
+
+        Returns:
+            Ejecucion: Contexto de la ejecución creada (str() devuelve su ID)
+        """
+        execution_id = str(uuid.uuid4())
+        ruta = os.path.join(self.directorio, execution_id + EXTENSION_PARCIAL)
+        self._archivos[execution_id] = open(ruta, 'w', encoding='utf-8')
+        fecha = datetime.now(timezone.utc)
+        self._escribir(execution_id, {
+            'tipo': 'ejecucion',
+            'executionId': execution_id,
+            'metodo': metodo,
+            'fecha': fecha.isoformat()
+        })
+        self._ejecuciones[execution_id] = Ejecucion(execution_id, metodo, fecha)
+        return self._ejecuciones[execution_id]
+
+    def guardar_resultado_columna(self, execution_id, nombre_tabla, nombre_atributo, valor):
+        """
+        Agrega al spool el resultado de una columna.
+        """
+        self._escribir(execution_id, {
+            'tipo': 'columna',
+            'tabla': nombre_tabla,
+            'atributo': nombre_atributo,
+            'valor': valor,
+            'calidad': self._ejecuciones[str(execution_id)].calidad(valor['valor'])
+        })
+
+    def guardar_resultado_celda_fila(self, execution_id, nombre_tabla, nombre_atributo, id_tupla, valor):
+        """
+        Agrega al spool el resultado de una celda de fila.
+        """
+        self._escribir(execution_id, {
+            'tipo': 'celda',
+            'tabla': nombre_tabla,
+            'atributo': nombre_atributo,
+            'tupla': str(id_tupla),
+            'valor': valor,
+            'calidad': self._ejecuciones[str(execution_id)].calidad(valor['valor'])
+        })
+
+    def guardar_resultado_bitmap(self, execution_id, nombre_tabla, nombre_atributo, validos):
+        """
+        Agrega al spool el resultado de bitmap de una columna (comprimido, en base64).
+        """
+        bitmap, total, fallos = comprimir_bitmap(validos)
+        self._escribir(execution_id, {
+            'tipo': 'bitmap',
+            'tabla': nombre_tabla,
+            'atributo': nombre_atributo,
+            'total': total,
+            'fallos': fallos,
+            'bitmap': base64.b64encode(bitmap).decode('ascii')
+        })
+        return fallos
+
+    def guardar_estadisticas_ejecucion(self, execution_id, estadisticas):
+        """
+        Agrega al spool las estadísticas de rendimiento de la ejecución.
+        """
+        self._escribir(execution_id, dict(estadisticas, tipo='estadisticas'))
+
+    def flush(self):
+        """Vuelca a disco lo escrito en los spools abiertos"""
+        for archivo in self._archivos.values():
+            archivo.flush()
+
+    def close(self):
+        """Cierra los spools y los marca como completos para poder subirlos"""
+        for execution_id, archivo in self._archivos.items():
+            archivo.close()
+            parcial = os.path.join(self.directorio, execution_id + EXTENSION_PARCIAL)
+            os.replace(parcial, parcial[:-len('.parcial')])
+        self._archivos = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def _registros(ruta, tipo):
+    """Recorre los registros de un tipo ('ejecucion', 'columna' o 'celda') de un spool"""
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            registro = json.loads(linea)
+            if registro['tipo'] == tipo:
+                yield registro
+
+def subir_spool(db, ruta):
+    """
+    Sube un spool completo en una sola transacción: la ejecución, sus resultados de
+    columna, de bitmap y de celda (con COPY en Postgres) y sus estadísticas.
+
+    Args:
+        db (DBOperations): Conexión de destino
+        ruta (str): Ruta del archivo .jsonl
+
+    Returns:
+        bool: False si la ejecución ya estaba en la base de datos
+    """
+    cabecera = next(_registros(ruta, 'ejecucion'))
+    execution_id = cabecera['executionId']
+
+    with db.conn.transaction():
+        with db.conn.cursor() as cursor:
+            # Una subida anterior pudo completarse sin llegar a mover el archivo
+            cursor.execute("SELECT 1 FROM ResultadoEjecucion WHERE executionId = %s", (execution_id,))
+            if cursor.fetchone():
+                return False
+
+            # La cabecera guarda la fecha en UTC con zona: se pasa a hora local sin zona, como la
+            # que asigna la base al crear una ejecución, para que se ordene junto con las demás
+            # (y SQLite pueda leerla como TIMESTAMP). Con particionado por mes es además la
+            # clave de partición de cada fila
+            fecha = datetime.fromisoformat(cabecera['fecha']).astimezone().replace(tzinfo=None)
+            cursor.execute(
+                "INSERT INTO ResultadoEjecucion (executionId, metodo_aplicado_id, fecha) VALUES (%s, %s, %s)",
+                (execution_id, cabecera['metodo'], fecha)
+            )
+
+            modo = obtener_modo_particion(cursor) if db.backend != 'sqlite' else None
+            clave = (fecha,) if modo == 'fecha' else ()
+            columnas_columna = ['executionId', 'nombreTabla', 'nombreAtributo', 'valorCD', 'valor_num', 'calidad']
+            columnas_celda = ['executionId', 'nombreTabla', 'nombreAtributo', 'idTupla', 'valorCD', 'valor_num',
+                              'calidad']
+
+            filas_columnas = [
+                (execution_id, r['tabla'], r['atributo'], Jsonb(r['valor']), valor_numerico(r['valor']),
+                 r['calidad']) + clave
+                for r in _registros(ruta, 'columna')
+            ]
+            cursor.executemany(
+                """
+                INSERT INTO resultadoBitmap
+                (executionId, nombreTabla, nombreAtributo, total, fallos, bitmap)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    (execution_id, r['tabla'], r['atributo'], r['total'], r['fallos'], base64.b64decode(r['bitmap']))
+                    for r in _registros(ruta, 'bitmap')
+                ]
+            )
+            cursor.executemany(
+                """
+                INSERT INTO EstadisticasEjecucion
+                (executionId, tiempo_lectura, tiempo_calculo, tiempo_escritura, filas, bytes,
+                 pico_rss_kb, pico_tracemalloc_kb, cacheado)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    (execution_id, r['tiempo_lectura'], r['tiempo_calculo'], r['tiempo_escritura'],
+                     r['filas'], r['bytes'], r['pico_rss_kb'], r['pico_tracemalloc_kb'], r.get('cacheado', False))
+                    for r in _registros(ruta, 'estadisticas')
+                ]
+            )
+            filas_celdas = (
+                (execution_id, r['tabla'], r['atributo'], r['tupla'], Jsonb(r['valor']), valor_numerico(r['valor']),
+                 r['calidad']) + clave
+                for r in _registros(ruta, 'celda')
+            )
+
+            if db.backend == 'sqlite':
+                cursor.executemany(sentencia_resultado('resultadoColumna', columnas_columna, False), filas_columnas)
+                cursor.executemany(sentencia_resultado('resultadoCeldaFila', columnas_celda, False), list(filas_celdas))
+                return True
+
+            for sentencia in sentencias_particiones(modo, execution_id, fecha):
+                cursor.execute(sentencia)
+
+            if clave:
+                columnas_columna.append('fecha')
+                columnas_celda.append('fecha')
+            with cursor.copy(
+                f"COPY resultadoColumna ({', '.join(columnas_columna)}) FROM STDIN"
+            ) as copy:
+                for fila in filas_columnas:
+                    copy.write_row(fila)
+            with cursor.copy(
+                f"COPY resultadoCeldaFila ({', '.join(columnas_celda)}) FROM STDIN"
+            ) as copy:
+                for fila in filas_celdas:
+                    copy.write_row(fila)
+    return True
+
+def subir_spools(directorio=None):
+    """
+    Sube todos los spools completos del directorio y los mueve a la subcarpeta 'subidos'.
+    Los spools aún en escritura (.jsonl.parcial) se ignoran.
+
+    Args:
+        directorio (str): Directorio de los spools; por defecto DB_SPOOL_DIR o 'spool'
+    """
+    directorio = directorio or directorio_spool()
+    subidos = os.path.join(directorio, 'subidos')
+    os.makedirs(subidos, exist_ok=True)
+
+    pendientes = sorted(nombre for nombre in os.listdir(directorio) if nombre.endswith('.jsonl'))
+    hubo_subidas = False
+    try:
+        db = DBOperations()
+        for nombre in pendientes:
+            ruta = os.path.join(directorio, nombre)
+            try:
+                if subir_spool(db, ruta):
+                    print(f"✓ Spool '{nombre}' subido correctamente")
+                    hubo_subidas = True
+                else:
+                    print(f"  - La ejecución de '{nombre}' ya estaba en la base de datos")
+                os.replace(ruta, os.path.join(subidos, nombre))
+            except Exception as e:
+                print(f"✗ Error al subir el spool '{nombre}': {e}")
+        if hubo_subidas:
+            db.refrescar_resumen_calidad()
+    finally:
+        if 'db' in locals():
+            db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gestión de los spools locales de resultados")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    subir = subcomandos.add_parser('subir', aliases=['upload'], help="Sube los spools completos a la base de datos")
+    subir.add_argument('--directorio', help="Directorio de los spools (por defecto DB_SPOOL_DIR o 'spool')")
+    args = parser.parse_args()
+
+    if args.comando in ('subir', 'upload'):
+        subir_spools(args.directorio)
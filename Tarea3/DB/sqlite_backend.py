@@ -0,0 +1,110 @@
+import sqlite3
+import json
+import os
+from contextlib import contextmanager
+from psycopg.types.json import Jsonb
+
+# Ruta por defecto del archivo SQLite local
+RUTA_SQLITE_POR_DEFECTO = 'db_cdi.sqlite'
+
+# valorCD se declara JSONB también en SQLite: se guarda como texto y se decodifica al leer
+sqlite3.register_converter('JSONB', json.loads)
+sqlite3.register_adapter(dict, json.dumps)
+sqlite3.register_adapter(Jsonb, lambda valor: json.dumps(valor.obj))
+
+def ruta_sqlite():
+    """Ruta del archivo SQLite, tomada de DB_SQLITE_PATH"""
+    return os.getenv('DB_SQLITE_PATH', RUTA_SQLITE_POR_DEFECTO)
+
+class CursorSQLite:
+    """Cursor de sqlite3 con la interfaz de psycopg que usa DBOperations (parámetros %s)"""
+    def __init__(self, cursor):
+        self._cursor = cursor
+        # Atributo de los cursores de servidor de psycopg; sqlite3 ya itera sin cargar todo
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @staticmethod
+    def _adaptar(sql):
+        return sql.replace('%s', '?')
+
+    def execute(self, sql, params=(), prepare=None):
+        # sqlite3 ya reutiliza sentencias compiladas en su caché; prepare no aplica
+        self._cursor.execute(self._adaptar(sql), params)
+        return self
+
+    def executemany(self, sql, filas):
+        self._cursor.executemany(self._adaptar(sql), filas)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+class ConexionSQLite:
+    """
+    Conexión sqlite3 con la interfaz de psycopg que usa DBOperations: cursores como
+    context manager, transaction() y autocommit fuera de las transacciones explícitas.
+    """
+    def __init__(self, conn):
+        self._conn = conn
+        self.autocommit = True
+
+    def cursor(self, name=None):
+        # name (cursor de servidor en psycopg) no aplica en SQLite
+        return CursorSQLite(self._conn.cursor())
+
+    @contextmanager
+    def transaction(self):
+        self._conn.execute('BEGIN')
+        try:
+            yield
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def commit(self):
+        if self._conn.in_transaction:
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+def conectar_sqlite(ruta=None):
+    """
+    Abre el archivo SQLite en modo WAL (lecturas concurrentes con la escritura) y
+    con claves foráneas activas.
+
+    Args:
+        ruta (str): Ruta del archivo; por defecto DB_SQLITE_PATH o db_cdi.sqlite
+
+    Returns:
+        ConexionSQLite: Conexión lista para usar con DBOperations
+    """
+    conn = sqlite3.connect(
+        ruta or ruta_sqlite(),
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        isolation_level=None,
+        check_same_thread=False
+    )
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    return ConexionSQLite(conn)
@@ -1,53 +1,58 @@
 import pandas as pd
 import os
 import sys
-from DB.db_operations import DBOperations
+from DB.db_operations import crear_db_operations
+from tablas import leer_tabla
+from metricas import archivos_de, buscar_entradas, perfil_columna, kernel_anio, columnas_requeridas
 
-def is_valid_year(date):
-    """
-    Verifica si una fecha tiene el formato YYYY.
-    """
-    if pd.isna(date):
-        return False
-    
-    # Convertir a string y eliminar espacios
-    date = str(date).strip()
-    
-    # Verificar que sea un año válido (4 dígitos entre 1000 y 2024)
-    if len(date) == 4 and date.isdigit():
-        year = int(date)
-        if 1000 <= year <= 2024:
-            return True
-    
-    return False
+METODO = "Precision-Fechas_ap"
 
-def check_year_format(file_path, db, execution_id):
+def check_year_format(file_path, db, execution_id, df=None):
     """
     Verifica el formato de las fechas de publicación en el archivo especificado y guarda los resultados en la base de datos.
+    Si se recibe `df` (tabla ya leída), se usa en lugar de leer el archivo.
     """
     try:
-        # Leer el archivo CSV
-        df = pd.read_csv(file_path, encoding='latin-1')
+        # Leer solo las columnas que usa la métrica (desde la copia Parquet si está al día)
+        if df is None:
+            df = leer_tabla(file_path, columnas_requeridas(METODO, os.path.basename(file_path).replace('.csv', '')))
+        
+        # Columna y rango de años según el registro de métricas
+        entradas = buscar_entradas(METODO, os.path.basename(file_path).replace('.csv', ''))
+        if not entradas:
+            print(f"Archivo no soportado: {os.path.basename(file_path)}")
+            return
+        column = entradas[0]['columnas'][0]
         
-        if 'publishedDate' not in df.columns:
-            print(f"Error: No se encontró la columna 'publishedDate' en {os.path.basename(file_path)}")
+        if column not in df.columns:
+            print(f"Error: No se encontró la columna '{column}' en {os.path.basename(file_path)}")
             return
         
         total_rows = len(df)
-        valid_years = sum(df['publishedDate'].apply(is_valid_year))
-        percentage_valid = round((valid_years/total_rows)*100, 2)
+        resultado = kernel_anio(perfil_columna(df, column), **entradas[0]['parametros'])
+        validos = resultado['validos']
+        valid_years = resultado['cantidad']
+        percentage_valid = resultado['valor']
         
         # Guardar resultado de columna - porcentaje de fechas válidas
         db.guardar_resultado_columna(
             execution_id=execution_id,
             nombre_tabla=os.path.basename(file_path).replace('.csv', ''),
-            nombre_atributo='publishedDate',
+            nombre_atributo=column,
             valor={
                 'id': 'float',
                 'valor': percentage_valid
             }
         )
         
+        # Guardar resultado por tupla - un bit por fecha (válida/inválida)
+        db.guardar_resultado_bitmap(
+            execution_id=execution_id,
+            nombre_tabla=os.path.basename(file_path).replace('.csv', ''),
+            nombre_atributo=column,
+            validos=validos
+        )
+        
         print(f"\nArchivo: {os.path.basename(file_path)}")
         print(f"Total de filas leídas: {total_rows}")
         print(f"Fechas válidas (YYYY): {valid_years}")
@@ -62,11 +67,11 @@ def check_year_format(file_path, db, execution_id):
 if __name__ == "__main__":
     try:
         # Conectar a la base de datos
-        db = DBOperations()
+        db = crear_db_operations()
         
         # 1. Crear una nueva ejecución
         execution_id = db.crear_ejecucion(
-            metodo="Precision-Fechas_ap"
+            metodo=METODO
         )
         
         # 2. Procesar y guardar resultados
@@ -74,9 +79,10 @@ if __name__ == "__main__":
         project_root = os.path.dirname(current_script_dir)
         integrated_csvs_dir = os.path.join(project_root, 'integratedCSVs')
 
-        # Verificar formato en el archivo de libros
-        file_path = os.path.join(integrated_csvs_dir, 'books.csv')
-        check_year_format(file_path, db, execution_id)
+        # Verificar formato en los archivos del registro
+        for (archivo,) in archivos_de(METODO):
+            file_path = os.path.join(integrated_csvs_dir, archivo)
+            check_year_format(file_path, db, execution_id)
 
         print(f"\n{'='*10} Verificación de formato de fechas completada {'='*10}")
         
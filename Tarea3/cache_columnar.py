@@ -0,0 +1,161 @@
+import os
+import sys
+import argparse
+import pandas as pd
+from cache_metricas import huella_archivo
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # Sin pyarrow no hay caché columnar: todas las lecturas van al CSV
+    pa = None
+    pq = None
+
+# Clave de los metadatos del Parquet con la huella del CSV del que se generó
+CLAVE_HUELLA = b'cdi.huella_csv'
+
+def ruta_parquet(csv_path):
+    """Copia columnar de un CSV integrado: mismo directorio y nombre, extensión .parquet"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+def esquema_de(df):
+    """
+    Esquema Arrow explícito de una tabla leída del CSV, columna por columna, para que
+    al leer el Parquet se obtengan los mismos tipos que al leer el CSV.
+
+    Args:
+        df (DataFrame): Tabla leída con tablas.leer_csv
+
+    Returns:
+        pyarrow.Schema: Esquema de la copia columnar
+    """
+    campos = []
+    for columna, tipo in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(tipo):
+            tipo_arrow = pa.bool_()
+        elif pd.api.types.is_integer_dtype(tipo):
+            tipo_arrow = pa.int64()
+        elif pd.api.types.is_float_dtype(tipo):
+            tipo_arrow = pa.float64()
+        elif pd.api.types.infer_dtype(df[columna], skipna=True) in ('string', 'empty'):
+            tipo_arrow = pa.string()
+        else:
+            raise ValueError(f"Tipo de columna no soportado en la caché columnar: {columna} ({tipo})")
+        campos.append(pa.field(columna, tipo_arrow))
+    return pa.schema(campos)
+
+def convertir(csv_path, forzar=False):
+    """
+    Escribe la copia Parquet de un CSV integrado, salvo que ya exista una al día.
+    Guarda en sus metadatos la huella del CSV para detectar cuándo queda vieja.
+    Si la tabla tiene columnas que la copia no soporta (tipos mixtos u objetos que no
+    son texto) avisa y no la escribe: los scripts siguen leyendo el CSV.
+
+    Args:
+        csv_path (str): Ruta del CSV
+        forzar (bool): Regenera la copia aunque esté al día
+
+    Returns:
+        bool: True si se escribió una copia nueva, False si ya estaba al día o no se soporta
+    """
+    from tablas import leer_csv
+
+    if pq is None:
+        raise ImportError("La caché columnar necesita pyarrow (pip install pyarrow)")
+    if not forzar and parquet_vigente(csv_path, avisar=False):
+        return False
+
+    huella = huella_archivo(csv_path)
+    df = leer_csv(csv_path)
+    try:
+        esquema = esquema_de(df).with_metadata({CLAVE_HUELLA: huella.encode()})
+        tabla = pa.Table.from_pandas(df, schema=esquema, preserve_index=False)
+    except (ValueError, pa.ArrowException) as e:
+        print(f"  - No se genera la caché columnar de {os.path.basename(csv_path)}, se seguirá leyendo el CSV: {e}")
+        return False
+
+    # Escritura atómica: un lector nunca ve un Parquet a medio escribir
+    destino = ruta_parquet(csv_path)
+    temporal = destino + '.tmp'
+    pq.write_table(tabla, temporal)
+    os.replace(temporal, destino)
+    return True
+
+def parquet_vigente(csv_path, avisar=True):
+    """
+    Args:
+        csv_path (str): Ruta del CSV
+        avisar (bool): Imprime un aviso si la copia existe pero quedó vieja
+
+    Returns:
+        str: Ruta de la copia Parquet del CSV si existe y se generó a partir del CSV
+            actual (misma huella), o None si no hay pyarrow, no existe o quedó vieja
+    """
+    destino = ruta_parquet(csv_path)
+    if pq is None or not os.path.exists(destino) or not os.path.exists(csv_path):
+        return None
+    try:
+        metadatos = pq.read_schema(destino).metadata or {}
+    except (OSError, pa.ArrowException) as e:
+        print(f"  - No se pudo leer la caché columnar de {os.path.basename(csv_path)}: {e}")
+        return None
+    if metadatos.get(CLAVE_HUELLA) != huella_archivo(csv_path).encode():
+        if avisar:
+            print(f"  - La caché columnar de {os.path.basename(csv_path)} está desactualizada, se lee el CSV")
+        return None
+    return destino
+
+def _columnas_existentes(ruta, columnas):
+    """Columnas pedidas que existen en el Parquet, en el orden del archivo (None = todas)"""
+    nombres = pq.read_schema(ruta).names
+    return nombres if columnas is None else [nombre for nombre in nombres if nombre in set(columnas)]
+
+def leer_parquet(ruta, columnas=None):
+    """
+    Args:
+        ruta (str): Ruta del Parquet
+        columnas (iterable): Columnas a leer (las que no existan se ignoran); None para todas
+
+    Returns:
+        DataFrame: Solo las columnas pedidas
+    """
+    return pq.read_table(ruta, columns=_columnas_existentes(ruta, columnas)).to_pandas()
+
+def leer_parquet_por_bloques(ruta, chunksize, columnas=None):
+    """
+    Args:
+        ruta (str): Ruta del Parquet
+        chunksize (int): Filas por bloque
+        columnas (iterable): Columnas a leer (las que no existan se ignoran); None para todas
+
+    Yields:
+        DataFrame: Cada bloque, con los tipos del esquema de la copia
+    """
+    archivo = pq.ParquetFile(ruta)
+    for lote in archivo.iter_batches(batch_size=chunksize, columns=_columnas_existentes(ruta, columnas)):
+        yield lote.to_pandas()
+
+if __name__ == "__main__":
+    from tablas import directorio_csvs
+
+    parser = argparse.ArgumentParser(description="Genera la copia Parquet de cada CSV integrado")
+    parser.add_argument('--forzar', action='store_true', help="Regenera las copias aunque estén al día")
+    args = parser.parse_args()
+
+    if pq is None:
+        print("Error: la caché columnar necesita pyarrow (pip install pyarrow)")
+        sys.exit(1)
+
+    integrated_csvs_dir = directorio_csvs()
+    for archivo in sorted(os.listdir(integrated_csvs_dir)):
+        if not archivo.endswith('.csv'):
+            continue
+        csv_path = os.path.join(integrated_csvs_dir, archivo)
+        try:
+            if convertir(csv_path, args.forzar):
+                print(f"{archivo}: copia Parquet generada en {os.path.basename(ruta_parquet(csv_path))}")
+            elif parquet_vigente(csv_path, avisar=False):
+                print(f"{archivo}: copia Parquet al día")
+        except Exception as e:
+            print(f"Error al convertir {archivo}: {e}")
@@ -0,0 +1,163 @@
+import os
+import json
+import base64
+import hashlib
+from DB.bitmap import comprimir_bitmap, descomprimir_bitmap
+
+# Archivo de la caché, junto a los scripts de Tarea3
+RUTA_CACHE_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_metricas.json')
+
+# Módulos que usan los scripts además de su propio código: registro y kernels, lectura de
+# tablas, índices de pertenencia, HyperLogLog, caché columnar y umbrales de calidad.
+# Un cambio en cualquiera de ellos también puede cambiar los resultados
+MODULOS_COMPARTIDOS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), *partes)
+    for partes in (
+        ('metricas.py',), ('tablas.py',), ('pertenencia.py',), ('hyperloglog.py',),
+        ('cache_columnar.py',), ('DB', 'quality_utils.py')
+    )
+]
+
+# Bytes leídos de cada muestra (inicio, medio y final) para el hash de un CSV
+TAMANO_MUESTRA = 1024 * 1024
+
+def huella_archivo(ruta):
+    """
+    Huella de un archivo: tamaño, fecha de modificación y sha256 de tres muestras
+    (inicio, medio y final), sin leerlo completo.
+
+    Args:
+        ruta (str): Ruta del archivo
+
+    Returns:
+        str: Huella en hexadecimal
+    """
+    estado = os.stat(ruta)
+    sha = hashlib.sha256(f"{estado.st_size}:{estado.st_mtime_ns}".encode())
+    with open(ruta, 'rb') as archivo:
+        for posicion in (0, estado.st_size // 2, estado.st_size - TAMANO_MUESTRA):
+            archivo.seek(max(posicion, 0))
+            sha.update(archivo.read(TAMANO_MUESTRA))
+    return sha.hexdigest()
+
+def hash_fuente(ruta):
+    """sha256 del código fuente de un script, para invalidar la caché si cambia"""
+    with open(ruta, 'rb') as archivo:
+        return hashlib.sha256(archivo.read()).hexdigest()
+
+class DBRegistro:
+    """
+    Envoltorio de DBOperations que además registra los resultados guardados por una
+    métrica, para poder reproducirlos luego en otra ejecución sin recalcularlos.
+    """
+    def __init__(self, db):
+        self._db = db
+        self.registros = []
+
+    def __getattr__(self, nombre):
+        return getattr(self._db, nombre)
+
+    def guardar_resultado_columna(self, execution_id, nombre_tabla, nombre_atributo, valor):
+        self._db.guardar_resultado_columna(execution_id, nombre_tabla, nombre_atributo, valor)
+        self.registros.append({
+            'tipo': 'columna', 'tabla': nombre_tabla, 'atributo': nombre_atributo, 'valor': valor
+        })
+
+    def guardar_resultado_celda_fila(self, execution_id, nombre_tabla, nombre_atributo, id_tupla, valor):
+        self._db.guardar_resultado_celda_fila(execution_id, nombre_tabla, nombre_atributo, id_tupla, valor)
+        self.registros.append({
+            'tipo': 'celda', 'tabla': nombre_tabla, 'atributo': nombre_atributo,
+            'tupla': str(id_tupla), 'valor': valor
+        })
+
+    def guardar_resultado_bitmap(self, execution_id, nombre_tabla, nombre_atributo, validos):
+        fallos = self._db.guardar_resultado_bitmap(execution_id, nombre_tabla, nombre_atributo, validos)
+        bitmap, total, _ = comprimir_bitmap(validos)
+        self.registros.append({
+            'tipo': 'bitmap', 'tabla': nombre_tabla, 'atributo': nombre_atributo,
+            'total': total, 'bitmap': base64.b64encode(bitmap).decode('ascii')
+        })
+        return fallos
+
+def reproducir_registros(db, execution_id, registros):
+    """
+    Guarda en una ejecución nueva los resultados registrados por DBRegistro.
+
+    Args:
+        db (DBOperations): Destino de los resultados
+        execution_id (Ejecucion | str): Ejecución nueva
+        registros (list): Registros guardados en la caché
+    """
+    for registro in registros:
+        if registro['tipo'] == 'columna':
+            db.guardar_resultado_columna(execution_id, registro['tabla'], registro['atributo'], registro['valor'])
+        elif registro['tipo'] == 'celda':
+            db.guardar_resultado_celda_fila(
+                execution_id, registro['tabla'], registro['atributo'], registro['tupla'], registro['valor']
+            )
+        elif registro['tipo'] == 'bitmap':
+            validos = descomprimir_bitmap(base64.b64decode(registro['bitmap']), registro['total'])
+            db.guardar_resultado_bitmap(execution_id, registro['tabla'], registro['atributo'], validos)
+
+class CacheMetricas:
+    """
+    Caché local de resultados de métricas. Guarda el último resultado de cada método
+    aplicado junto con la huella de los archivos de entrada y del código del script
+    que lo calculó; solo se reutiliza si la huella actual coincide.
+    """
+    def __init__(self, ruta=None):
+        """
+        Args:
+            ruta (str): Archivo JSON de la caché; por defecto .cache_metricas.json en Tarea3
+        """
+        self.ruta = ruta or RUTA_CACHE_POR_DEFECTO
+        self.entradas = {}
+        self.nuevas = {}
+        if os.path.exists(self.ruta):
+            try:
+                with open(self.ruta, encoding='utf-8') as archivo:
+                    self.entradas = json.load(archivo)
+            except (OSError, ValueError) as e:
+                print(f"  - No se pudo leer la caché de métricas, se descarta: {e}")
+
+    def huella(self, metrica, script_path, rutas):
+        """
+        Args:
+            metrica (dict): Entrada de METRICAS
+            script_path (str): Ruta del script de la métrica
+            rutas (list): Rutas de todos los archivos que lee la métrica
+
+        Returns:
+            str: Clave de la caché, o None si falta algún archivo
+        """
+        if not all(os.path.exists(ruta) for ruta in rutas):
+            return None
+        clave = {
+            'metodo': metrica['metodo'],
+            'funcion': metrica['funcion'],
+            'archivos': metrica['archivos'],
+            'fuente': hash_fuente(script_path),
+            'compartidos': [hash_fuente(ruta) for ruta in MODULOS_COMPARTIDOS],
+            'huellas': [huella_archivo(ruta) for ruta in rutas]
+        }
+        return hashlib.sha256(json.dumps(clave, sort_keys=True).encode()).hexdigest()
+
+    def obtener(self, metodo, huella):
+        """Registros guardados de un método aplicado, o None si su huella cambió"""
+        entrada = self.entradas.get(metodo)
+        if huella is None or entrada is None or entrada['huella'] != huella:
+            return None
+        return entrada['registros']
+
+    def guardar(self, metodo, huella, registros):
+        """Reemplaza el resultado guardado de un método aplicado"""
+        if huella is not None:
+            self.entradas[metodo] = self.nuevas[metodo] = {'huella': huella, 'registros': registros}
+
+    def escribir(self):
+        """Persiste la caché (escritura atómica con archivo temporal)"""
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            # Los valores calculados con pandas pueden ser escalares de numpy
+            json.dump(self.entradas, archivo, default=lambda valor: valor.item())
+        os.replace(temporal, self.ruta)
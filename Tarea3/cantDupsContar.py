@@ -1,39 +1,36 @@
 import pandas as pd
 import os
 import sys
-from DB.db_operations import DBOperations
+from DB.db_operations import crear_db_operations
+from tablas import leer_tabla
+from metricas import KERNELS, archivos_de, buscar_entradas, perfil_columna, valor_columna, columnas_requeridas
 
-def contar_duplicados(file_path, db, execution_id):
+METODO = "NoDuplicacion-CantDups-Contar_ap"
+
+def contar_duplicados(file_path, db, execution_id, df=None):
     """
     Cuenta los valores duplicados en las columnas especificadas del archivo.
+    Si se recibe `df` (tabla ya leída), se usa en lugar de leer el archivo.
     """
     try:
-        # Intentar diferentes codificaciones
-        encodings = ['latin-1', 'utf-8', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                # Leer el archivo con low_memory=False para evitar advertencias de tipos mixtos
-                df = pd.read_csv(file_path, encoding=encoding, low_memory=False)
-                break
-            except UnicodeDecodeError:
-                continue
-        
         if df is None:
-            raise Exception("No se pudo leer el archivo con ninguna codificación")
+            # Solo las columnas que usa la métrica (desde la copia Parquet si está al día)
+            df = leer_tabla(file_path, columnas_requeridas(METODO, os.path.basename(file_path).replace('.csv', '')))
         
         # Imprimir las columnas disponibles para debug
         print(f"Columnas disponibles: {df.columns.tolist()}")
         
-        # Determinar las columnas a verificar según el archivo
-        if 'books.csv' in file_path:
-            columns_to_check = ['Id', 'Title']
-        elif 'users.csv' in file_path:
-            columns_to_check = ['User_id']
-        else:
+        # Determinar las columnas a verificar según el registro de métricas
+        entradas = buscar_entradas(METODO, os.path.basename(file_path).replace('.csv', ''))
+        if not entradas:
             print(f"Archivo no soportado: {os.path.basename(file_path)}")
             return
+        columns_to_check = [column for entrada in entradas for column in entrada['columnas']]
+        # Kernel y parámetros de cada columna (exacto, o aproximado con HyperLogLog)
+        kernels = {
+            column: (KERNELS[entrada['kernel']], entrada['parametros'])
+            for entrada in entradas for column in entrada['columnas']
+        }
         
         # Verificar que las columnas existan
         missing_columns = [col for col in columns_to_check if col not in df.columns]
@@ -45,25 +42,25 @@ def contar_duplicados(file_path, db, execution_id):
         for column in columns_to_check:
             try:
                 # Contar duplicados para la columna actual
-                duplicates = df[column].duplicated().sum()
-                total_rows = len(df)
-                duplicate_percentage = round((duplicates / total_rows) * 100, 2)
+                kernel, parametros = kernels[column]
+                resultado = kernel(perfil_columna(df, column), **parametros)
+                duplicates = resultado['cantidad']
+                duplicate_percentage = resultado['valor']
                 
                 # Guardar resultado de columna - porcentaje de duplicados
                 db.guardar_resultado_columna(
                     execution_id=execution_id,
                     nombre_tabla=os.path.basename(file_path).replace('.csv', ''),
                     nombre_atributo=column,
-                    valor={
-                        'id': 'float',
-                        'valor': duplicate_percentage
-                    }
+                    valor=valor_columna(resultado)
                 )
                 
                 print(f"\nArchivo: {os.path.basename(file_path)}")
                 print(f"Columna: {column}")
                 print(f"Total de duplicados: {duplicates}")
                 print(f"Porcentaje de duplicados: {duplicate_percentage:.2f}%")
+                if 'error' in resultado:
+                    print(f"Estimación con HyperLogLog, error estándar: ± {resultado['error']:.2f} puntos")
                 
             except Exception as e:
                 print(f"Error al guardar resultados en la base de datos para la columna {column}: {e}")
@@ -78,11 +75,11 @@ def contar_duplicados(file_path, db, execution_id):
 if __name__ == "__main__":
     try:
         # Conectar a la base de datos
-        db = DBOperations()
+        db = crear_db_operations()
         
         # 1. Crear una nueva ejecución
         execution_id = db.crear_ejecucion(
-            metodo="NoDuplicacion-CantDups-Contar_ap"
+            metodo=METODO
         )
         
         # 2. Procesar y guardar resultados
@@ -90,10 +87,9 @@ if __name__ == "__main__":
         project_root = os.path.dirname(current_script_dir)
         integrated_csvs_dir = os.path.join(project_root, 'integratedCSVs')
 
-        # Verificar duplicados en los archivos
-        files = ['books.csv', 'users.csv']
-        for file in files:
-            file_path = os.path.join(integrated_csvs_dir, file)
+        # Verificar duplicados en los archivos del registro
+        for (archivo,) in archivos_de(METODO):
+            file_path = os.path.join(integrated_csvs_dir, archivo)
             contar_duplicados(file_path, db, execution_id)
 
         print(f"\n{'='*10} Verificación de duplicados completada {'='*10}")
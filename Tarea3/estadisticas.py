@@ -0,0 +1,62 @@
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows no tiene el módulo resource: el pico de RSS queda sin medir
+    resource = None
+
+def pico_rss_kb():
+    """
+    Pico de memoria residente del proceso desde que arrancó, en KB, o None si no
+    se puede medir en esta plataforma. Es un máximo de toda la vida del proceso: solo
+    corresponde a una métrica si esta corrió sola en un proceso nuevo.
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en bytes en macOS y en KB en Linux
+    return pico // 1024 if sys.platform == 'darwin' else pico
+
+class DBCronometrado:
+    """
+    Envoltorio de DBOperations que acumula el tiempo pasado en las escrituras de
+    resultados, para separarlo del tiempo de cálculo de la métrica.
+    """
+    METODOS_ESCRITURA = {
+        'guardar_resultado_celda', 'guardar_resultado_columna', 'guardar_resultado_celda_fila',
+        'guardar_resultado_bitmap', 'copiar_resultados_celda_fila', 'flush'
+    }
+
+    def __init__(self, db):
+        self._db = db
+        self.tiempo_escritura = 0.0
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._db, nombre)
+        if nombre not in self.METODOS_ESCRITURA:
+            return atributo
+
+        def cronometrado(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return atributo(*args, **kwargs)
+            finally:
+                self.tiempo_escritura += time.perf_counter() - inicio
+        return cronometrado
+
+def formatear_estadisticas(estadisticas):
+    """Línea de resumen con las estadísticas de una ejecución"""
+    if estadisticas.get('cacheado'):
+        return f"resultados de la caché, escritura {estadisticas['tiempo_escritura']:.2f}s"
+    memoria = []
+    if estadisticas['pico_rss_kb'] is not None:
+        memoria.append(f"pico RSS {estadisticas['pico_rss_kb'] / 1024:.1f} MB")
+    if estadisticas['pico_tracemalloc_kb'] is not None:
+        memoria.append(f"pico tracemalloc {estadisticas['pico_tracemalloc_kb'] / 1024:.1f} MB")
+    return (
+        f"lectura {estadisticas['tiempo_lectura']:.2f}s, cálculo {estadisticas['tiempo_calculo']:.2f}s, "
+        f"escritura {estadisticas['tiempo_escritura']:.2f}s, {estadisticas['filas']} filas, "
+        f"{estadisticas['bytes'] / 1024 / 1024:.1f} MB" + ''.join(f", {m}" for m in memoria)
+    )
@@ -1,36 +1,29 @@
 import os
 import sys
 import pandas as pd
-from DB.db_operations import DBOperations
+from DB.db_operations import crear_db_operations
+from tablas import leer_tabla
+from metricas import archivos_de, perfil_columna, kernel_nulos
 
-def analyze_csv_file(file_path, db, execution_id):
+METODO = "Densidad-Grado-Contar_ap"
+
+def analyze_csv_file(file_path, db, execution_id, df=None):
     """
     Analiza un archivo CSV y cuenta los valores nulos en cada columna.
+    Si se recibe `df` (tabla ya leída), se usa en lugar de leer el archivo.
     """
     try:
-        # Intentar diferentes codificaciones
-        encodings = ['latin-1', 'utf-8', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
         if df is None:
-            raise Exception("No se pudo leer el archivo con ninguna codificación")
-        
-        # Contar valores nulos por columna
-        null_counts = df.isnull().sum()
-        total_rows = len(df)
+            # Desde la copia Parquet si está al día; si no, desde el CSV
+            df = leer_tabla(file_path)
         
         # Procesar cada columna
         for column in df.columns:
             try:
-                # Calcular porcentaje de valores nulos
-                null_percentage = round((null_counts[column] / total_rows) * 100, 2)
+                # Contar valores nulos (con el perfil compartido de la columna)
+                resultado = kernel_nulos(perfil_columna(df, column))
+                null_count = resultado['cantidad']
+                null_percentage = resultado['valor']
                 
                 # Guardar resultado de columna - porcentaje de valores nulos
                 db.guardar_resultado_columna(
@@ -45,7 +38,7 @@ def analyze_csv_file(file_path, db, execution_id):
                 
                 print(f"\nArchivo: {os.path.basename(file_path)}")
                 print(f"Columna: {column}")
-                print(f"Total de valores nulos: {null_counts[column]}")
+                print(f"Total de valores nulos: {null_count}")
                 print(f"Porcentaje de valores nulos: {null_percentage:.2f}%")
                 
             except Exception as e:
@@ -61,11 +54,11 @@ def analyze_csv_file(file_path, db, execution_id):
 if __name__ == "__main__":
     try:
         # Conectar a la base de datos
-        db = DBOperations()
+        db = crear_db_operations()
         
         # 1. Crear una nueva ejecución
         execution_id = db.crear_ejecucion(
-            metodo="Densidad-Grado-Contar_ap"
+            metodo=METODO
         )
         
         # 2. Procesar y guardar resultados
@@ -73,10 +66,9 @@ if __name__ == "__main__":
         project_root = os.path.dirname(current_script_dir)
         integrated_csvs_dir = os.path.join(project_root, 'integratedCSVs')
 
-        # Analizar cada archivo CSV
-        files = ['books.csv', 'ratings.csv', 'users.csv']
-        for file in files:
-            file_path = os.path.join(integrated_csvs_dir, file)
+        # Analizar cada archivo CSV del registro
+        for (archivo,) in archivos_de(METODO):
+            file_path = os.path.join(integrated_csvs_dir, archivo)
             analyze_csv_file(file_path, db, execution_id)
 
         print(f"\n{'='*10} Análisis de valores nulos completado {'='*10}")
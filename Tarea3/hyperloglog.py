@@ -0,0 +1,79 @@
+import math
+import numpy as np
+import pandas as pd
+
+# Rango de precisiones admitidas: 2^7 registros (error ~9%) a 2^18 (error ~0.2%)
+PRECISION_MINIMA = 7
+PRECISION_MAXIMA = 18
+
+def precision_para_error(error_relativo):
+    """
+    Precisión (log2 de la cantidad de registros) necesaria para que el error
+    estándar relativo de la estimación, 1.04 / sqrt(2^p), no supere `error_relativo`.
+    """
+    if not 0 < error_relativo < 1:
+        raise ValueError(f"El error relativo debe estar entre 0 y 1: {error_relativo}")
+    precision = math.ceil(math.log2((1.04 / error_relativo) ** 2))
+    return min(max(precision, PRECISION_MINIMA), PRECISION_MAXIMA)
+
+def _longitud_bits(valores):
+    """bit_length de cada elemento de un array uint64 (0 para el 0), sin pasar por float"""
+    valores = valores.copy()
+    longitud = np.zeros(len(valores), dtype=np.uint8)
+    for desplazamiento in (32, 16, 8, 4, 2, 1):
+        mayores = valores >= (np.uint64(1) << np.uint64(desplazamiento))
+        longitud[mayores] += desplazamiento
+        valores[mayores] >>= np.uint64(desplazamiento)
+    longitud += (valores > 0).astype(np.uint8)
+    return longitud
+
+class HyperLogLog:
+    """
+    Estimador de la cantidad de valores distintos de una columna en memoria
+    constante (2^p bytes), con el hash de 64 bits de pandas. Dos estimadores con la
+    misma precisión se pueden combinar, así que sirve para leer de a bloques.
+    """
+    def __init__(self, error_relativo=0.01):
+        """
+        Args:
+            error_relativo (float): Error estándar relativo máximo aceptado en la estimación
+        """
+        self.precision = precision_para_error(error_relativo)
+        self.registros = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    @property
+    def error_relativo(self):
+        """Error estándar relativo de la estimación con la precisión elegida"""
+        return 1.04 / math.sqrt(len(self.registros))
+
+    def agregar(self, serie):
+        """Agrega los valores de una Series (los nulos cuentan como un valor más)"""
+        hashes = pd.util.hash_pandas_object(serie, index=False).to_numpy(dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        bits_resto = 64 - self.precision
+        indices = (hashes >> np.uint64(bits_resto)).astype(np.intp)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+        # Posición del primer 1 en los bits restantes (bits_resto + 1 si son todos 0)
+        rangos = (bits_resto + 1 - _longitud_bits(resto)).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rangos)
+
+    def combinar(self, otro):
+        """Suma al estimador los valores vistos por otro con la misma precisión"""
+        if otro.precision != self.precision:
+            raise ValueError("Solo se pueden combinar estimadores con la misma precisión")
+        np.maximum(self.registros, otro.registros, out=self.registros)
+
+    def estimar(self):
+        """
+        Returns:
+            float: Cantidad estimada de valores distintos
+        """
+        m = len(self.registros)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimacion = alpha * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int32)))
+        vacios = int(np.count_nonzero(self.registros == 0))
+        if estimacion <= 2.5 * m and vacios > 0:
+            # Pocos valores: conteo lineal sobre los registros vacíos
+            estimacion = m * math.log(m / vacios)
+        return float(estimacion)
@@ -1,78 +1,65 @@
 import pandas as pd
 import os
 import sys
-from DB.db_operations import DBOperations
+from DB.db_operations import crear_db_operations
+from tablas import leer_tabla
+from metricas import archivos_de, buscar_entradas, perfil_columna, kernel_rango, columnas_requeridas
 
-def contar_datos_en_rango(file_path, db, execution_id):
+METODO = "IntDominio-OutBounds-Gen-ContarNum_ap"
+
+def contar_datos_en_rango(file_path, db, execution_id, df=None):
     """
     Cuenta los datos que están dentro de los rangos especificados.
+    Si se recibe `df` (tabla ya leída), se usa en lugar de leer el archivo.
     """
     try:
-        # Intentar diferentes codificaciones
-        encodings = ['latin-1', 'utf-8', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                # Leer el archivo con low_memory=False para evitar advertencias de tipos mixtos
-                df = pd.read_csv(file_path, encoding=encoding, low_memory=False)
-                break
-            except UnicodeDecodeError:
-                continue
-        
         if df is None:
-            raise Exception("No se pudo leer el archivo con ninguna codificación")
+            # Solo las columnas que usa la métrica (desde la copia Parquet si está al día)
+            df = leer_tabla(file_path, columnas_requeridas(METODO, os.path.basename(file_path).replace('.csv', '')))
         
         # Imprimir las columnas disponibles para debug
         print(f"Columnas disponibles: {df.columns.tolist()}")
         
-        # Determinar las columnas y rangos según el archivo
-        if 'users.csv' in file_path:
-            column = 'Age'
-            min_val = 18
-            max_val = 123
-        elif 'ratings.csv' in file_path:
-            column = 'review/score'
-            min_val = 5
-            max_val = 10
-        elif 'books.csv' in file_path:
-            column = 'ratingsCount'
-            min_val = 5
-            max_val = 10
-        else:
+        # Determinar las columnas y rangos según el registro de métricas
+        entradas = buscar_entradas(METODO, os.path.basename(file_path).replace('.csv', ''))
+        if not entradas:
             print(f"Archivo no soportado: {os.path.basename(file_path)}")
             return
         
-        # Verificar que la columna exista
-        if column not in df.columns:
-            print(f"Error: No se encontró la columna {column}")
-            return
-        
-        try:
-            # Contar valores en rango
-            in_range = ((df[column] >= min_val) & (df[column] <= max_val)).sum()
-            total_rows = len(df)
-            in_range_percentage = round((in_range / total_rows) * 100, 2)
-            
-            # Guardar resultado de columna - porcentaje de valores en rango
-            db.guardar_resultado_columna(
-                execution_id=execution_id,
-                nombre_tabla=os.path.basename(file_path).replace('.csv', ''),
-                nombre_atributo=column,
-                valor={
-                    'id': 'float',
-                    'valor': in_range_percentage
-                }
-            )
-            
-            print(f"\nArchivo: {os.path.basename(file_path)}")
-            print(f"Columna: {column}")
-            print(f"Valores en rango [{min_val}, {max_val}]: {in_range}")
-            print(f"Porcentaje de valores en rango: {in_range_percentage:.2f}%")
-            
-        except Exception as e:
-            print(f"Error al guardar resultados en la base de datos para la columna {column}: {e}")
-            raise
+        for entrada in entradas:
+            min_val = entrada['parametros']['minimo']
+            max_val = entrada['parametros']['maximo']
+            for column in entrada['columnas']:
+                # Verificar que la columna exista
+                if column not in df.columns:
+                    print(f"Error: No se encontró la columna {column}")
+                    continue
+                
+                try:
+                    # Contar valores en rango
+                    resultado = kernel_rango(perfil_columna(df, column), min_val, max_val)
+                    in_range = resultado['cantidad']
+                    in_range_percentage = resultado['valor']
+                    
+                    # Guardar resultado de columna - porcentaje de valores en rango
+                    db.guardar_resultado_columna(
+                        execution_id=execution_id,
+                        nombre_tabla=os.path.basename(file_path).replace('.csv', ''),
+                        nombre_atributo=column,
+                        valor={
+                            'id': 'float',
+                            'valor': in_range_percentage
+                        }
+                    )
+                    
+                    print(f"\nArchivo: {os.path.basename(file_path)}")
+                    print(f"Columna: {column}")
+                    print(f"Valores en rango [{min_val}, {max_val}]: {in_range}")
+                    print(f"Porcentaje de valores en rango: {in_range_percentage:.2f}%")
+                    
+                except Exception as e:
+                    print(f"Error al guardar resultados en la base de datos para la columna {column}: {e}")
+                    raise
         
     except FileNotFoundError:
         print(f"Error: No se pudo encontrar el archivo {file_path}")
@@ -83,11 +70,11 @@ def contar_datos_en_rango(file_path, db, execution_id):
 if __name__ == "__main__":
     try:
         # Conectar a la base de datos
-        db = DBOperations()
+        db = crear_db_operations()
         
         # 1. Crear una nueva ejecución
         execution_id = db.crear_ejecucion(
-            metodo="IntDominio-OutBounds-Gen-ContarNum_ap"
+            metodo=METODO
         )
         
         # 2. Procesar y guardar resultados
@@ -95,10 +82,9 @@ if __name__ == "__main__":
         project_root = os.path.dirname(current_script_dir)
         integrated_csvs_dir = os.path.join(project_root, 'integratedCSVs')
 
-        # Verificar rangos en los archivos
-        files = ['users.csv', 'ratings.csv', 'books.csv']
-        for file in files:
-            file_path = os.path.join(integrated_csvs_dir, file)
+        # Verificar rangos en los archivos del registro
+        for (archivo,) in archivos_de(METODO):
+            file_path = os.path.join(integrated_csvs_dir, archivo)
             contar_datos_en_rango(file_path, db, execution_id)
 
         print(f"\n{'='*10} Verificación de rangos completada {'='*10}")
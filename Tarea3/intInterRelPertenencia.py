@@ -1,44 +1,71 @@
 import pandas as pd
 import os
 import sys
-from DB.db_operations import DBOperations
+from DB.db_operations import crear_db_operations
+from tablas import leer_columna_por_bloques
+from metricas import (
+    archivos_de, buscar_entradas, perfil_columna, kernel_referencias, valor_columna, ValoresVistos, AcumuladorReferencias
+)
 
-def check_referential_integrity(file_path, reference_file, db, execution_id):
+METODO = "IntInterRel-Pertenencia_ap"
+
+def check_referential_integrity(file_path, reference_file, db, execution_id, df=None, df_referencia=None):
     """
     Verifica la integridad referencial entre books y ratings.
     Calcula el porcentaje de ratings que tienen book_ids que no existen en books.
+    Si se reciben `df` y `df_referencia` (tablas ya leídas), se usan; si no, se leen
+    de a bloques solo las dos columnas involucradas, con memoria acotada: los Ids de
+    books forman un índice de pertenencia y ratings se recorre contra ese índice.
     """
     try:
-        # Leer ambos archivos CSV
-        df_books = pd.read_csv(file_path, encoding='latin-1', low_memory=False)
-        df_ratings = pd.read_csv(reference_file, encoding='latin-1', low_memory=False)
+        # Columna que referencia y columna referenciada según el registro de métricas
+        nombre_tabla = os.path.basename(reference_file).replace('.csv', '')
+        entradas = buscar_entradas(METODO, nombre_tabla)
+        if not entradas:
+            print(f"Archivo no soportado: {os.path.basename(reference_file)}")
+            return
+        column = entradas[0]['columnas'][0]
+        _, columna_referenciada = entradas[0]['parametros']['referencia']
+        # Modo del índice (exacto o filtro de Bloom) y sus opciones
+        parametros = {k: v for k, v in entradas[0]['parametros'].items() if k != 'referencia'}
         
         # Verificar que las columnas existan
-        if 'Id' not in df_books.columns or 'Id' not in df_ratings.columns:
+        if (df is not None and columna_referenciada not in df.columns) or \
+                (df_referencia is not None and column not in df_referencia.columns):
             print(f"Error: No se encontraron las columnas necesarias")
             return
         
-        # Obtener los IDs válidos de books
-        valid_book_ids = set(df_books['Id'].unique())
-        
-        # Contar referencias inválidas (book_ids que no existen en books)
-        invalid_references = ~df_ratings['Id'].isin(valid_book_ids)
-        total_references = len(df_ratings)
-        invalid_count = invalid_references.sum()
-        
-        # Calcular porcentaje de referencias inválidas
-        # Redondear a 2 cifras significativas
-        invalid_percentage = round(invalid_count / total_references * 100, 2)
+        try:
+            if df is not None:
+                referencia = df[columna_referenciada]
+            else:
+                vistos = ValoresVistos()
+                for bloque in leer_columna_por_bloques(file_path, columna_referenciada):
+                    vistos.agregar(bloque)
+                referencia = vistos.como_serie()
+            
+            # Contar referencias inválidas (book_ids que no existen en books)
+            if df_referencia is not None:
+                resultado = kernel_referencias(perfil_columna(df_referencia, column), referencia, **parametros)
+                total_references = len(df_referencia)
+            else:
+                acumulador = AcumuladorReferencias(referencia, **parametros)
+                for bloque in leer_columna_por_bloques(reference_file, column):
+                    acumulador.agregar(bloque)
+                resultado = acumulador.resultado()
+                total_references = acumulador.total
+        except KeyError:
+            print(f"Error: No se encontraron las columnas necesarias")
+            return
+        invalid_count = resultado['cantidad']
+        invalid_percentage = resultado['valor']
         
         # Guardar resultado de columna - porcentaje de referencias inválidas
         db.guardar_resultado_columna(
             execution_id=execution_id,
-            nombre_tabla=os.path.basename(reference_file).replace('.csv', ''),
-            nombre_atributo='Id',
-            valor={
-                'id': 'float',
-                'valor': invalid_percentage
-            }
+            nombre_tabla=nombre_tabla,
+            nombre_atributo=column,
+            valor=valor_columna(resultado)
         )
         
         print(f"\nArchivo principal: {os.path.basename(file_path)}")
@@ -46,6 +73,8 @@ def check_referential_integrity(file_path, reference_file, db, execution_id):
         print(f"Total de ratings: {total_references}")
         print(f"Ratings con Ids inválidos: {invalid_count}")
         print(f"Porcentaje de referencias inválidas: {invalid_percentage:.2f}%")
+        if 'error' in resultado:
+            print(f"Índice con filtro de Bloom: pueden faltar hasta ~{resultado['error']:.2f} puntos por falsos positivos")
         
     except FileNotFoundError:
         print(f"Error: No se pudo encontrar uno de los archivos")
@@ -56,11 +85,11 @@ def check_referential_integrity(file_path, reference_file, db, execution_id):
 if __name__ == "__main__":
     try:
         # Conectar a la base de datos
-        db = DBOperations()
+        db = crear_db_operations()
         
         # 1. Crear una nueva ejecución
         execution_id = db.crear_ejecucion(
-            metodo="IntInterRel-Pertenencia_ap"
+            metodo=METODO
         )
         
         # 2. Procesar y guardar resultados
@@ -68,10 +97,10 @@ if __name__ == "__main__":
         project_root = os.path.dirname(current_script_dir)
         integrated_csvs_dir = os.path.join(project_root, 'integratedCSVs')
 
-        # Verificar integridad referencial entre books y ratings
-        books_path = os.path.join(integrated_csvs_dir, 'books.csv')
-        ratings_path = os.path.join(integrated_csvs_dir, 'ratings.csv')
-        check_referential_integrity(books_path, ratings_path, db, execution_id)
+        # Verificar integridad referencial: tabla referenciada y tabla que la referencia
+        for archivos in archivos_de(METODO):
+            file_path, reference_file = (os.path.join(integrated_csvs_dir, archivo) for archivo in archivos)
+            check_referential_integrity(file_path, reference_file, db, execution_id)
 
         print(f"\n{'='*10} Verificación de integridad referencial completada {'='*10}")
         
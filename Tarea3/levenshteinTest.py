@@ -1,5 +1,7 @@
 from Levenshtein import distance
+import os
 import pandas as pd
+from tablas import leer_tabla, directorio_csvs
 import csv
 from multiprocessing import Pool, cpu_count
 from functools import partial
@@ -32,7 +34,8 @@ def procesar_fila(args):
 if __name__ == "__main__":
     try:
         print("Leyendo archivo CSV...")
-        books_df = pd.read_csv('../../integratedCSVs/books.csv', encoding='latin-1')
+        # Solo título y descripción (desde la copia Parquet si está al día)
+        books_df = leer_tabla(os.path.join(directorio_csvs(), 'books.csv'), ['Title', 'description'])
         
         # Obtener títulos y descripciones
         titulos = books_df['Title'].values
@@ -0,0 +1,467 @@
+import weakref
+import numpy as np
+import pandas as pd
+from functools import cached_property
+from hyperloglog import HyperLogLog
+from pertenencia import crear_indice
+
+# ISBN válido (sin espacios ni guiones, en mayúsculas): ISBN-10 son 9 dígitos seguidos
+# de un dígito o X; ISBN-13 es 978 o 979 seguido de 10 dígitos
+PATRON_ISBN = r'\d{9}[0-9X]|97[89]\d{10}'
+
+def porcentaje(cantidad, total):
+    """Porcentaje redondeado a 2 decimales, como lo guardan todas las métricas"""
+    return round((cantidad / total) * 100, 2)
+
+class PerfilColumna:
+    """
+    Evaluador de una columna para todas las métricas que la usan. Los intermedios
+    (máscara de nulos, texto normalizado de los valores no nulos) se calculan una
+    sola vez, al pedirlos por primera vez, y los comparten todas las estadísticas.
+    Las validaciones de ISBN y año son vectorizadas, sin apply fila por fila.
+    """
+    def __init__(self, serie):
+        self.serie = serie
+
+    def __len__(self):
+        return len(self.serie)
+
+    @cached_property
+    def mascara_nulos(self):
+        return self.serie.isna().to_numpy()
+
+    @cached_property
+    def texto(self):
+        """Valores no nulos como texto sin espacios al inicio ni al final"""
+        return self.serie[~self.mascara_nulos].astype(str).str.strip()
+
+    def _a_columna_completa(self, validos_no_nulos):
+        """Lleva una máscara calculada sobre `texto` al largo de la columna (nulos = False)"""
+        validos = np.zeros(len(self.serie), dtype=bool)
+        validos[~self.mascara_nulos] = validos_no_nulos.to_numpy(dtype=bool, na_value=False)
+        return pd.Series(validos, index=self.serie.index)
+
+    @cached_property
+    def nulos(self):
+        return int(self.mascara_nulos.sum())
+
+    @cached_property
+    def duplicados(self):
+        return int(self.serie.duplicated().sum())
+
+    def en_rango(self, minimo, maximo):
+        return int(((self.serie >= minimo) & (self.serie <= maximo)).sum())
+
+    @cached_property
+    def isbn_validos(self):
+        limpio = self.texto.str.replace('-', '', regex=False).str.upper()
+        return self._a_columna_completa(limpio.str.fullmatch(PATRON_ISBN))
+
+    def anios_validos(self, minimo=1000, maximo=2024):
+        # Año válido: exactamente 4 dígitos, entre minimo y maximo
+        texto = self.texto
+        candidatos = (texto.str.len() == 4) & texto.str.isdecimal()
+        anios = pd.to_numeric(texto.where(candidatos), errors='coerce')
+        # Dígitos no ASCII (p. ej. de ancho completo): int() los acepta, to_numeric no
+        otros = candidatos & anios.isna()
+        if otros.any():
+            anios[otros] = texto[otros].map(int)
+        return self._a_columna_completa((anios >= minimo) & (anios <= maximo))
+
+# Perfiles compartidos por DataFrame y columna; se descartan al liberarse el DataFrame
+_perfiles = {}
+
+def perfil_columna(df, columna):
+    """
+    Perfil de una columna de una tabla ya leída, compartido entre todas las métricas
+    que la evalúan (en el runner en proceso, los scripts reciben el mismo DataFrame).
+
+    Args:
+        df (DataFrame): Tabla
+        columna (str): Nombre de la columna
+
+    Returns:
+        PerfilColumna: Perfil de la columna
+    """
+    clave = id(df)
+    if clave not in _perfiles:
+        _perfiles[clave] = {}
+        weakref.finalize(df, _perfiles.pop, clave, None)
+    if columna not in _perfiles[clave]:
+        _perfiles[clave][columna] = PerfilColumna(df[columna])
+    return _perfiles[clave][columna]
+
+def _perfil(serie):
+    return serie if isinstance(serie, PerfilColumna) else PerfilColumna(serie)
+
+# Kernels: calculan una métrica sobre una columna (Series o PerfilColumna). Reciben
+# también los parámetros de la entrada del registro y devuelven 'valor' (el porcentaje
+# a guardar), 'cantidad' (las filas que cuenta el porcentaje) y, en las métricas
+# válido/inválido por tupla, 'validos' (una serie booleana para guardar como bitmap),
+# y en las aproximadas, 'error' (error estándar del porcentaje, en puntos porcentuales).
+
+def kernel_nulos(serie):
+    perfil = _perfil(serie)
+    return {'valor': porcentaje(perfil.nulos, len(perfil)), 'cantidad': perfil.nulos}
+
+def kernel_duplicados(serie):
+    perfil = _perfil(serie)
+    return {'valor': porcentaje(perfil.duplicados, len(perfil)), 'cantidad': perfil.duplicados}
+
+def resultado_duplicados_aprox(estimador, total):
+    """
+    Duplicados estimados a partir de los valores distintos estimados, con su error
+    estándar ('error', en puntos porcentuales) para guardarlo junto al porcentaje.
+    """
+    distintos = min(max(round(estimador.estimar()), min(total, 1)), total)
+    cantidad = total - distintos
+    return {
+        'valor': porcentaje(cantidad, total),
+        'cantidad': cantidad,
+        'error': porcentaje(estimador.error_relativo * distintos, total)
+    }
+
+def kernel_duplicados_aprox(serie, error_relativo=0.01):
+    # Cuenta aproximada con HyperLogLog: memoria constante en lugar de una tabla hash
+    # con todos los valores
+    perfil = _perfil(serie)
+    estimador = HyperLogLog(error_relativo)
+    estimador.agregar(perfil.serie)
+    return resultado_duplicados_aprox(estimador, len(perfil))
+
+def kernel_rango(serie, minimo, maximo):
+    perfil = _perfil(serie)
+    cantidad = perfil.en_rango(minimo, maximo)
+    return {'valor': porcentaje(cantidad, len(perfil)), 'cantidad': cantidad}
+
+def kernel_isbn(serie):
+    perfil = _perfil(serie)
+    validos = perfil.isbn_validos
+    cantidad = int(validos.sum())
+    return {'valor': porcentaje(cantidad, len(perfil)), 'cantidad': cantidad, 'validos': validos}
+
+def kernel_anio(serie, minimo=1000, maximo=2024):
+    perfil = _perfil(serie)
+    validos = perfil.anios_validos(minimo, maximo)
+    cantidad = int(validos.sum())
+    return {'valor': porcentaje(cantidad, len(perfil)), 'cantidad': cantidad, 'validos': validos}
+
+def resultado_referencias(indice, cantidad, total):
+    """
+    Referencias inválidas contadas con un índice de pertenencia. Con un filtro de
+    Bloom los falsos positivos ocultan algunas: 'error' es lo que se espera que falte.
+    """
+    resultado = {'valor': porcentaje(cantidad, total), 'cantidad': cantidad}
+    tasa = indice.tasa_falsos_positivos
+    if tasa:
+        resultado['error'] = porcentaje(cantidad * tasa / (1 - tasa), total)
+    return resultado
+
+def kernel_referencias(serie, referencia, modo='exacto', tasa_falsos_positivos=0.01):
+    perfil = _perfil(serie)
+    # Referencias inválidas: valores que no existen en la columna referenciada
+    indice = crear_indice(referencia, modo, tasa_falsos_positivos)
+    cantidad = int((~indice.contiene(perfil.serie)).sum())
+    return resultado_referencias(indice, cantidad, len(perfil))
+
+# Kernels cuyo resultado no depende del tipo que pandas infiere para la columna
+KERNELS_SIN_TIPO = {'nulos'}
+
+KERNELS = {
+    'nulos': kernel_nulos,
+    'duplicados': kernel_duplicados,
+    'duplicados_aprox': kernel_duplicados_aprox,
+    'rango': kernel_rango,
+    'isbn': kernel_isbn,
+    'anio': kernel_anio,
+    'referencias': kernel_referencias,
+}
+
+class ValoresVistos:
+    """
+    Valores distintos de una columna leída de a bloques (los nulos cuentan como un
+    único valor, como en `duplicated` y `unique` de pandas).
+    """
+    def __init__(self):
+        self.valores = set()
+        self.hay_nulos = False
+
+    def agregar(self, serie):
+        """
+        Args:
+            serie (Series): Siguiente bloque de la columna
+
+        Returns:
+            int: Valores del bloque que ya habían aparecido, en este bloque o en uno anterior
+        """
+        mascara_nulos = serie.isna()
+        nulos = int(mascara_nulos.sum())
+        repetidos = nulos - (0 if self.hay_nulos or nulos == 0 else 1)
+        self.hay_nulos = self.hay_nulos or nulos > 0
+
+        no_nulos = serie[~mascara_nulos]
+        unicos = no_nulos.unique()
+        antes = len(self.valores)
+        self.valores.update(unicos.tolist())
+        repetidos += len(no_nulos) - (len(self.valores) - antes)
+        return repetidos
+
+    def como_serie(self):
+        """Valores distintos vistos, incluido el nulo si apareció (con el tipo que infiere pandas)"""
+        return pd.Series(list(self.valores) + ([np.nan] if self.hay_nulos else []))
+
+# Acumuladores: versión por bloques de cada kernel, para leer tablas que no entran
+# en memoria. agregar() recibe cada bloque de la columna (Series o PerfilColumna) y
+# resultado() devuelve lo mismo que el kernel sobre la columna completa.
+
+class Acumulador:
+    def __init__(self):
+        self.total = 0
+        self.cantidad = 0
+
+    def agregar(self, serie):
+        perfil = _perfil(serie)
+        self.total += len(perfil)
+        self.cantidad += self._contar(perfil)
+
+    def _contar(self, perfil):
+        raise NotImplementedError
+
+    def resultado(self):
+        return {'valor': porcentaje(self.cantidad, self.total), 'cantidad': self.cantidad}
+
+class AcumuladorNulos(Acumulador):
+    def _contar(self, perfil):
+        return perfil.nulos
+
+class AcumuladorDuplicados(Acumulador):
+    def __init__(self):
+        super().__init__()
+        self.vistos = ValoresVistos()
+
+    def _contar(self, perfil):
+        return self.vistos.agregar(perfil.serie)
+
+class AcumuladorDuplicadosAprox(Acumulador):
+    def __init__(self, error_relativo=0.01):
+        super().__init__()
+        self.estimador = HyperLogLog(error_relativo)
+
+    def _contar(self, perfil):
+        self.estimador.agregar(perfil.serie)
+        return 0
+
+    def resultado(self):
+        return resultado_duplicados_aprox(self.estimador, self.total)
+
+class AcumuladorRango(Acumulador):
+    def __init__(self, minimo, maximo):
+        super().__init__()
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def _contar(self, perfil):
+        return perfil.en_rango(self.minimo, self.maximo)
+
+class AcumuladorReferencias(Acumulador):
+    def __init__(self, referencia, modo='exacto', tasa_falsos_positivos=0.01):
+        super().__init__()
+        self.indice = crear_indice(referencia, modo, tasa_falsos_positivos)
+
+    def _contar(self, perfil):
+        return int((~self.indice.contiene(perfil.serie)).sum())
+
+    def resultado(self):
+        return resultado_referencias(self.indice, self.cantidad, self.total)
+
+class AcumuladorValidos(Acumulador):
+    """Acumulador de una métrica válido/inválido por tupla: junta también los bits"""
+    def __init__(self):
+        super().__init__()
+        self.bloques = []
+
+    def _contar(self, perfil):
+        validos = self._validos(perfil).to_numpy(dtype=bool)
+        self.bloques.append(validos)
+        return int(validos.sum())
+
+    def _validos(self, perfil):
+        raise NotImplementedError
+
+    def resultado(self):
+        resultado = super().resultado()
+        resultado['validos'] = np.concatenate(self.bloques) if self.bloques else np.zeros(0, dtype=bool)
+        return resultado
+
+class AcumuladorIsbn(AcumuladorValidos):
+    def _validos(self, perfil):
+        return perfil.isbn_validos
+
+class AcumuladorAnio(AcumuladorValidos):
+    def __init__(self, minimo=1000, maximo=2024):
+        super().__init__()
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def _validos(self, perfil):
+        return perfil.anios_validos(self.minimo, self.maximo)
+
+ACUMULADORES = {
+    'nulos': AcumuladorNulos,
+    'duplicados': AcumuladorDuplicados,
+    'duplicados_aprox': AcumuladorDuplicadosAprox,
+    'rango': AcumuladorRango,
+    'isbn': AcumuladorIsbn,
+    'anio': AcumuladorAnio,
+    'referencias': AcumuladorReferencias,
+}
+
+# Registro de métricas: método aplicado, tabla (nombre del CSV sin extensión),
+# columnas (None = todas), kernel y parámetros. Agregar un chequeo sobre otra tabla
+# o columna es agregar una entrada aquí.
+# El kernel 'duplicados_aprox' estima los duplicados con HyperLogLog; su parámetro
+# 'error_relativo' fija el error estándar aceptado en la cantidad de valores distintos.
+# Con el kernel 'referencias', el parámetro 'referencia' es (tabla, columna) de la
+# columna referenciada; el runner le pasa esa serie al kernel. Su 'modo' es 'exacto'
+# (array ordenado) o 'bloom' (filtro de Bloom, con 'tasa_falsos_positivos').
+REGISTRO = [
+    {
+        'metodo': 'Precision-Fechas_ap',
+        'tabla': 'books',
+        'columnas': ['publishedDate'],
+        'kernel': 'anio',
+        'parametros': {'minimo': 1000, 'maximo': 2024}
+    },
+    {
+        'metodo': 'IntInterRel-Pertenencia_ap',
+        'tabla': 'ratings',
+        'columnas': ['Id'],
+        'kernel': 'referencias',
+        'parametros': {'referencia': ('books', 'Id'), 'modo': 'exacto'}
+    },
+    {
+        'metodo': 'IntDominio-OutBounds-Gen-ContarNum_ap',
+        'tabla': 'users',
+        'columnas': ['Age'],
+        'kernel': 'rango',
+        'parametros': {'minimo': 18, 'maximo': 123}
+    },
+    {
+        'metodo': 'IntDominio-OutBounds-Gen-ContarNum_ap',
+        'tabla': 'ratings',
+        'columnas': ['review/score'],
+        'kernel': 'rango',
+        'parametros': {'minimo': 5, 'maximo': 10}
+    },
+    {
+        'metodo': 'IntDominio-OutBounds-Gen-ContarNum_ap',
+        'tabla': 'books',
+        'columnas': ['ratingsCount'],
+        'kernel': 'rango',
+        'parametros': {'minimo': 5, 'maximo': 10}
+    },
+    {
+        'metodo': 'NoDuplicacion-CantDups-Contar_ap',
+        'tabla': 'books',
+        'columnas': ['Id', 'Title'],
+        'kernel': 'duplicados',
+        'parametros': {}
+    },
+    {
+        'metodo': 'NoDuplicacion-CantDups-Contar_ap',
+        'tabla': 'users',
+        'columnas': ['User_id'],
+        'kernel': 'duplicados',
+        'parametros': {}
+    },
+    {
+        'metodo': 'NoDuplicacion-CantDups-Contar_ap',
+        'tabla': 'ratings',
+        'columnas': ['User_id', 'Id'],
+        'kernel': 'duplicados_aprox',
+        'parametros': {'error_relativo': 0.01}
+    },
+    {
+        'metodo': 'Densidad-Grado-Contar_ap',
+        'tabla': 'books',
+        'columnas': None,
+        'kernel': 'nulos',
+        'parametros': {}
+    },
+    {
+        'metodo': 'Densidad-Grado-Contar_ap',
+        'tabla': 'ratings',
+        'columnas': None,
+        'kernel': 'nulos',
+        'parametros': {}
+    },
+    {
+        'metodo': 'Densidad-Grado-Contar_ap',
+        'tabla': 'users',
+        'columnas': None,
+        'kernel': 'nulos',
+        'parametros': {}
+    },
+    {
+        'metodo': 'ExactSint-ReglaCorrecta-ISBN_ap',
+        'tabla': 'books',
+        'columnas': ['Id'],
+        'kernel': 'isbn',
+        'parametros': {}
+    }
+]
+
+def valor_columna(resultado):
+    """Valor a guardar en resultadoColumna: el porcentaje y, si es aproximado, su error"""
+    valor = {'id': 'float', 'valor': resultado['valor']}
+    if 'error' in resultado:
+        valor['error'] = resultado['error']
+    return valor
+
+def buscar_entradas(metodo, tabla):
+    """
+    Args:
+        metodo (str): ID del método aplicado
+        tabla (str): Nombre de la tabla (CSV sin extensión)
+
+    Returns:
+        list: Entradas del registro de ese método sobre esa tabla
+    """
+    return [entrada for entrada in REGISTRO if entrada['metodo'] == metodo and entrada['tabla'] == tabla]
+
+def archivos_de(metodo):
+    """
+    Archivos que procesa un método según el registro, uno por llamada al script y
+    en el orden del registro; con una referencia la tabla referenciada va primero
+
+    Args:
+        metodo (str): ID del método aplicado
+
+    Returns:
+        list: Tuplas de nombres de archivo CSV de cada llamada
+    """
+    llamadas = []
+    for entrada in REGISTRO:
+        if entrada['metodo'] != metodo:
+            continue
+        tablas = [entrada['tabla']]
+        if 'referencia' in entrada['parametros']:
+            tablas.insert(0, entrada['parametros']['referencia'][0])
+        llamada = tuple(f"{tabla}.csv" for tabla in tablas)
+        if llamada not in llamadas:
+            llamadas.append(llamada)
+    return llamadas
+
+def columnas_requeridas(metodo, tabla):
+    """
+    Columnas que lee un método sobre una tabla según el registro, para cargar solo
+    esas; None si necesita todas (o si la tabla no está en el registro)
+    """
+    entradas = buscar_entradas(metodo, tabla)
+    if not entradas or any(entrada['columnas'] is None for entrada in entradas):
+        return None
+    return [columna for entrada in entradas for columna in entrada['columnas']]
+
+def columnas_de(entrada, df):
+    """Columnas a las que se aplica una entrada (todas las de la tabla si es None)"""
+    return list(df.columns) if entrada['columnas'] is None else entrada['columnas']
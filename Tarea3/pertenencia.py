@@ -0,0 +1,133 @@
+import math
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# Modos del índice de pertenencia: exacto (array ordenado) o aproximado (filtro de Bloom)
+MODOS = ('exacto', 'bloom')
+
+def _normalizar(serie):
+    """
+    Separa los nulos de una columna y lleva los demás valores a un tipo comparable:
+    'numero' (float64) si la columna es numérica, 'texto' (objetos str) si no. Un valor
+    numérico nunca coincide con uno de texto, como en `isin`. Los enteros se comparan
+    como float64, exactos hasta 2^53.
+
+    Returns:
+        tuple: (máscara de nulos, tipo, array con los valores no nulos)
+    """
+    nulos = serie.isna().to_numpy()
+    no_nulos = serie[~nulos]
+    if is_numeric_dtype(serie.dtype):
+        # + 0.0 unifica -0.0 y 0.0, que son iguales pero tienen distinto hash
+        return nulos, 'numero', no_nulos.to_numpy(dtype=np.float64) + 0.0
+    return nulos, 'texto', no_nulos.astype(str).to_numpy(dtype=object)
+
+class IndiceOrdenado:
+    """
+    Índice exacto de los valores de una columna referenciada: array ordenado de
+    valores distintos, consultado con searchsorted. El texto se compara como array
+    unicode de numpy, mucho más rápido de ordenar y buscar que un array de objetos.
+    """
+    tasa_falsos_positivos = 0.0
+
+    def __init__(self, referencia):
+        """
+        Args:
+            referencia (Series): Valores de la columna referenciada
+        """
+        nulos, self.tipo, valores = _normalizar(referencia)
+        self.hay_nulos = bool(nulos.any())
+        self.valores = np.unique(self._comparable(valores))
+
+    def _comparable(self, valores):
+        return valores.astype(str) if self.tipo == 'texto' else valores
+
+    def contiene(self, serie):
+        """
+        Args:
+            serie (Series): Valores a buscar
+
+        Returns:
+            numpy.ndarray: True en los valores que están en la columna referenciada
+        """
+        nulos, tipo, valores = _normalizar(serie)
+        encontrados = np.zeros(len(nulos), dtype=bool)
+        encontrados[nulos] = self.hay_nulos
+        if tipo == self.tipo and len(self.valores) and len(valores):
+            valores = self._comparable(valores)
+            posiciones = np.minimum(np.searchsorted(self.valores, valores), len(self.valores) - 1)
+            encontrados[~nulos] = self.valores[posiciones] == valores
+        return encontrados
+
+class FiltroBloom:
+    """
+    Índice aproximado de los valores de una columna referenciada: filtro de Bloom
+    con k posiciones por valor, h1 + i·h2, con h1 y h2 las dos mitades de 32 bits del
+    hash de 64 bits de pandas. No da falsos negativos; un valor ausente aparece como
+    presente con probabilidad `tasa_falsos_positivos`.
+    """
+    def __init__(self, referencia, tasa_falsos_positivos=0.01):
+        """
+        Args:
+            referencia (Series): Valores de la columna referenciada
+            tasa_falsos_positivos (float): Probabilidad aceptada de falso positivo
+        """
+        if not 0 < tasa_falsos_positivos < 1:
+            raise ValueError(f"La tasa de falsos positivos debe estar entre 0 y 1: {tasa_falsos_positivos}")
+        self.tasa_falsos_positivos = tasa_falsos_positivos
+        nulos, self.tipo, valores = _normalizar(referencia)
+        self.hay_nulos = bool(nulos.any())
+        valores = np.unique(valores)
+
+        # Tamaño y cantidad de hashes óptimos para n valores y la tasa pedida
+        n = max(len(valores), 1)
+        self.total_bits = max(math.ceil(-n * math.log(tasa_falsos_positivos) / math.log(2) ** 2), 64)
+        if self.total_bits >= 1 << 32:
+            raise ValueError(f"Filtro de Bloom demasiado grande para {n} valores: {self.total_bits} bits")
+        self.hashes = max(round(self.total_bits / n * math.log(2)), 1)
+        marcas = np.zeros(self.total_bits, dtype=bool)
+        marcas[self._posiciones(valores).ravel()] = True
+        self.bits = np.packbits(marcas)
+
+    def _posiciones(self, valores):
+        """Posiciones de cada valor en el filtro: array (hashes, len(valores))"""
+        hashes = pd.util.hash_array(valores, categorize=False)
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return ((h1 + i * h2) % np.uint64(self.total_bits)).astype(np.intp)
+
+    def contiene(self, serie):
+        """
+        Args:
+            serie (Series): Valores a buscar
+
+        Returns:
+            numpy.ndarray: True en los valores que (probablemente) están en la columna referenciada
+        """
+        nulos, tipo, valores = _normalizar(serie)
+        encontrados = np.zeros(len(nulos), dtype=bool)
+        encontrados[nulos] = self.hay_nulos
+        if tipo == self.tipo and len(valores):
+            posiciones = self._posiciones(valores)
+            # np.packbits guarda el primer bit en el bit más significativo de cada byte
+            marcados = (self.bits[posiciones >> 3] >> (7 - (posiciones & 7)).astype(np.uint8)) & 1
+            encontrados[~nulos] = marcados.all(axis=0)
+        return encontrados
+
+def crear_indice(referencia, modo='exacto', tasa_falsos_positivos=0.01):
+    """
+    Args:
+        referencia (Series): Valores de la columna referenciada
+        modo (str): 'exacto' (IndiceOrdenado) o 'bloom' (FiltroBloom)
+        tasa_falsos_positivos (float): Solo para el modo 'bloom'
+
+    Returns:
+        IndiceOrdenado | FiltroBloom: Índice con un método contiene(serie)
+    """
+    if modo == 'exacto':
+        return IndiceOrdenado(referencia)
+    if modo == 'bloom':
+        return FiltroBloom(referencia, tasa_falsos_positivos)
+    raise ValueError(f"Modo de pertenencia desconocido: {modo} (opciones: {', '.join(MODOS)})")
@@ -1,66 +1,61 @@
 import pandas as pd
 import os
 import sys
-import re
-from DB.db_operations import DBOperations
+from DB.db_operations import crear_db_operations
+from tablas import leer_tabla
+from metricas import archivos_de, buscar_entradas, perfil_columna, kernel_isbn, columnas_requeridas
 
-def is_valid_isbn(isbn):
-    """
-    Verifica si un ISBN tiene un formato válido usando expresiones regulares.
-    """
-    if pd.isna(isbn):
-        return False
-    
-    # Convertir a string y eliminar espacios y guiones
-    isbn = str(isbn).strip().replace('-', '')
-    
-    # Patrones para ISBN-10 e ISBN-13
-    isbn10_pattern = r'^\d{9}[0-9Xx]$'  # 9 dígitos seguidos de un dígito o X
-    isbn13_pattern = r'^(97[89])\d{10}$'  # 978 o 979 seguido de 10 dígitos
-    
-    # Verificar si coincide con alguno de los patrones
-    return bool(re.match(isbn10_pattern, isbn.upper()) or re.match(isbn13_pattern, isbn))
+METODO = "ExactSint-ReglaCorrecta-ISBN_ap"
 
-def check_isbn_format(file_path, db, execution_id):
+def check_isbn_format(file_path, db, execution_id, df=None):
     """
     Verifica el formato de los ISBNs en el archivo especificado y guarda los resultados en la base de datos.
+    Si se recibe `df` (tabla ya leída), se usa en lugar de leer el archivo.
     """
     try:
-        # Intentar diferentes codificaciones
-        encodings = ['latin-1', 'utf-8', 'cp1252']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
         if df is None:
-            raise Exception("No se pudo leer el archivo con ninguna codificación")
+            # Solo las columnas que usa la métrica (desde la copia Parquet si está al día)
+            df = leer_tabla(file_path, columnas_requeridas(METODO, os.path.basename(file_path).replace('.csv', '')))
         
-        if 'Id' not in df.columns:
-            print(f"Error: No se encontró la columna 'Id' en {os.path.basename(file_path)}")
+        # Tabla y columna de ISBN según el registro de métricas
+        nombre_tabla = os.path.basename(file_path).replace('.csv', '')
+        entradas = buscar_entradas(METODO, nombre_tabla)
+        if not entradas:
+            print(f"Archivo no soportado: {os.path.basename(file_path)}")
             return
+        column = entradas[0]['columnas'][0]
         
-        valid_isbns = sum(df['Id'].apply(is_valid_isbn))
+        if column not in df.columns:
+            print(f"Error: No se encontró la columna '{column}' en {os.path.basename(file_path)}")
+            return
+        
+        resultado = kernel_isbn(perfil_columna(df, column))
+        validos = resultado['validos']
+        valid_isbns = resultado['cantidad']
         total_rows = len(df)
-        percentage_valid = round((valid_isbns/total_rows)*100, 2)
+        percentage_valid = resultado['valor']
         
         # Guardar resultados en la base de datos
         try:
             # Guardar resultado de columna - ISBNs válidos
             db.guardar_resultado_columna(
                 execution_id=execution_id,
-                nombre_tabla='books',
-                nombre_atributo='Id',
+                nombre_tabla=nombre_tabla,
+                nombre_atributo=column,
                 valor={
                     'id': 'float',
                     'valor': percentage_valid
                 }
             )
             
+            # Guardar resultado por tupla - un bit por ISBN (válido/inválido)
+            db.guardar_resultado_bitmap(
+                execution_id=execution_id,
+                nombre_tabla=nombre_tabla,
+                nombre_atributo=column,
+                validos=validos
+            )
+            
             print(f"\nArchivo: {os.path.basename(file_path)}")
             print(f"Total de filas: {total_rows}")
             print(f"ISBNs válidos: {valid_isbns}")
@@ -79,11 +74,11 @@ def check_isbn_format(file_path, db, execution_id):
 if __name__ == "__main__":
     try:
         # Conectar a la base de datos
-        db = DBOperations()
+        db = crear_db_operations()
         
         # 1. Crear una nueva ejecución
         execution_id = db.crear_ejecucion(
-            metodo="ExactSint-ReglaCorrecta-ISBN_ap"
+            metodo=METODO
         )
         
         # 2. Procesar y guardar resultados
@@ -91,9 +86,10 @@ if __name__ == "__main__":
         project_root = os.path.dirname(current_script_dir)
         integrated_csvs_dir = os.path.join(project_root, 'integratedCSVs')
 
-        # Verificar formato en el archivo de libros
-        file_path = os.path.join(integrated_csvs_dir, 'books.csv')
-        check_isbn_format(file_path, db, execution_id)
+        # Verificar formato en los archivos del registro
+        for (archivo,) in archivos_de(METODO):
+            file_path = os.path.join(integrated_csvs_dir, archivo)
+            check_isbn_format(file_path, db, execution_id)
 
         print(f"\n{'='*10} Verificación de formato de ISBN completada {'='*10}")
         
@@ -2,6 +2,60 @@ import os
 import sys
 import subprocess
 import time
+import argparse
+import importlib.util
+import io
+import tracemalloc
+from collections import Counter
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from metricas import archivos_de
+
+# Métricas para la ejecución en proceso: script, función que calcula la métrica,
+# método aplicado y archivos de cada llamada (derivados del registro de métricas).
+# La función se llama como funcion(*rutas, db, ejecucion, *tablas), con las tablas ya leídas.
+METRICAS = [
+    {
+        'script': 'Precision-Fechas.py',
+        'funcion': 'check_year_format',
+        'metodo': 'Precision-Fechas_ap'
+    },
+    {
+        'script': 'intInterRelPertenencia.py',
+        'funcion': 'check_referential_integrity',
+        'metodo': 'IntInterRel-Pertenencia_ap'
+    },
+    {
+        'script': 'intBoundsGenContarNum.py',
+        'funcion': 'contar_datos_en_rango',
+        'metodo': 'IntDominio-OutBounds-Gen-ContarNum_ap'
+    },
+    {
+        'script': 'cantDupsContar.py',
+        'funcion': 'contar_duplicados',
+        'metodo': 'NoDuplicacion-CantDups-Contar_ap'
+    },
+    {
+        'script': 'gradoContar.py',
+        'funcion': 'analyze_csv_file',
+        'metodo': 'Densidad-Grado-Contar_ap'
+    },
+    {
+        'script': 'reglaCorrectaISBN.py',
+        'funcion': 'check_isbn_format',
+        'metodo': 'ExactSint-ReglaCorrecta-ISBN_ap'
+    }
+]
+for metrica in METRICAS:
+    metrica['archivos'] = archivos_de(metrica['metodo'])
+
+# Archivos cuya lectura ocupa mucha memoria: las métricas que los usan son "pesadas"
+# y en la ejecución en paralelo se limita cuántas corren a la vez
+ARCHIVOS_PESADOS = {'ratings.csv'}
+
+# max_tasks_per_child (Python 3.11+) permite un proceso nuevo por métrica en el pool;
+# sin él los procesos se reutilizan y el pico de RSS no sería el de cada métrica
+PROCESO_POR_METRICA = sys.version_info >= (3, 11)
 
 def run_script(script_path):
     """
@@ -32,6 +86,572 @@ def run_script(script_path):
         print(f"\nError ejecutando {os.path.basename(script_path)}: {str(e)}")
         return False
 
+def cargar_funcion(script_path, nombre_funcion):
+    """
+    Importa un script de métrica como módulo (sin ejecutar su __main__) y devuelve
+    la función que calcula la métrica.
+    """
+    nombre_modulo = os.path.splitext(os.path.basename(script_path))[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(nombre_modulo, script_path)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return getattr(modulo, nombre_funcion)
+
+def refrescar_resumen():
+    """
+    Refresca una sola vez el resumen de calidad al terminar todas las métricas, en
+    lugar de hacerlo cada conexión al cerrarse (ver DB_REFRESCO_DIFERIDO)
+    """
+    from DB.db_operations import DBOperations
+
+    if os.getenv('DB_SPOOL_DIR'):
+        # Con spool no hay nada en la base todavía: se refresca al subir los spools
+        return
+    db = DBOperations()
+    try:
+        db.refrescar_resumen_calidad()
+    except Exception as e:
+        print(f"Error al refrescar el resumen de calidad: {e}")
+    finally:
+        db.close()
+
+def correr_metrica(metrica, db, cache, cache_metricas=None, medir_tracemalloc=False, medir_rss=False):
+    """
+    Crea la ejecución de una métrica de METRICAS y la calcula sobre sus archivos,
+    tomando las tablas de la caché. Si se recibe `cache_metricas` y ni los archivos
+    ni el script cambiaron desde la última vez, guarda en la ejecución nueva los
+    resultados anteriores sin recalcularlos (estadísticas marcadas como cacheado).
+
+    Las estadísticas de la corrida (tiempos de lectura, cálculo y escritura, filas,
+    bytes y picos de memoria) se guardan en EstadisticasEjecucion.
+
+    Args:
+        medir_rss (bool): Guarda el pico de RSS del proceso; solo tiene sentido si la
+            métrica corre sola en un proceso nuevo (el pico es de toda su vida)
+
+    Returns:
+        dict: Estadísticas de la ejecución
+    """
+    from tablas import directorio_csvs
+    from cache_metricas import DBRegistro, reproducir_registros
+    from estadisticas import DBCronometrado, pico_rss_kb
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    integrated_csvs_dir = directorio_csvs()
+    script_path = os.path.join(current_dir, metrica['script'])
+    llamadas = [
+        [os.path.join(integrated_csvs_dir, archivo) for archivo in archivos]
+        for archivos in metrica['archivos']
+    ]
+    estadisticas = {
+        'tiempo_lectura': 0.0,
+        'tiempo_calculo': 0.0,
+        'tiempo_escritura': 0.0,
+        'filas': 0,
+        'bytes': 0,
+        'pico_rss_kb': None,
+        'pico_tracemalloc_kb': None,
+        'cacheado': False
+    }
+    if medir_tracemalloc:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+    huella = None
+    registros = None
+    if cache_metricas is not None:
+        huella = cache_metricas.huella(metrica, script_path, [ruta for rutas in llamadas for ruta in rutas])
+        registros = cache_metricas.obtener(metrica['metodo'], huella)
+
+    if registros is not None:
+        estadisticas['cacheado'] = True
+        destino = DBCronometrado(db)
+        ejecucion = destino.crear_ejecucion(metodo=metrica['metodo'])
+        reproducir_registros(destino, ejecucion, registros)
+        for rutas in llamadas:
+            for ruta in rutas:
+                cache.descontar_uso(ruta)
+        print(f"  - Archivos y script sin cambios: se reutilizan {len(registros)} resultados de la caché")
+    else:
+        destino = DBCronometrado(DBRegistro(db) if cache_metricas is not None else db)
+        funcion = cargar_funcion(script_path, metrica['funcion'])
+        ejecucion = destino.crear_ejecucion(metodo=metrica['metodo'])
+        for rutas in llamadas:
+            inicio = time.perf_counter()
+            tablas = [cache.obtener(ruta) for ruta in rutas]
+            estadisticas['tiempo_lectura'] += time.perf_counter() - inicio
+            estadisticas['filas'] += sum(len(tabla) for tabla in tablas)
+            estadisticas['bytes'] += sum(os.path.getsize(ruta) for ruta in rutas)
+
+            inicio = time.perf_counter()
+            funcion(*rutas, destino, ejecucion, *tablas)
+            estadisticas['tiempo_calculo'] += time.perf_counter() - inicio
+        # Las escrituras hechas dentro de la función no son tiempo de cálculo
+        estadisticas['tiempo_calculo'] = max(estadisticas['tiempo_calculo'] - destino.tiempo_escritura, 0.0)
+
+        if cache_metricas is not None:
+            cache_metricas.guardar(metrica['metodo'], huella, destino.registros)
+
+    destino.flush()
+    estadisticas['tiempo_escritura'] = destino.tiempo_escritura
+    if not estadisticas['cacheado']:
+        if medir_rss:
+            estadisticas['pico_rss_kb'] = pico_rss_kb()
+        if medir_tracemalloc:
+            estadisticas['pico_tracemalloc_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+    db.guardar_estadisticas_ejecucion(ejecucion, estadisticas)
+    return estadisticas
+
+def imprimir_resumen(resultados):
+    """
+    Imprime la cantidad de métricas exitosas y fallidas, el tiempo de cada una y,
+    si se midieron, sus estadísticas por etapa.
+
+    Args:
+        resultados (list): Tuplas (script, exitoso, segundos, estadísticas o None)
+    """
+    from estadisticas import formatear_estadisticas
+
+    successful = sum(1 for _, exitoso, _, _ in resultados if exitoso)
+    print(f"\n{'='*20} Resumen de ejecución {'='*20}")
+    print(f"Scripts ejecutados exitosamente: {successful}")
+    print(f"Scripts con errores: {len(resultados) - successful}")
+    print(f"Total de scripts ejecutados: {len(resultados)}")
+
+    print(f"\n{'Métrica':<40} {'Estado':<8} {'Tiempo (s)':>10}")
+    for script, exitoso, segundos, estadisticas in sorted(resultados, key=lambda r: r[2], reverse=True):
+        print(f"{script:<40} {'OK' if exitoso else 'ERROR':<8} {segundos:>10.2f}")
+        if estadisticas is not None:
+            print(f"    {formatear_estadisticas(estadisticas)}")
+
+def run_en_proceso(cache_metricas=None, medir_tracemalloc=False):
+    """
+    Ejecuta las métricas de METRICAS en este mismo proceso: cada CSV se lee una sola
+    vez, se comparte entre las métricas que lo usan y se libera tras su último uso.
+    Todas las métricas escriben por la misma conexión a la base de datos.
+
+    Args:
+        cache_metricas (CacheMetricas): Si se indica, las métricas sin cambios no se recalculan
+        medir_tracemalloc (bool): Mide también el pico de memoria de Python con tracemalloc (más lento)
+    """
+    from DB.db_operations import crear_db_operations
+    from tablas import CacheTablas, directorio_csvs
+
+    integrated_csvs_dir = directorio_csvs()
+    usos = Counter(
+        os.path.join(integrated_csvs_dir, archivo)
+        for metrica in METRICAS for archivos in metrica['archivos'] for archivo in archivos
+    )
+    cache = CacheTablas(usos)
+
+    resultados = []
+    db = crear_db_operations()
+    try:
+        for metrica in METRICAS:
+            print(f"\n{'='*20} Ejecutando {metrica['script']} {'='*20}")
+            inicio = time.perf_counter()
+            estadisticas = None
+            try:
+                estadisticas = correr_metrica(metrica, db, cache, cache_metricas, medir_tracemalloc)
+                print(f"\n{'='*20} {metrica['script']} completado exitosamente {'='*20}")
+                exitoso = True
+            except Exception as e:
+                print(f"\nError ejecutando {metrica['script']}: {str(e)}")
+                exitoso = False
+            resultados.append((metrica['script'], exitoso, time.perf_counter() - inicio, estadisticas))
+    finally:
+        db.close()
+        if cache_metricas is not None:
+            cache_metricas.escribir()
+
+    imprimir_resumen(resultados)
+
+def ejecutar_metrica_en_worker(metrica, cache_metricas=None, medir_tracemalloc=False, medir_rss=False):
+    """
+    Ejecuta una métrica en un proceso del pool, con su propia conexión. La salida
+    se captura para imprimirla completa al terminar y no mezclarla con la de otras.
+    medir_rss solo se activa si cada proceso corre una sola métrica (PROCESO_POR_METRICA).
+
+    Returns:
+        tuple: (script, exitoso, segundos, estadísticas, salida, entradas nuevas de la caché de métricas)
+    """
+    from DB.db_operations import crear_db_operations
+    from tablas import CacheTablas
+
+    salida = io.StringIO()
+    inicio = time.perf_counter()
+    exitoso = True
+    estadisticas = None
+    with redirect_stdout(salida):
+        try:
+            db = crear_db_operations()
+            estadisticas = correr_metrica(metrica, db, CacheTablas(), cache_metricas, medir_tracemalloc, medir_rss)
+        except Exception as e:
+            print(f"\nError ejecutando {metrica['script']}: {str(e)}")
+            exitoso = False
+        finally:
+            if 'db' in locals():
+                db.close()
+    nuevas = cache_metricas.nuevas if cache_metricas is not None else {}
+    segundos = time.perf_counter() - inicio
+    return metrica['script'], exitoso, segundos, estadisticas, salida.getvalue(), nuevas
+
+def estimar_costo(metrica):
+    """Costo estimado de una métrica: bytes totales de los archivos que lee"""
+    from tablas import directorio_csvs
+
+    total = 0
+    for archivos in metrica['archivos']:
+        for archivo in archivos:
+            ruta = os.path.join(directorio_csvs(), archivo)
+            if os.path.exists(ruta):
+                total += os.path.getsize(ruta)
+    return total
+
+def es_pesada(metrica):
+    """True si la métrica lee alguno de los ARCHIVOS_PESADOS"""
+    return any(archivo in ARCHIVOS_PESADOS for archivos in metrica['archivos'] for archivo in archivos)
+
+def run_paralelo(workers, max_pesadas, cache_metricas=None, medir_tracemalloc=False):
+    """
+    Ejecuta las métricas de METRICAS en un pool de procesos. Las más costosas
+    (según el tamaño de sus archivos) se lanzan primero, y nunca corren más de
+    `max_pesadas` métricas pesadas a la vez. Con Python 3.11+ cada métrica corre en un
+    proceso nuevo, para que su pico de RSS no incluya el de métricas anteriores; en
+    versiones anteriores los procesos se reutilizan y el pico de RSS no se guarda.
+
+    Args:
+        workers (int): Procesos del pool (al menos 1)
+        max_pesadas (int): Máximo de métricas pesadas simultáneas (al menos 1)
+        cache_metricas (CacheMetricas): Si se indica, las métricas sin cambios no se recalculan;
+            cada proceso recibe una copia y devuelve sus entradas nuevas
+        medir_tracemalloc (bool): Mide también el pico de memoria de Python con tracemalloc (más lento)
+    """
+    if workers < 1 or max_pesadas < 1:
+        raise ValueError(f"workers y max_pesadas deben ser al menos 1: {workers}, {max_pesadas}")
+    pendientes = sorted(METRICAS, key=estimar_costo, reverse=True)
+    en_curso = {}
+    resultados = []
+
+    opciones_pool = {'max_tasks_per_child': 1} if PROCESO_POR_METRICA else {}
+    with ProcessPoolExecutor(max_workers=workers, **opciones_pool) as pool:
+        while pendientes or en_curso:
+            # Lanzar todo lo que quepa, respetando el límite de pesadas
+            pesadas = sum(1 for metrica in en_curso.values() if es_pesada(metrica))
+            for metrica in list(pendientes):
+                if len(en_curso) >= workers:
+                    break
+                if es_pesada(metrica):
+                    if pesadas >= max_pesadas:
+                        continue
+                    pesadas += 1
+                pendientes.remove(metrica)
+                en_curso[pool.submit(
+                    ejecutar_metrica_en_worker, metrica, cache_metricas, medir_tracemalloc, PROCESO_POR_METRICA
+                )] = metrica
+
+            terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                metrica = en_curso.pop(futuro)
+                try:
+                    script, exitoso, segundos, estadisticas, salida, nuevas = futuro.result()
+                except Exception as e:
+                    script, exitoso, segundos, estadisticas, nuevas = metrica['script'], False, 0.0, None, {}
+                    salida = f"\nError en el proceso: {e}\n"
+                if cache_metricas is not None:
+                    cache_metricas.entradas.update(nuevas)
+                print(f"\n{'='*20} {script} {'='*20}")
+                print(salida)
+                if exitoso:
+                    print(f"\n{'='*20} {script} completado exitosamente {'='*20}")
+                resultados.append((script, exitoso, segundos, estadisticas))
+
+    if cache_metricas is not None:
+        cache_metricas.escribir()
+    imprimir_resumen(resultados)
+
+def orden_tablas(registro):
+    """Tablas del registro de métricas, primero las referenciadas por otras métricas"""
+    orden = []
+    for entrada in registro:
+        if 'referencia' in entrada['parametros']:
+            tabla, _ = entrada['parametros']['referencia']
+            if tabla not in orden:
+                orden.append(tabla)
+    for entrada in registro:
+        if entrada['tabla'] not in orden:
+            orden.append(entrada['tabla'])
+    return orden
+
+def resolver_parametros(entrada, referencias):
+    """
+    Parámetros de una entrada del registro, con la columna referenciada (si la hay)
+    reemplazada por sus valores distintos. None si la referencia no está disponible.
+    """
+    parametros = dict(entrada['parametros'])
+    if 'referencia' in parametros:
+        if parametros['referencia'] not in referencias:
+            print(f"Error: No se encontró la columna referenciada {parametros['referencia']}")
+            return None
+        parametros['referencia'] = referencias[parametros['referencia']]
+    return parametros
+
+def columnas_necesarias(entradas, referenciadas):
+    """Columnas que leen las entradas de una tabla y las que otras referencian (None = todas)"""
+    columnas = {columna for _, columna in referenciadas}
+    for entrada in entradas:
+        if entrada['columnas'] is None:
+            return None
+        columnas.update(entrada['columnas'])
+    return columnas
+
+def calcular_tabla(file_path, tabla, entradas, referenciadas, referencias, estadisticas, fallidos):
+    """
+    Lee una tabla completa y le aplica las entradas del registro de métricas con sus
+    kernels. Guarda en `referencias` los valores distintos de sus columnas referenciadas.
+
+    Returns:
+        tuple: (segundos de lectura, filas, lista de (entrada, columna, resultado))
+    """
+    from tablas import leer_tabla
+    from metricas import KERNELS, columnas_de, perfil_columna
+
+    inicio = time.perf_counter()
+    df = leer_tabla(file_path, columnas_necesarias(entradas, referenciadas))
+    lectura = time.perf_counter() - inicio
+
+    for referencia in referenciadas:
+        if referencia[1] in df.columns:
+            referencias[referencia] = df[referencia[1]].drop_duplicates()
+
+    resultados = []
+    for entrada in entradas:
+        metodo = entrada['metodo']
+        parametros = resolver_parametros(entrada, referencias)
+        if parametros is None:
+            fallidos.add(metodo)
+            continue
+
+        for columna in columnas_de(entrada, df):
+            if columna not in df.columns:
+                print(f"Error: No se encontró la columna {columna} en {tabla}")
+                fallidos.add(metodo)
+                continue
+            try:
+                inicio = time.perf_counter()
+                resultado = KERNELS[entrada['kernel']](perfil_columna(df, columna), **parametros)
+                estadisticas[metodo]['tiempo_calculo'] += time.perf_counter() - inicio
+                resultados.append((entrada, columna, resultado))
+            except Exception as e:
+                print(f"Error en {metodo} sobre {tabla}.{columna}: {e}")
+                fallidos.add(metodo)
+    return lectura, len(df), resultados
+
+def calcular_tabla_por_bloques(file_path, tabla, entradas, referenciadas, referencias, estadisticas, fallidos,
+                               chunksize):
+    """
+    Como calcular_tabla, pero leyendo la tabla de a bloques de `chunksize` filas con
+    los acumuladores de cada kernel: la memoria usada no depende del tamaño del
+    archivo (salvo los valores distintos que guardan duplicados y referencias, y un
+    booleano por fila en las métricas con bitmap). Los resultados son los mismos que
+    leyendo la tabla completa; para eso, los bloques salen de la copia Parquet si
+    está al día o, si no, del CSV con los tipos de las columnas cuyo resultado depende
+    del tipo fijados antes con una primera pasada solo sobre esas columnas.
+
+    Returns:
+        tuple: (segundos de lectura, filas, lista de (entrada, columna, resultado))
+    """
+    from tablas import leer_csv_por_bloques, inferir_tipos
+    from cache_columnar import parquet_vigente, leer_parquet_por_bloques
+    from metricas import ACUMULADORES, KERNELS_SIN_TIPO, ValoresVistos, columnas_de, perfil_columna
+
+    inicio = time.perf_counter()
+    columnas = columnas_necesarias(entradas, referenciadas)
+    ruta = parquet_vigente(file_path)
+    if ruta is not None:
+        # La copia Parquet ya tiene los tipos de la lectura completa
+        bloques = leer_parquet_por_bloques(ruta, chunksize, columnas)
+    else:
+        tipadas = {columna for _, columna in referenciadas}
+        for entrada in entradas:
+            if entrada['kernel'] not in KERNELS_SIN_TIPO:
+                if entrada['columnas'] is None:
+                    tipadas = None
+                    break
+                tipadas.update(entrada['columnas'])
+        tipos = inferir_tipos(file_path, chunksize, tipadas) if tipadas != set() else {}
+        bloques = leer_csv_por_bloques(file_path, chunksize, columnas, tipos)
+    lectura = time.perf_counter() - inicio
+
+    vistos = {referencia: ValoresVistos() for referencia in referenciadas}
+    acumuladores = None
+    filas = 0
+    while True:
+        inicio = time.perf_counter()
+        bloque = next(bloques, None)
+        lectura += time.perf_counter() - inicio
+        if bloque is None:
+            break
+        filas += len(bloque)
+
+        if acumuladores is None:
+            # Las columnas de la tabla se conocen con el primer bloque
+            acumuladores = []
+            for entrada in entradas:
+                parametros = resolver_parametros(entrada, referencias)
+                if parametros is None:
+                    fallidos.add(entrada['metodo'])
+                    continue
+                for columna in columnas_de(entrada, bloque):
+                    if columna not in bloque.columns:
+                        print(f"Error: No se encontró la columna {columna} en {tabla}")
+                        fallidos.add(entrada['metodo'])
+                        continue
+                    acumuladores.append([entrada, columna, ACUMULADORES[entrada['kernel']](**parametros)])
+
+        for referencia, valores in vistos.items():
+            if referencia[1] in bloque.columns:
+                valores.agregar(bloque[referencia[1]])
+
+        for item in acumuladores:
+            entrada, columna, acumulador = item
+            if acumulador is None:
+                continue
+            try:
+                inicio = time.perf_counter()
+                acumulador.agregar(perfil_columna(bloque, columna))
+                estadisticas[entrada['metodo']]['tiempo_calculo'] += time.perf_counter() - inicio
+            except Exception as e:
+                print(f"Error en {entrada['metodo']} sobre {tabla}.{columna}: {e}")
+                fallidos.add(entrada['metodo'])
+                item[2] = None
+        del bloque
+
+    for referencia, valores in vistos.items():
+        if valores.valores or valores.hay_nulos:
+            referencias[referencia] = valores.como_serie()
+
+    resultados = [
+        (entrada, columna, acumulador.resultado())
+        for entrada, columna, acumulador in acumuladores or [] if acumulador is not None
+    ]
+    return lectura, filas, resultados
+
+def run_por_tabla(medir_tracemalloc=False, chunksize=None):
+    """
+    Ejecuta las entradas del registro de métricas (metricas.REGISTRO) agrupadas por
+    tabla: cada CSV se lee una sola vez, se le aplican todas las métricas que lo usan
+    y se libera antes de leer el siguiente. Se crea una ejecución por método aplicado.
+
+    La lectura de una tabla se comparte: su tiempo, filas y bytes se suman a las
+    estadísticas de cada método que la usa.
+
+    Args:
+        medir_tracemalloc (bool): Mide también el pico de memoria de Python con tracemalloc (más lento)
+        chunksize (int): Si se indica, cada tabla se lee de a bloques de esa cantidad de
+            filas en lugar de completa, con los mismos resultados
+    """
+    from DB.db_operations import crear_db_operations
+    from tablas import directorio_csvs
+    from metricas import REGISTRO, valor_columna
+    from estadisticas import DBCronometrado
+
+    if medir_tracemalloc:
+        tracemalloc.start()
+
+    metodos = list(dict.fromkeys(entrada['metodo'] for entrada in REGISTRO))
+    estadisticas = {
+        metodo: {
+            'tiempo_lectura': 0.0, 'tiempo_calculo': 0.0, 'tiempo_escritura': 0.0, 'filas': 0, 'bytes': 0,
+            'pico_rss_kb': None, 'pico_tracemalloc_kb': None
+        }
+        for metodo in metodos
+    }
+    fallidos = set()
+    # Valores distintos de las columnas referenciadas, guardados antes de liberar su tabla
+    referencias = {}
+
+    db = crear_db_operations()
+    destino = DBCronometrado(db)
+    try:
+        ejecuciones = {metodo: destino.crear_ejecucion(metodo=metodo) for metodo in metodos}
+
+        for tabla in orden_tablas(REGISTRO):
+            entradas = [entrada for entrada in REGISTRO if entrada['tabla'] == tabla]
+            referenciadas = list(dict.fromkeys(
+                entrada['parametros']['referencia'] for entrada in REGISTRO
+                if entrada['parametros'].get('referencia', (None,))[0] == tabla
+            ))
+            file_path = os.path.join(directorio_csvs(), f"{tabla}.csv")
+            print(f"\n{'='*20} Tabla {tabla} {'='*20}")
+            try:
+                if chunksize:
+                    lectura, filas, resultados = calcular_tabla_por_bloques(
+                        file_path, tabla, entradas, referenciadas, referencias, estadisticas, fallidos, chunksize
+                    )
+                else:
+                    lectura, filas, resultados = calcular_tabla(
+                        file_path, tabla, entradas, referenciadas, referencias, estadisticas, fallidos
+                    )
+            except Exception as e:
+                print(f"Error al leer {os.path.basename(file_path)}: {e}")
+                fallidos.update(entrada['metodo'] for entrada in entradas)
+                continue
+
+            for metodo in dict.fromkeys(entrada['metodo'] for entrada in entradas):
+                estadisticas[metodo]['tiempo_lectura'] += lectura
+                estadisticas[metodo]['filas'] += filas
+                estadisticas[metodo]['bytes'] += os.path.getsize(file_path)
+
+            for entrada, columna, resultado in resultados:
+                metodo = entrada['metodo']
+                try:
+                    escritura_previa = destino.tiempo_escritura
+                    destino.guardar_resultado_columna(
+                        execution_id=ejecuciones[metodo],
+                        nombre_tabla=tabla,
+                        nombre_atributo=columna,
+                        valor=valor_columna(resultado)
+                    )
+                    if 'validos' in resultado:
+                        destino.guardar_resultado_bitmap(
+                            execution_id=ejecuciones[metodo],
+                            nombre_tabla=tabla,
+                            nombre_atributo=columna,
+                            validos=resultado['validos']
+                        )
+                    estadisticas[metodo]['tiempo_escritura'] += destino.tiempo_escritura - escritura_previa
+                    error = f" ± {resultado['error']:.2f}" if 'error' in resultado else ''
+                    print(f"{metodo:<40} {columna:<25} {resultado['valor']:>8.2f}%{error}")
+                except Exception as e:
+                    print(f"Error en {metodo} sobre {tabla}.{columna}: {e}")
+                    fallidos.add(metodo)
+            del resultados
+
+        escritura_previa = destino.tiempo_escritura
+        destino.flush()
+        pendiente = (destino.tiempo_escritura - escritura_previa) / len(metodos)
+        for metodo in metodos:
+            estadisticas[metodo]['tiempo_escritura'] += pendiente
+            # Sin pico de RSS: todos los métodos comparten el proceso y su pico es uno solo
+            if medir_tracemalloc:
+                estadisticas[metodo]['pico_tracemalloc_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+            db.guardar_estadisticas_ejecucion(ejecuciones[metodo], estadisticas[metodo])
+    finally:
+        db.close()
+
+    imprimir_resumen([
+        (
+            metodo,
+            metodo not in fallidos,
+            estadisticas[metodo]['tiempo_lectura'] + estadisticas[metodo]['tiempo_calculo']
+            + estadisticas[metodo]['tiempo_escritura'],
+            estadisticas[metodo]
+        )
+        for metodo in metodos
+    ])
+
 def main():
     # Obtener el directorio actual
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -65,7 +685,51 @@ def main():
     print(f"Total de scripts ejecutados: {len(scripts)}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ejecuta todas las métricas de calidad")
+    parser.add_argument('--en-proceso', action='store_true',
+                        help="Ejecuta las métricas en este proceso, leyendo cada CSV una sola vez "
+                             "(modo predeterminado)")
+    parser.add_argument('--subprocesos', action='store_true',
+                        help="Ejecuta cada script en un subproceso aparte, como al correrlos a mano "
+                             "(no registra estadísticas de ejecución)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Ejecuta las métricas en paralelo en un pool de N procesos")
+    parser.add_argument('--max-pesadas', type=int, default=2,
+                        help="Máximo de métricas pesadas (que leen ratings.csv) simultáneas con --workers")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="Recalcula todas las métricas aunque los archivos no hayan cambiado "
+                             "(la caché no se usa con --subprocesos ni --por-tabla)")
+    parser.add_argument('--por-tabla', action='store_true',
+                        help="Ejecuta el registro de métricas agrupado por tabla, leyendo cada CSV una vez "
+                             "(no usa la caché de métricas: siempre recalcula)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Con --por-tabla, lee cada CSV de a bloques de N filas (memoria acotada)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Mide el pico de memoria de Python de cada métrica con tracemalloc (más lento)")
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+    if args.max_pesadas < 1:
+        parser.error("--max-pesadas debe ser al menos 1")
+
+    cache_metricas = None
+    # La caché aplica al modo predeterminado y a --workers, para que las corridas
+    # nocturnas no recalculen métricas cuyos archivos y código no cambiaron
+    if not (args.sin_cache or args.subprocesos or args.por_tabla or args.chunksize):
+        from cache_metricas import CacheMetricas
+        cache_metricas = CacheMetricas()
+
+    # Los subprocesos y workers heredan la variable: ninguna conexión refresca el resumen al cerrarse
+    os.environ['DB_REFRESCO_DIFERIDO'] = '1'
     start_time = time.time()
-    main()
+    if args.por_tabla or args.chunksize:
+        run_por_tabla(args.tracemalloc, args.chunksize)
+    elif args.workers:
+        run_paralelo(args.workers, args.max_pesadas, cache_metricas, args.tracemalloc)
+    elif args.subprocesos:
+        main()
+    else:
+        run_en_proceso(cache_metricas, args.tracemalloc)
+    refrescar_resumen()
     end_time = time.time()
     print(f"\nTiempo total de ejecución: {end_time - start_time:.2f} segundos") 
\ No newline at end of file
@@ -0,0 +1,182 @@
+import os
+import pandas as pd
+from cache_columnar import parquet_vigente, leer_parquet, leer_parquet_por_bloques
+
+# Codificaciones probadas al leer los CSV integrados, en orden
+ENCODINGS = ['latin-1', 'utf-8', 'cp1252']
+
+# Filas por bloque al leer de a bloques si no se indica otra cantidad
+TAMANO_BLOQUE = 500_000
+
+def directorio_csvs():
+    """Directorio integratedCSVs, en la raíz del proyecto"""
+    current_script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(current_script_dir)
+    return os.path.join(project_root, 'integratedCSVs')
+
+def leer_csv(file_path, columnas=None):
+    """
+    Lee un CSV integrado probando las codificaciones de ENCODINGS.
+
+    Args:
+        file_path (str): Ruta del archivo
+        columnas (iterable): Columnas a leer (las que no existan se ignoran); None para todas
+
+    Returns:
+        DataFrame: Contenido del archivo
+    """
+    usecols = None if columnas is None else set(columnas).__contains__
+    for encoding in ENCODINGS:
+        try:
+            # low_memory=False para evitar advertencias de tipos mixtos
+            return pd.read_csv(file_path, encoding=encoding, low_memory=False, usecols=usecols)
+        except UnicodeDecodeError:
+            continue
+    raise Exception("No se pudo leer el archivo con ninguna codificación")
+
+def leer_tabla(file_path, columnas=None):
+    """
+    Lee un CSV integrado desde su copia Parquet (cache_columnar.py) si está al día,
+    cargando solo las columnas pedidas; si no, desde el CSV.
+
+    Args:
+        file_path (str): Ruta del CSV
+        columnas (iterable): Columnas a leer (las que no existan se ignoran); None para todas
+
+    Returns:
+        DataFrame: Las columnas pedidas, con los mismos tipos en ambos casos
+    """
+    ruta = parquet_vigente(file_path)
+    if ruta is not None:
+        return leer_parquet(ruta, columnas)
+    return leer_csv(file_path, columnas)
+
+def leer_csv_por_bloques(file_path, chunksize, columnas=None, dtype=None):
+    """
+    Lee un CSV integrado de a bloques de `chunksize` filas, sin cargarlo completo.
+    La codificación se elige con el primer bloque (latin-1, la primera de ENCODINGS,
+    decodifica cualquier byte, así que en la práctica nunca falla más adelante).
+
+    Args:
+        file_path (str): Ruta del archivo
+        chunksize (int): Filas por bloque
+        columnas (iterable): Columnas a leer (las que no existan se ignoran); None para todas
+        dtype (dict): Tipo de cada columna; las demás se infieren en cada bloque
+
+    Yields:
+        DataFrame: Cada bloque del archivo
+    """
+    usecols = None if columnas is None else set(columnas).__contains__
+    for encoding in ENCODINGS:
+        try:
+            lector = pd.read_csv(
+                file_path, encoding=encoding, chunksize=chunksize, usecols=usecols, dtype=dtype, low_memory=False
+            )
+            primero = next(lector, None)
+        except UnicodeDecodeError:
+            continue
+        with lector:
+            if primero is not None:
+                yield primero
+            yield from lector
+        return
+    raise Exception("No se pudo leer el archivo con ninguna codificación")
+
+def inferir_tipos(file_path, chunksize, columnas=None):
+    """
+    Tipo que pandas le daría a cada columna al leer el archivo completo, calculado
+    de a bloques. Cada bloque infiere su propio tipo (un bloque sin nulos da int64
+    donde el archivo completo da float64, uno solo con números da int64 donde otro
+    bloque tiene texto); fijarlos antes de leer hace que los bloques den los mismos
+    valores que la lectura completa.
+
+    Args:
+        file_path (str): Ruta del archivo
+        chunksize (int): Filas por bloque
+        columnas (iterable): Columnas a inferir; None para todas
+
+    Returns:
+        dict: dtype por columna, para pasar a leer_csv_por_bloques
+    """
+    vistos = {}
+    for bloque in leer_csv_por_bloques(file_path, chunksize, columnas):
+        for columna, tipo in bloque.dtypes.items():
+            vistos.setdefault(columna, set()).add(tipo)
+
+    tipos = {}
+    for columna, tipos_bloques in vistos.items():
+        if len(tipos_bloques) == 1:
+            tipos[columna] = tipos_bloques.pop()
+        elif all(tipo.kind in 'iuf' for tipo in tipos_bloques):
+            # Enteros en unos bloques y decimales (o nulos) en otros
+            tipos[columna] = 'float64'
+        else:
+            # Texto en algún bloque: toda la columna queda como texto
+            tipos[columna] = str
+    return tipos
+
+def leer_columna_por_bloques(file_path, columna, chunksize=TAMANO_BLOQUE):
+    """
+    Lee una sola columna de un CSV integrado de a bloques, con el tipo que tendría
+    leyendo el archivo completo: desde la copia Parquet si está al día o, si no, del
+    CSV con los tipos fijados por inferir_tipos.
+
+    Args:
+        file_path (str): Ruta del archivo
+        columna (str): Nombre de la columna
+        chunksize (int): Filas por bloque
+
+    Yields:
+        Series: Cada bloque de la columna
+    """
+    ruta = parquet_vigente(file_path)
+    if ruta is not None:
+        for bloque in leer_parquet_por_bloques(ruta, chunksize, [columna]):
+            if columna not in bloque.columns:
+                raise KeyError(f"No se encontró la columna '{columna}' en {os.path.basename(file_path)}")
+            yield bloque[columna]
+        return
+
+    tipos = inferir_tipos(file_path, chunksize, [columna])
+    if columna not in tipos:
+        raise KeyError(f"No se encontró la columna '{columna}' en {os.path.basename(file_path)}")
+    for bloque in leer_csv_por_bloques(file_path, chunksize, [columna], tipos):
+        yield bloque[columna]
+
+class CacheTablas:
+    """
+    Tablas leídas una sola vez y compartidas entre las métricas de una corrida.
+    Si se indica cuántas veces se va a usar cada archivo, la tabla se libera
+    después de su último uso.
+    """
+    def __init__(self, usos=None):
+        """
+        Args:
+            usos (dict): Cantidad de usos esperados por ruta; None para no liberar nunca
+        """
+        self._tablas = {}
+        self._usos = dict(usos) if usos else None
+
+    def obtener(self, file_path):
+        """
+        Args:
+            file_path (str): Ruta del CSV
+
+        Returns:
+            DataFrame: Tabla leída de disco la primera vez y cacheada luego
+        """
+        if file_path not in self._tablas:
+            self._tablas[file_path] = leer_tabla(file_path)
+        df = self._tablas[file_path]
+        self.descontar_uso(file_path)
+        return df
+
+    def descontar_uso(self, file_path):
+        """
+        Registra un uso de la tabla (también cuando se omite, p. ej. por la caché
+        de métricas) y la libera si era el último.
+        """
+        if self._usos is not None and file_path in self._usos:
+            self._usos[file_path] -= 1
+            if self._usos[file_path] <= 0:
+                self._tablas.pop(file_path, None)